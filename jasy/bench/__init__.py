@@ -0,0 +1,9 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+"""
+Micro benchmarks for performance critical parts of Jasy. Each module can be executed 
+directly and prints its results to the console.
+"""
@@ -0,0 +1,202 @@
+/**
+ * Observable data model with typed properties, change events and validation.
+ *
+ * #require(bench.Event)
+ * #optional(bench.Debug)
+ */
+(function(global, undef)
+{
+	var slice = Array.prototype.slice;
+	var hasOwnProperty = Object.prototype.hasOwnProperty;
+	var counter = 0;
+
+	/**
+	 * Returns whether @value {var} matches the given @type {String}.
+	 */
+	var isType = function(value, type)
+	{
+		if (value === null || value === undef) {
+			return type == "Null";
+		}
+
+		switch(type)
+		{
+			case "String":
+				return typeof value == "string" || value instanceof String;
+
+			case "Number":
+				return (typeof value == "number" || value instanceof Number) && !isNaN(value);
+
+			case "Boolean":
+				return value === true || value === false;
+
+			case "Array":
+				return Object.prototype.toString.call(value) == "[object Array]";
+
+			case "Function":
+				return typeof value == "function";
+
+			default:
+				return value instanceof Object;
+		}
+	};
+
+	/**
+	 * Creates a new model with the given @data {Map} and property @config {Map}.
+	 */
+	var Model = global.bench.Model = function(data, config)
+	{
+		this.__id = "model" + (counter++);
+		this.__data = {};
+		this.__config = config || {};
+		this.__listeners = [];
+		this.__changes = 0;
+
+		if (data) {
+			this.set(data);
+		}
+	};
+
+	Model.prototype =
+	{
+		/** {String} Returns the unique ID of the model */
+		getId : function() {
+			return this.__id;
+		},
+
+		/**
+		 * Returns the value of the property @name {String}. Falls back to the
+		 * configured default value when the property was never set.
+		 */
+		get : function(name)
+		{
+			var data = this.__data;
+			if (hasOwnProperty.call(data, name)) {
+				return data[name];
+			}
+
+			var entry = this.__config[name];
+			return entry && "init" in entry ? entry.init : undef;
+		},
+
+		/**
+		 * Sets the property @name {String|Map} to the given @value {var?}.
+		 * Fires a change event for every property which was modified.
+		 */
+		set : function(name, value)
+		{
+			if (typeof name == "object")
+			{
+				for (var key in name) {
+					this.set(key, name[key]);
+				}
+
+				return this;
+			}
+
+			var entry = this.__config[name];
+			if (entry && entry.type && !isType(value, entry.type)) {
+				throw new Error("Invalid value for property " + name + ": " + value + " (expected " + entry.type + ")");
+			}
+
+			if (entry && entry.validate && !entry.validate.call(this, value)) {
+				throw new Error("Validation of property " + name + " failed!");
+			}
+
+			var old = this.get(name);
+			if (old === value) {
+				return this;
+			}
+
+			this.__data[name] = value;
+			this.__changes++;
+			this.__fire(name, value, old);
+
+			return this;
+		},
+
+		/** Resets the property @name {String} to its default value */
+		reset : function(name)
+		{
+			var old = this.get(name);
+			delete this.__data[name];
+
+			var value = this.get(name);
+			if (old !== value) {
+				this.__fire(name, value, old);
+			}
+		},
+
+		/**
+		 * Adds the given @callback {Function} which is executed for every change
+		 * in the given @context {Object?}. Returns an ID for removing the listener.
+		 */
+		addListener : function(callback, context)
+		{
+			var listeners = this.__listeners;
+			for (var i=0, l=listeners.length; i<l; i++)
+			{
+				if (listeners[i][0] === callback && listeners[i][1] === context) {
+					return i;
+				}
+			}
+
+			listeners.push([callback, context || this]);
+			return listeners.length - 1;
+		},
+
+		/** Removes the listener with the given @id {Integer} */
+		removeListener : function(id) {
+			this.__listeners[id] = null;
+		},
+
+		/** {Map} Returns a shallow copy of all properties */
+		toJSON : function()
+		{
+			var result = {};
+			var data = this.__data;
+			var config = this.__config;
+
+			for (var name in config)
+			{
+				if (config.hasOwnProperty(name)) {
+					result[name] = this.get(name);
+				}
+			}
+
+			for (var name in data)
+			{
+				if (data.hasOwnProperty(name)) {
+					result[name] = data[name];
+				}
+			}
+
+			return result;
+		},
+
+		/** Fires the change event of @name {String} */
+		__fire : function(name, value, old)
+		{
+			var listeners = this.__listeners;
+			var event = new bench.Event("change", { name : name, value : value, old : old, model : this });
+			var args = slice.call(arguments, 0);
+			args.unshift(event);
+
+			for (var i=0; i<listeners.length; i++)
+			{
+				var listener = listeners[i];
+				if (!listener) {
+					continue;
+				}
+
+				try {
+					listener[0].apply(listener[1], args);
+				} catch(ex) {
+					if (jasy.Env.isSet("debug")) {
+						bench.Debug.warn("Listener of " + this.__id + " failed: " + ex);
+					}
+				}
+			}
+		}
+	};
+})(this);
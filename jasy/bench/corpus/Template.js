@@ -0,0 +1,202 @@
+/**
+ * Minimal string template engine supporting variables, sections, inverted sections and partials.
+ *
+ * #require(bench.Escape)
+ * #break(bench.Partials)
+ */
+(function(global)
+{
+	var whitespace = /\s*/;
+	var spaces = /\s+/;
+	var nonSpace = /\S/;
+	var tagPattern = /\{\{([#\^\/>!&]?)\s*([\w\.]+)\s*\}\}/g;
+	var cache = {};
+
+	/**
+	 * Splits the @text {String} into a list of tokens. Each token is a list of type, value, start and end.
+	 */
+	function tokenize(text)
+	{
+		var tokens = [];
+		var last = 0;
+		var match;
+
+		tagPattern.lastIndex = 0;
+		while ((match = tagPattern.exec(text)) !== null)
+		{
+			if (match.index > last) {
+				tokens.push(["text", text.slice(last, match.index), last, match.index]);
+			}
+
+			var type = match[1] || "name";
+			if (type != "!") {
+				tokens.push([type, match[2], match.index, tagPattern.lastIndex]);
+			}
+
+			last = tagPattern.lastIndex;
+		}
+
+		if (last < text.length) {
+			tokens.push(["text", text.slice(last), last, text.length]);
+		}
+
+		return tokens;
+	}
+
+	/**
+	 * Converts the flat list of @tokens {Array} into a tree of sections.
+	 */
+	function nest(tokens)
+	{
+		var tree = [];
+		var collector = tree;
+		var sections = [];
+
+		for (var i=0, l=tokens.length; i<l; i++)
+		{
+			var token = tokens[i];
+			switch (token[0])
+			{
+				case "#":
+				case "^":
+					collector.push(token);
+					sections.push(token);
+					collector = token[4] = [];
+					break;
+
+				case "/":
+					var section = sections.pop();
+					if (!section || section[1] != token[1]) {
+						throw new Error("Unclosed section " + (section ? section[1] : token[1]) + " at " + token[2]);
+					}
+
+					collector = sections.length > 0 ? sections[sections.length - 1][4] : tree;
+					break;
+
+				default:
+					collector.push(token);
+			}
+		}
+
+		if (sections.length) {
+			throw new Error("Unclosed section " + sections.pop()[1]);
+		}
+
+		return tree;
+	}
+
+	/**
+	 * Looks up the value of @name {String} (supports dot notation) in the @stack {Array} of contexts.
+	 */
+	function lookup(name, stack)
+	{
+		var parts = name == "." ? null : name.split(".");
+		for (var i=stack.length-1; i>=0; i--)
+		{
+			var value = stack[i];
+			if (!parts) {
+				return value;
+			}
+
+			for (var j=0; j<parts.length && value != null; j++) {
+				value = value[parts[j]];
+			}
+
+			if (value !== undefined) {
+				return typeof value == "function" ? value.call(stack[i]) : value;
+			}
+		}
+
+		return "";
+	}
+
+	/**
+	 * Renders the given @tree {Array} using the context @stack {Array} and the @partials {Map}.
+	 */
+	function render(tree, stack, partials)
+	{
+		var buffer = "";
+
+		for (var i=0, l=tree.length; i<l; i++)
+		{
+			var token = tree[i];
+			var type = token[0];
+			var value;
+
+			if (type == "text")
+			{
+				buffer += token[1];
+			}
+			else if (type == "name" || type == "&")
+			{
+				value = lookup(token[1], stack);
+				if (value != null) {
+					buffer += type == "&" ? value : bench.Escape.html("" + value);
+				}
+			}
+			else if (type == "#")
+			{
+				value = lookup(token[1], stack);
+				if (value instanceof Array)
+				{
+					for (var j=0; j<value.length; j++) {
+						buffer += render(token[4], stack.concat([value[j]]), partials);
+					}
+				}
+				else if (value)
+				{
+					buffer += render(token[4], typeof value == "object" ? stack.concat([value]) : stack, partials);
+				}
+			}
+			else if (type == "^")
+			{
+				value = lookup(token[1], stack);
+				if (!value || (value instanceof Array && value.length === 0)) {
+					buffer += render(token[4], stack, partials);
+				}
+			}
+			else if (type == ">")
+			{
+				var partial = partials && partials[token[1]];
+				if (partial != null) {
+					buffer += render(compile(partial), stack, partials);
+				}
+			}
+		}
+
+		return buffer;
+	}
+
+	/**
+	 * Returns the compiled (cached) tree of the given template @text {String}.
+	 */
+	function compile(text)
+	{
+		var tree = cache[text];
+		if (!tree) {
+			tree = cache[text] = nest(tokenize(text));
+		}
+
+		return tree;
+	}
+
+	global.bench.Template =
+	{
+		/** {String} Renders the template @text {String} with the @data {Map} and optional @partials {Map} */
+		render : function(text, data, partials) {
+			return render(compile(text), [data], partials || bench.Partials.getAll());
+		},
+
+		/** Clears the template cache */
+		clear : function() {
+			cache = {};
+		},
+
+		/** {Boolean} Whether the @text {String} contains any tags */
+		hasTags : function(text)
+		{
+			tagPattern.lastIndex = 0;
+			return tagPattern.test(text) && nonSpace.test(text.replace(whitespace, "").replace(spaces, " "));
+		}
+	};
+})(this);
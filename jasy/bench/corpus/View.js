@@ -0,0 +1,143 @@
+/**
+ * List view rendering a localized, sortable and pageable table of models.
+ *
+ * #require(bench.Model)
+ * #require(bench.Template)
+ * #asset(bench/view/*)
+ */
+core.Class("bench.View",
+{
+	/**
+	 * Creates a view for the @models {bench.Model[]} inside the given @root {Element}.
+	 */
+	construct : function(root, models, pageSize)
+	{
+		this.__root = root;
+		this.__models = models || [];
+		this.__pageSize = pageSize || 20;
+		this.__page = 0;
+		this.__sortField = null;
+		this.__sortDescending = false;
+		this.__selection = {};
+
+		if (jasy.Env.getValue("bench.view.autoRender")) {
+			this.render();
+		}
+	},
+
+	members :
+	{
+		/** {Integer} Returns the number of available pages */
+		getPageCount : function() {
+			return Math.max(1, Math.ceil(this.__models.length / this.__pageSize));
+		},
+
+		/** Switches to the page with the given @index {Integer} */
+		setPage : function(index)
+		{
+			var count = this.getPageCount();
+			index = index < 0 ? 0 : index >= count ? count - 1 : index;
+
+			if (index != this.__page)
+			{
+				this.__page = index;
+				this.render();
+			}
+		},
+
+		/**
+		 * Sorts the rows by @field {String}. Toggles the direction when the
+		 * view is already sorted by the given field.
+		 */
+		sortBy : function(field)
+		{
+			if (this.__sortField == field) {
+				this.__sortDescending = !this.__sortDescending;
+			} else {
+				this.__sortField = field;
+				this.__sortDescending = false;
+			}
+
+			var descending = this.__sortDescending;
+			this.__models.sort(function(first, second)
+			{
+				var a = first.get(field), b = second.get(field);
+				var result = a < b ? -1 : a > b ? 1 : 0;
+				return descending ? -result : result;
+			});
+
+			this.render();
+		},
+
+		/** Toggles the selection of the model with the given @id {String} */
+		toggle : function(id)
+		{
+			if (this.__selection[id]) {
+				delete this.__selection[id];
+			} else {
+				this.__selection[id] = true;
+			}
+
+			this.render();
+		},
+
+		/** {String} Returns the markup of the current page */
+		getMarkup : function()
+		{
+			var start = this.__page * this.__pageSize;
+			var models = this.__models.slice(start, start + this.__pageSize);
+			var rows = [];
+
+			for (var i=0, l=models.length; i<l; i++)
+			{
+				var model = models[i], data = model.toJSON();
+				data.selected = !!this.__selection[model.getId()];
+				data.index = start + i + 1;
+				data.even = i % 2 === 0;
+				rows.push(data);
+			}
+
+			var pageCount = this.getPageCount();
+			var status = pageCount > 1 ? trn("Page %1 of %2", "Pages %1 of %2", pageCount, this.__page + 1, pageCount) : tr("All entries");
+
+			return bench.Template.render(this.__template, {
+				rows : rows,
+				empty : rows.length === 0,
+				emptyText : trc("Table without rows", "Nothing to show"),
+				status : status,
+				sorted : this.__sortField,
+				direction : this.__sortDescending ? "desc" : "asc"
+			});
+		},
+
+		/** Renders the current page into the root element */
+		render : function()
+		{
+			var root = this.__root;
+			var markup = this.getMarkup();
+
+			if (jasy.Env.isSet("debug"))
+			{
+				var begin = +new Date;
+				root.innerHTML = markup;
+				console.log("Rendered " + this.__models.length + " models in " + (new Date - begin) + "ms");
+			}
+			else
+			{
+				root.innerHTML = markup;
+			}
+
+			var rows = root.getElementsByTagName("tr"), self = this;
+			for (var i=0; i<rows.length; i++)
+			{
+				rows[i].onclick = (function(id) {
+					return function() { self.toggle(id); };
+				})(rows[i].getAttribute("data-id"));
+			}
+		},
+
+		__template : '<table class="{{direction}}">{{#rows}}<tr data-id="{{id}}" class="{{#selected}}selected{{/selected}}">' +
+			'<td>{{index}}</td><td>{{name}}</td><td>{{value}}</td></tr>{{/rows}}{{#empty}}<tr><td colspan="3">{{emptyText}}</td></tr>{{/empty}}</table>' +
+			'<p class="status">{{status}}</p>'
+	}
+});
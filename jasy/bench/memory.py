@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+import sys, os, gc, tracemalloc
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.parse.Serializer as Serializer
+import jasy.bench.tokenizer as TokenizerBench
+
+
+def countNodes(node):
+    """Returns the number of nodes in the given tree"""
+
+    count = 1
+    for child in node:
+        if child is not None:
+            count += countNodes(child)
+
+    return count
+
+
+def collectFiles(paths):
+    """Returns a sorted list of all JavaScript files in the given files/folders"""
+
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirPath, dirNames, fileNames in os.walk(path):
+                result.extend(os.path.join(dirPath, fileName) for fileName in fileNames if fileName.endswith(".js"))
+        else:
+            result.append(path)
+
+    return sorted(result)
+
+
+def run(sources):
+    """
+    Parses all given sources (dict of name => code) and measures the memory used by the trees 
+    when restored from their cached representation (without tokenizers). Returns a dict with the 
+    number of trees, nodes, the memory allocated by the trees and the bytes per node.
+    """
+
+    serialized = []
+    for name in sorted(sources):
+        try:
+            tree = Parser.parse(sources[name], name)
+        except Exception:
+            continue
+
+        ScopeScanner.scan(tree)
+        serialized.append(Serializer.dumps(tree))
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    trees = [Serializer.loads(data) for data in serialized]
+
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    nodes = sum(countNodes(tree) for tree in trees)
+
+    return {
+        "trees" : len(trees),
+        "nodes" : nodes,
+        "bytes" : size,
+        "perNode" : size / nodes if nodes else 0
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sources = {}
+        for fileName in collectFiles(sys.argv[1:]):
+            try:
+                sources[fileName] = open(fileName, encoding="utf-8").read()
+            except UnicodeDecodeError:
+                pass
+    else:
+        sources = { "synthetic" : TokenizerBench.generateSource(1000) }
+
+    result = run(sources)
+    print("Memory benchmark (%s trees, %s nodes)" % (result["trees"], result["nodes"]))
+    print("- Total: %.1fMB" % (result["bytes"] / 1024 / 1024))
+    print("- Per node: %.0f bytes" % result["perNode"])
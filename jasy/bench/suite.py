@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+"""
+Runs every phase of the JavaScript pipeline (tokenizer, parser, scope scanner, cleanups,
+optimizers and compressor) and the optimization of classes (one and two optimizations in
+a row) over the pinned corpus and over synthetic sources of configurable
+sizes. Results can be stored as JSON and compared with the results of an earlier run.
+"""
+
+import sys, os, gc, json, time, shutil, atexit, tempfile, platform, tracemalloc
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+
+import jasy
+import jasy.js.tokenize.Tokenizer as Tokenizer
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.clean.DeadCode as DeadCode
+import jasy.js.clean.Unused as Unused
+import jasy.js.optimize.ClosureWrapper as ClosureWrapper
+import jasy.js.optimize.CombineDeclarations as CombineDeclarations
+import jasy.js.optimize.BlockReducer as BlockReducer
+import jasy.js.optimize.LocalVariables as LocalVariables
+import jasy.js.optimize.CryptPrivates as CryptPrivates
+import jasy.js.output.Compressor as Compressor
+import jasy.js.output.Optimization as Optimization
+import jasy.core.Project as Project
+import jasy.item.Class as Class
+import jasy.bench.tokenizer as TokenizerBench
+
+
+corpusPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+# Optimization requested after the default one by the "reoptimize" phase
+extendedOptimization = Optimization.Optimization("declarations", "blocks", "variables", "privates")
+
+
+#
+# Phases
+#
+
+def __source(name, source):
+    return source
+
+def __parsed(name, source):
+    return Parser.parse(source, name)
+
+def __scanned(name, source):
+    tree = Parser.parse(source, name)
+    ScopeScanner.scan(tree)
+    return tree
+
+def __tokenize(source):
+    TokenizerBench.tokenize(source, Tokenizer.defaultEngine)
+
+def __parse(source):
+    # The file name is not used for anything measured here
+    Parser.parse(source, "bench")
+
+def __compress(tree):
+    Compressor.Compressor().compress(tree)
+
+def __classified(name, source):
+    """Returns a class of a new project with the optimized tree of the given source in memory"""
+
+    path = tempfile.mkdtemp(prefix="jasy-bench-")
+    atexit.register(shutil.rmtree, path, True)
+
+    classPath = os.path.join(path, "source", "class")
+    os.makedirs(classPath)
+    handle = open(os.path.join(classPath, "Main.js"), "w", encoding="utf-8")
+    handle.write(source)
+    handle.close()
+
+    classObj = Project.Project(path, {"name" : "bench"}).getClassByName("bench.Main")
+    classObj.getCompressed(Class.defaultPermutation)
+    return classObj
+
+def __optimize(classObj):
+    classObj.getCompressed(Class.defaultPermutation, optimization=Class.defaultOptimization)
+
+def __reoptimize(classObj):
+    classObj.getCompressed(Class.defaultPermutation, optimization=Class.defaultOptimization)
+    classObj.getCompressed(Class.defaultPermutation, optimization=extendedOptimization)
+
+
+# List of (name, prepare, run). The prepare method creates the input of the phase from the
+# file name and source. It is not part of the measurement. The run method processes that input.
+phases = [
+    ("tokenize", __source, __tokenize),
+    ("parse", __source, __parse),
+    ("scan", __parsed, ScopeScanner.scan),
+    ("deadcode", __parsed, DeadCode.cleanup),
+    ("unused", __scanned, lambda tree: Unused.cleanup(tree, scanned=True)),
+    ("wrap", __scanned, ClosureWrapper.optimize),
+    ("declarations", __scanned, CombineDeclarations.optimize),
+    ("blocks", __scanned, BlockReducer.optimize),
+    ("variables", __scanned, LocalVariables.optimize),
+    ("privates", __scanned, lambda tree: CryptPrivates.optimize(tree, tree.fileId)),
+    ("compress", __scanned, __compress),
+    ("optimize", __classified, __optimize),
+    ("reoptimize", __classified, __reoptimize)
+]
+
+phaseNames = [entry[0] for entry in phases]
+
+
+
+#
+# Sources
+#
+
+def loadCorpus(path=None):
+    """Returns a dict of file name => source of all JavaScript files in the pinned corpus (or the given folder)"""
+
+    if path is None:
+        path = corpusPath
+
+    sources = {}
+    for fileName in sorted(os.listdir(path)):
+        if fileName.endswith(".js"):
+            sources[fileName] = open(os.path.join(path, fileName), encoding="utf-8").read()
+
+    return sources
+
+
+def generateSources(size):
+    """Returns a dict with one synthetic source containing the given number of modules"""
+
+    return { "synthetic-%s.js" % size : TokenizerBench.generateSource(size) }
+
+
+
+#
+# Measurement
+#
+
+def measure(sources, run, prepare, rounds):
+    """
+    Processes all sources with the given run method for the given number of rounds. Returns
+    the best and the mean time of a round in seconds. Inputs are prepared outside of the measured
+    time for each round as most phases modify their input tree.
+    """
+
+    times = []
+    for pos in range(rounds):
+        inputs = [prepare(name, sources[name]) for name in sorted(sources)]
+        gc.collect()
+
+        start = time.perf_counter()
+        for value in inputs:
+            run(value)
+        times.append(time.perf_counter() - start)
+
+    return min(times), sum(times) / len(times)
+
+
+def measurePeak(sources, run, prepare):
+    """Returns the peak number of bytes allocated while processing all sources once"""
+
+    inputs = [prepare(name, sources[name]) for name in sorted(sources)]
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for value in inputs:
+            run(value)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return max(0, peak - before)
+
+
+def runSuite(sources, rounds=5, memory=True, only=None):
+    """
+    Measures all phases (or the ones listed in only) for the given sources (dict of name => code).
+    Returns a dict with the number of files, bytes and the results of each phase.
+    """
+
+    results = {}
+    for name, prepare, run in phases:
+        if only and name not in only:
+            continue
+
+        best, mean = measure(sources, run, prepare, rounds)
+        results[name] = {
+            "time" : best,
+            "mean" : mean,
+            "ops" : 1 / best if best else 0
+        }
+
+        if memory:
+            results[name]["peak"] = measurePeak(sources, run, prepare)
+
+    return {
+        "files" : len(sources),
+        "bytes" : sum(len(sources[name]) for name in sources),
+        "phases" : results
+    }
+
+
+def run(sizes=(200,), corpus=True, rounds=5, memory=True, only=None):
+    """
+    Runs the benchmark on the pinned corpus and on synthetic sources of the given sizes
+    (number of generated modules). Returns a JSON compatible dict with all results.
+    """
+
+    suites = {}
+    if corpus:
+        suites["corpus"] = runSuite(loadCorpus(), rounds, memory, only)
+
+    for size in sizes:
+        suites["synthetic-%s" % size] = runSuite(generateSources(size), rounds, memory, only)
+
+    return {
+        "jasy" : jasy.__version__,
+        "python" : platform.python_version(),
+        "engine" : Tokenizer.defaultEngine,
+        "rounds" : rounds,
+        "suites" : suites
+    }
+
+
+
+#
+# Storage and comparison
+#
+
+def store(results, fileName):
+    """Writes the given results to the given JSON file"""
+
+    handle = open(fileName, "w", encoding="utf-8")
+    json.dump(results, handle, indent=2, sort_keys=True)
+    handle.close()
+
+
+def load(fileName):
+    """Reads results from the given JSON file"""
+
+    handle = open(fileName, encoding="utf-8")
+    results = json.load(handle)
+    handle.close()
+
+    return results
+
+
+def compare(previous, current, threshold=0.1):
+    """
+    Compares the best times of two benchmark results. Returns a list of tuples
+    (suite, phase, previous, current, ratio, regression) for all phases found in both results.
+    A phase regressed when it became slower by more than the given threshold (0.1 = 10%).
+    """
+
+    result = []
+    for suite in current["suites"]:
+        if not suite in previous["suites"]:
+            continue
+
+        currentPhases = current["suites"][suite]["phases"]
+        previousPhases = previous["suites"][suite]["phases"]
+
+        for phase in phaseNames:
+            if not phase in currentPhases or not phase in previousPhases:
+                continue
+
+            before = previousPhases[phase]["time"]
+            after = currentPhases[phase]["time"]
+            ratio = after / before if before else 1.0
+            result.append((suite, phase, before, after, ratio, ratio > 1 + threshold))
+
+    return result
+
+
+
+#
+# Console output
+#
+
+def printResults(results):
+    print("Jasy %s benchmark (Python %s, %s tokenizer, best of %s rounds)" % (results["jasy"], results["python"], results["engine"], results["rounds"]))
+
+    for suite in results["suites"]:
+        data = results["suites"][suite]
+        print("")
+        print("%s (%s files, %s bytes)" % (suite, data["files"], data["bytes"]))
+
+        for phase in phaseNames:
+            if phase in data["phases"]:
+                entry = data["phases"][phase]
+                line = "- %-12s %9.2fms %9.1f ops/sec" % (phase, entry["time"] * 1000, entry["ops"])
+                if "peak" in entry:
+                    line += " %9.1fKB peak" % (entry["peak"] / 1024)
+
+                print(line)
+
+
+def printComparison(comparison):
+    regressions = 0
+    for suite, phase, before, after, ratio, regression in comparison:
+        if regression:
+            regressions += 1
+
+        print("%s %-20s %-12s %9.2fms => %9.2fms (%+.1f%%)" % ("!" if regression else "-", suite, phase, before * 1000, after * 1000, (ratio - 1) * 100))
+
+    return regressions
+
+
+if __name__ == "__main__":
+    printResults(run())
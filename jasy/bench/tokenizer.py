@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+import sys, os, time
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+
+import jasy.js.tokenize.Tokenizer as Tokenizer
+import jasy.js.tokenize.Lang as Lang
+import jasy.js.parse.Parser as Parser
+
+
+# Typical documented class code. Heavy on comments, indentation and short tokens.
+template = '''
+/**
+ * Returns the computed value of the {String} property @name {var} of the given @element {Element}.
+ *
+ * #require(ext.sugar.String)
+ */
+core.Module("bench.Module%(id)s", {
+    /** {Number} Sum of @first {Number} and @second {Number} */
+    sum : function(first, second) {
+        // Add up everything
+        var result = first + second * 2.5 - 0x1F;
+        if (result > 100 && /^[a-z]+$/i.test("abc%(id)s")) {
+            return "Large: " + result;
+        }
+
+        return result;
+    }
+});
+'''
+
+
+def generateSource(count=200):
+    """Returns a synthetic JavaScript source with the given number of modules"""
+
+    return "".join(template % { "id" : pos } for pos in range(count))
+
+
+def tokenize(source, engine):
+    """
+    Tokenizes the whole source without building a tree. Returns the number of tokens.
+    Without a parser the previous token decides whether an operand (e.g. a regular expression) may follow.
+    """
+
+    tokenizer = Tokenizer.create(source, "bench", 1, engine)
+    count = 0
+    tokenType = tokenizer.get(True)
+    while tokenType != "end":
+        count += 1
+        tokenType = tokenizer.get(tokenType not in Lang.operandEnds)
+
+    return count
+
+
+def parse(source, engine):
+    """Parses the given source using the given tokenizer engine"""
+
+    previous = Tokenizer.defaultEngine
+    Tokenizer.defaultEngine = engine
+    try:
+        return Parser.parse(source, "bench")
+    finally:
+        Tokenizer.defaultEngine = previous
+
+
+def measure(method, source, engine, rounds):
+    """Returns the best time in seconds out of the given number of rounds"""
+
+    best = None
+    for pos in range(rounds):
+        start = time.time()
+        method(source, engine)
+        duration = time.time() - start
+        if best is None or duration < best:
+            best = duration
+
+    return best
+
+
+def run(source=None, rounds=5):
+    """Compares all tokenizer engines on the given source (defaults to a synthetic one) and returns the timings"""
+
+    if source is None:
+        source = generateSource()
+
+    results = {}
+    for engine in sorted(Tokenizer.engines):
+        results[engine] = {
+            "tokenize" : measure(tokenize, source, engine, rounds),
+            "parse" : measure(parse, source, engine, rounds)
+        }
+
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        source = open(sys.argv[1], encoding="utf-8").read()
+    else:
+        source = generateSource()
+
+    print("Tokenizer benchmark (%s bytes, %s tokens)" % (len(source), tokenize(source, "classic")))
+
+    results = run(source)
+    for engine in sorted(results):
+        print("- %-8s tokenize: %.1fms, parse: %.1fms" % (engine, results[engine]["tokenize"] * 1000, results[engine]["parse"] * 1000))
+
+    if "classic" in results:
+        for engine in sorted(results):
+            if engine != "classic":
+                print("Speedup of %s: %.2fx (tokenize), %.2fx (parse)" % (engine, results["classic"]["tokenize"] / results[engine]["tokenize"], results["classic"]["parse"] / results[engine]["parse"]))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+import sys, os, time
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.clean.Unused as Unused
+
+
+def generateChain(count=200):
+    """
+    Returns a function with a chain of helpers where each helper only uses the previous one. The
+    last helper is unused which makes all helpers unused one after another.
+    """
+
+    helpers = ["var helper%s = function() { return helper%s() + %s; };\n" % (pos, pos - 1, pos) for pos in range(1, count)]
+    return "function wrapper() {\nvar helper0 = 0;\n%s}\n" % "".join(helpers)
+
+
+def measure(source, rounds):
+    """Returns the best time in seconds of removing all unused code out of the given number of rounds"""
+
+    best = None
+    for pos in range(rounds):
+        tree = Parser.parse(source, "bench")
+        start = time.perf_counter()
+        Unused.cleanup(tree)
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+
+    return best
+
+
+def run(sizes=(50, 100, 200, 400), rounds=3):
+    """Returns the cleanup timings of unused chains of the given sizes"""
+
+    return dict((size, measure(generateChain(size), rounds)) for size in sizes)
+
+
+if __name__ == "__main__":
+    results = run()
+    print("Unused chain benchmark")
+    for size in sorted(results):
+        print("- %4s helpers: %.1fms" % (size, results[size] * 1000))
@@ -3,169 +3,623 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
-import shelve, time, os, os.path, sys, pickle, dbm, uuid, hashlib, atexit
+import time, os, os.path, sys, pickle, uuid, hashlib, atexit, collections, heapq, zlib
 
 import jasy
 import jasy.core.Util
+import jasy.core.CacheBackend as CacheBackend
 import jasy.core.Console as Console
 
 hostId = uuid.getnode()
 
+
+# Codec header bytes of stored values
+CODEC_PICKLE = 0
+CODEC_ZLIB = 1
+
+# Pickled data of previous versions starts with the protocol marker (without any codec header)
+CODEC_LEGACY = 0x80
+
+# Default compression settings (values smaller than the threshold are stored uncompressed)
+defaultCompressionLevel = 6
+defaultCompressionThreshold = 4096
+
+
+def encodeValue(value, level=defaultCompressionLevel, threshold=defaultCompressionThreshold):
+    """
+    Serializes the given value and compresses it when its size exceeds the threshold.
+    Returns a tuple with the encoded data (including the codec header byte) and the uncompressed size.
+    Compression is disabled with a level of 0 or None.
+    """
+
+    data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    size = len(data)
+
+    if level and size >= threshold:
+        return bytes((CODEC_ZLIB,)) + zlib.compress(data, level), size
+
+    return bytes((CODEC_PICKLE,)) + data, size
+
+
+def decodeValue(data):
+    """
+    Decodes data created by encodeValue(). Supports the plain pickled data of previous
+    versions, too. Returns a tuple with the value and its uncompressed size.
+    """
+
+    codec = data[0]
+
+    if codec == CODEC_PICKLE:
+        data = memoryview(data)[1:]
+    elif codec == CODEC_ZLIB:
+        data = zlib.decompress(memoryview(data)[1:])
+    elif codec != CODEC_LEGACY:
+        raise ValueError("Unsupported cache codec: %s" % codec)
+
+    return pickle.loads(data), len(data)
+
+
+# Errors raised when decoding corrupt entries or entries referring to moved/removed classes
+decodeErrors = (ValueError, IndexError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError)
+
+
+# Priorities of key families inside the transient memory layer. Families with a
+# lower priority are evicted first. Pinned families are never evicted.
+PRIORITY_PINNED = None
+transientPriorities = {
+    "tree" : 0,
+    "opt-tree" : 0,
+    "pass-tree" : 0,
+    "pass-lists" : 2,
+    "compressed" : 1,
+    "highlighted" : 1,
+    "api" : 1,
+    "scope" : 2,
+    "members" : 2,
+    "meta" : PRIORITY_PINNED,
+    "fields" : PRIORITY_PINNED,
+    "size" : PRIORITY_PINNED,
+    "translations" : PRIORITY_PINNED,
+    "project" : PRIORITY_PINNED
+}
+
+# Priority for all keys with an unknown family
+defaultPriority = 1
+
+
+def getFamily(key):
+    """Returns the family of the given cache key e.g. "tree" for "tree[my.Class]" """
+
+    pos = key.find("[")
+    if pos == -1:
+        return key
+
+    return key[:pos]
+
+
+def estimateSize(value):
+    """
+    Returns a rough estimation of the memory used by the given value in bytes. Walks
+    into lists, tuples, sets, dicts and instance dictionaries. Values offering a cheaper
+    approximation via getEstimatedSize() (e.g. syntax trees) are not walked.
+    """
+
+    approximate = getattr(value, "getEstimatedSize", None)
+    if approximate is not None:
+        return approximate()
+
+    size = 0
+    seen = set()
+    stack = [value]
+
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+
+        if isinstance(current, (str, bytes, int, float, bool)) or current is None:
+            continue
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+
+        if hasattr(current, "__dict__"):
+            stack.append(current.__dict__)
+
+    return size
+
+
+class TransientStore:
+    """
+    Memory-bounded key/value store used as the in-memory layer of the cache. Entries
+    are evicted in least-recently-used order once the byte budget is exceeded, starting
+    with the families of the lowest priority (see transientPriorities).
+    """
+
+    def __init__(self, limit=None):
+        self.__limit = limit
+        self.__used = 0
+        self.__sizes = {}
+        self.__pinned = {}
+        self.__queues = {}
+
+    def __contains__(self, key):
+        if key in self.__pinned:
+            return True
+
+        for queue in self.__queues.values():
+            if key in queue:
+                return True
+
+        return False
+
+    def get(self, key, family=None):
+        """Returns the value for the given key or None. Marks the entry as recently used."""
+
+        if key in self.__pinned:
+            return self.__pinned[key]
+
+        queue = self.__queues.get(transientPriorities.get(family, defaultPriority))
+        if queue is None or not key in queue:
+            return None
+
+        queue.move_to_end(key)
+        return queue[key]
+
+    def put(self, key, value, family=None, size=None):
+        """Stores the given value. Size is estimated when not given."""
+
+        self.remove(key)
+
+        if self.__limit is not None:
+            if size is None:
+                size = estimateSize(value)
+
+            self.__sizes[key] = size
+            self.__used += size
+
+        priority = transientPriorities.get(family, defaultPriority)
+        if priority is PRIORITY_PINNED:
+            self.__pinned[key] = value
+        else:
+            if not priority in self.__queues:
+                self.__queues[priority] = collections.OrderedDict()
+
+            self.__queues[priority][key] = value
+
+        if self.__limit is not None and self.__used > self.__limit:
+            self.__evict()
+
+    def remove(self, key):
+        """Removes the given key from the store"""
+
+        if key in self.__sizes:
+            self.__used -= self.__sizes.pop(key)
+
+        if key in self.__pinned:
+            del self.__pinned[key]
+            return
+
+        for queue in self.__queues.values():
+            if key in queue:
+                del queue[key]
+                return
+
+    def clear(self):
+        """Removes all entries"""
+
+        self.__used = 0
+        self.__sizes = {}
+        self.__pinned = {}
+        self.__queues = {}
+
+    def getUsage(self):
+        """Returns the estimated number of bytes used by all entries"""
+
+        return self.__used
+
+    def __evict(self):
+        for priority in sorted(self.__queues):
+            queue = self.__queues[priority]
+            while queue and self.__used > self.__limit:
+                key, value = queue.popitem(last=False)
+                self.__used -= self.__sizes.pop(key, 0)
+
+            if self.__used <= self.__limit:
+                break
+
+
+class Statistics:
+    """
+    Collects counters about cache usage per key family (hits, misses, stale entries,
+    transferred bytes and time spent for (de)serialization) and keeps track of the
+    largest entries.
+    """
+
+    # Number of largest entries to keep track of
+    largestCount = 10
+
+    def __init__(self):
+        self.__families = {}
+        self.__largest = {}
+
+    def __get(self, family):
+        if not family in self.__families:
+            self.__families[family] = {
+                "hits" : 0,
+                "memoryHits" : 0,
+                "misses" : 0,
+                "stale" : 0,
+                "writes" : 0,
+                "bytesRead" : 0,
+                "bytesWritten" : 0,
+                "readTime" : 0.0,
+                "writeTime" : 0.0
+            }
+
+        return self.__families[family]
+
+    def hit(self, family, memory=False, size=0, duration=0.0):
+        entry = self.__get(family)
+        entry["hits"] += 1
+
+        if memory:
+            entry["memoryHits"] += 1
+        else:
+            entry["bytesRead"] += size
+            entry["readTime"] += duration
+
+    def miss(self, family, stale=False):
+        entry = self.__get(family)
+        entry["misses"] += 1
+
+        if stale:
+            entry["stale"] += 1
+
+    def write(self, family, key, size, duration):
+        entry = self.__get(family)
+        entry["writes"] += 1
+        entry["bytesWritten"] += size
+        entry["writeTime"] += duration
+
+        self.trackSize(key, size)
+
+    def trackSize(self, key, size):
+        """Registers the serialized size of the given key for the list of largest entries"""
+
+        largest = self.__largest
+        if largest.get(key, -1) >= size:
+            return
+
+        largest[key] = size
+
+        # Prune list from time to time to keep memory usage low
+        if len(largest) > self.largestCount * 4:
+            kept = heapq.nlargest(self.largestCount, largest.items(), key=lambda item: item[1])
+            self.__largest = dict(kept)
+
+    def export(self):
+        """Returns a JSON compatible data structure with all collected data"""
+
+        largest = heapq.nlargest(self.largestCount, self.__largest.items(), key=lambda item: item[1])
+
+        return {
+            "families" : { family : dict(self.__families[family]) for family in self.__families },
+            "largest" : [{ "key" : key, "bytes" : size } for key, size in largest]
+        }
+
+
+
 class Cache:
-    """ 
-    A cache class based on shelve feature of Python. Supports transient in-memory 
-    storage, too. Uses memory storage for caching requests to DB as well for 
-    improved performance. Uses keys for identification of entries like a normal
-    hash table / dictionary.
     """
-    
-    __shelve = None
-    
-    def __init__(self, path, filename="jasycache", hashkeys=False):
-        self.__transient = {}
+    A cache class based on a pluggable storage backend (SQLite by default, see
+    jasy.core.CacheBackend). Supports transient in-memory storage, too. Uses memory
+    storage for caching requests to DB as well for improved performance. Uses keys
+    for identification of entries like a normal hash table / dictionary.
+
+    Writes are collected in batches and flushed to disk on sync() and close().
+    The in-memory layer is limited to the given number of bytes (memoryLimit)
+    when configured. Large entries like syntax trees are evicted first.
+
+    Values larger than compressionThreshold bytes are compressed using zlib with
+    the given compressionLevel (0 disables compression).
+
+    Without versions the whole cache is cleared whenever the Jasy version changes.
+    With versions (a dict of key family => version of the producing components)
+    only the entries of families with a changed version are removed.
+    """
+
+    __db = None
+    __build = 0
+
+    def __init__(self, path, filename="jasycache", hashkeys=False, backend=None, memoryLimit=None,
+        compressionLevel=defaultCompressionLevel, compressionThreshold=defaultCompressionThreshold, versions=None):
+
+        self.__versions = versions
+        self.__transient = TransientStore(memoryLimit)
+        self.__compressionLevel = compressionLevel
+        self.__compressionThreshold = compressionThreshold
         self.__file = os.path.join(path, filename)
         self.__hashkeys = hashkeys
+        self.__backend = CacheBackend.getBackend(backend)
+        self.__accessed = set()
+        self.__statistics = Statistics()
 
         self.open()
 
         # Be sure to correctly write down and close cache file on exit
         atexit.register(self.close)
-        
-        
+
+
     def open(self):
         """Opens a cache file in the given path"""
-        
-        try:
-            self.__shelve = shelve.open(self.__file, flag="c")
-            
-            storedVersion = jasy.core.Util.getKey(self.__shelve, "jasy-version")
-            storedHost = jasy.core.Util.getKey(self.__shelve, "jasy-host")
-            
-            if storedVersion == jasy.__version__ and storedHost == hostId:
-                return
-                    
+
+        self.__db = self.__backend(self.__file)
+
+        storedVersion = self.__readMeta("jasy-version")
+        storedHost = self.__readMeta("jasy-host")
+        storedVersions = self.__readMeta("jasy-versions")
+
+        if self.__versions is None:
+            valid = storedVersion == jasy.__version__ and storedHost == hostId
+        else:
+            valid = storedVersions is not None and storedHost == hostId
+
+        if not valid:
             if storedVersion is not None or storedHost is not None:
                 Console.debug("Jasy version or host has been changed. Recreating cache...")
-            
+
             self.clear()
 
-            self.__shelve["jasy-version"] = jasy.__version__
-            self.__shelve["jasy-host"] = hostId
-            
-        except dbm.error as dbmerror:
-            errno = None
-            try:
-                errno = dbmerror.errno
-            except:
-                pass
-                
-            if errno is 35:
-                raise IOError("Cache file is locked by another process!")
-                
-            elif "type could not be determined" in str(dbmerror):
-                Console.error("Could not detect cache file format: %s" % self.__file)
-                Console.warn("Recreating cache database...")
-                self.clear()
-                
-            elif "module is not available" in str(dbmerror):
-                Console.error("Unsupported cache file format: %s" % self.__file)
-                Console.warn("Recreating cache database...")
-                self.clear()
-                
-            else:
-                raise dbmerror
-    
-    
+        elif self.__versions is not None and storedVersions != self.__versions:
+            outdated = set([family for family in self.__versions if storedVersions.get(family) != self.__versions[family]])
+            if outdated:
+                Console.debug("Invalidating outdated cache entries: %s", ", ".join(sorted(outdated)))
+                for key in self.__db.keys():
+                    if getFamily(key) in outdated:
+                        self.__db.delete(key)
+
+            self.__writeMeta("jasy-version", jasy.__version__)
+            self.__writeMeta("jasy-versions", self.__versions)
+
+        # Every session using the cache counts as a build. Used to detect unused entries.
+        self.__build = (self.__readMeta("jasy-build") or 0) + 1
+        self.__writeMeta("jasy-build", self.__build)
+
+
     def clear(self):
         """
         Clears the cache file through re-creation of the file
         """
-        
-        if self.__shelve != None:
-            Console.debug("Closing cache file %s..." % self.__file)
-            
-            self.__shelve.close()
-            self.__shelve = None
 
         Console.debug("Clearing cache file %s..." % self.__file)
-        
-        self.__shelve = shelve.open(self.__file, flag="n")
 
-        self.__shelve["jasy-version"] = jasy.__version__
-        self.__shelve["jasy-host"] = hostId
-        
-        
+        self.__transient.clear()
+        self.__accessed = set()
+
+        if self.__db is None:
+            self.__db = self.__backend(self.__file)
+
+        self.__db.clear()
+
+        self.__writeMeta("jasy-version", jasy.__version__)
+        self.__writeMeta("jasy-host", hostId)
+        self.__writeMeta("jasy-build", self.__build)
+
+        if self.__versions is not None:
+            self.__writeMeta("jasy-versions", self.__versions)
+
+
+    def __readMeta(self, key):
+        entry = self.__db.get(key)
+        if entry is None:
+            return None
+
+        try:
+            return decodeValue(entry[1])[0]
+        except Exception:
+            return None
+
+
+    def __writeMeta(self, key, value):
+        self.__db.put(key, time.time(), encodeValue(value, None)[0])
+
+
     def read(self, key, timestamp=None, inMemory=True):
-        """ 
+        """
         Reads the given value from cache.
-        Optionally support to check wether the value was stored after the given 
+        Optionally support to check wether the value was stored after the given
         time to be valid (useful for comparing with file modification times).
         """
-        
+
+        family = getFamily(key)
+        originalKey = key
+
         if self.__hashkeys:
-            key = hashlib.sha1(key.encode("ascii")).hexdigest()
+            key = hashlib.sha1(key.encode("utf-8")).hexdigest()
 
         if key in self.__transient:
-            return self.__transient[key]
-        
-        timeKey = key + "-timestamp"
-        if key in self.__shelve and timeKey in self.__shelve:
-            if not timestamp or timestamp <= self.__shelve[timeKey]:
-                value = self.__shelve[key]
-                
-                # Useful to debug serialized size. Often a performance
-                # issue when data gets to big.
-                # rePacked = pickle.dumps(value)
-                # print("LEN: %s = %s" % (key, len(rePacked)))
-                
-                # Copy over value to in-memory cache
-                if inMemory:
-                    self.__transient[key] = value
-
-                return value
-                
+            self.__accessed.add(key)
+            self.__statistics.hit(family, memory=True)
+            return self.__transient.get(key, family)
+
+        entry = self.__db.get(key)
+        if entry is not None:
+            storedTime, data = entry
+            if not timestamp or timestamp <= storedTime:
+                start = time.time()
+                try:
+                    value, size = decodeValue(data)
+                except decodeErrors as error:
+                    Console.debug("Dropping undecodable cache entry %s: %s" % (originalKey, error))
+                    self.__db.delete(key)
+                else:
+                    self.__statistics.hit(family, size=len(data), duration=time.time()-start)
+                    self.__statistics.trackSize(originalKey, len(data))
+                    self.__accessed.add(key)
+
+                    # Copy over value to in-memory cache
+                    if inMemory:
+                        self.__transient.put(key, value, family, size)
+
+                    return value
+
+        self.__statistics.miss(family, stale=entry is not None)
         return None
-        
-    
-    def store(self, key, value, timestamp=None, transient=False, inMemory=True):
+
+
+    def store(self, key, value, timestamp=None, transient=False, inMemory=True, size=None):
         """
         Stores the given value.
         Default timestamp goes to the current time. Can be modified
         to the time of an other files modification date etc.
-        Transient enables in-memory cache for the given value
+        Transient enables in-memory cache for the given value. The size
+        of transient values is estimated when not given.
         """
-        
+
+        family = getFamily(key)
+        originalKey = key
+
         if self.__hashkeys:
-            key = hashlib.sha1(key.encode("ascii")).hexdigest()
-        
-        if inMemory:
-            self.__transient[key] = value
+            key = hashlib.sha1(key.encode("utf-8")).hexdigest()
 
         if transient:
+            if inMemory:
+                self.__transient.put(key, value, family, size)
+
             return
-        
+
         if not timestamp:
             timestamp = time.time()
-        
+
         try:
-            self.__shelve[key+"-timestamp"] = timestamp
-            self.__shelve[key] = value
+            start = time.time()
+            data, size = encodeValue(value, self.__compressionLevel, self.__compressionThreshold)
+            self.__statistics.write(family, originalKey, len(data), time.time()-start)
         except pickle.PicklingError as err:
             Console.error("Failed to store enty: %s" % key)
 
-        
+            if inMemory:
+                self.__transient.put(key, value, family)
+
+            return
+
+        if inMemory:
+            self.__transient.put(key, value, family, size)
+        else:
+            self.__transient.remove(key)
+
+        self.__db.put(key, timestamp, data, self.__build)
+
+
+    def keys(self):
+        """Returns a list of all stored keys (excluding internal ones)"""
+
+        return [key for key in self.__db.keys() if not key.startswith("jasy-")]
+
+
+    def readRaw(self, key):
+        """Returns a tuple of (timestamp, data) with the encoded data of the given key or None"""
+
+        return self.__db.get(key)
+
+
+    def storeRaw(self, key, data, timestamp=None):
+        """Stores already encoded data (see encodeValue) under the given key"""
+
+        if not timestamp:
+            timestamp = time.time()
+
+        self.__transient.remove(key)
+        self.__db.put(key, timestamp, data, self.__build)
+
+
+    def collect(self, builds=None, validate=None):
+        """
+        Removes outdated entries and compacts the cache file afterwards.
+        Returns a dict with the number of bytes reclaimed per key family.
+
+        - builds: Removes entries which were not accessed during the last N builds
+        - validate: Callback receiving key and timestamp of each entry. Entries are removed when it returns False.
+        """
+
+        self.__flushAccess()
+
+        reclaimed = {}
+        for key, timestamp, access, size in self.__db.entries():
+            if key.startswith("jasy-"):
+                continue
+
+            if builds is not None and (access or 0) <= self.__build - builds:
+                pass
+            elif validate is not None and not validate(key, timestamp):
+                pass
+            else:
+                continue
+
+            self.__db.delete(key)
+            self.__transient.remove(key)
+
+            family = getFamily(key)
+            reclaimed[family] = reclaimed.get(family, 0) + size
+
+        self.__db.compact()
+
+        return reclaimed
+
+
+    def __flushAccess(self):
+        if self.__accessed:
+            self.__db.touch(self.__accessed, self.__build)
+            self.__accessed = set()
+
+
+    def getStatistics(self):
+        """
+        Returns a JSON compatible dict with usage statistics of this cache instance:
+
+        - families: hits, misses, stale entries, bytes read/written and (de)serialization time per key family
+        - largest: the largest entries (serialized size) read or written
+        """
+
+        return self.__statistics.export()
+
+
+    def getVersion(self, family):
+        """Returns the version of the components producing entries of the given key family (or None)"""
+
+        if self.__versions is None:
+            return None
+
+        return self.__versions.get(family)
+
+
+    def isConcurrent(self):
+        """Whether other processes are able to use the cache file at the same time"""
+
+        return self.__backend.concurrent
+
+
     def sync(self):
         """ Syncs the internal storage database """
-        
-        if self.__shelve is not None:
-            self.__shelve.sync() 
-      
-      
+
+        if self.__db is not None:
+            self.__flushAccess()
+            self.__db.sync()
+
+
     def close(self):
         """ Closes the internal storage database """
-        
-        if self.__shelve is not None:
-            self.__shelve.close()  
-            self.__shelve = None
 
-      
+        if self.__db is not None:
+            self.__flushAccess()
+            self.__db.close()
+            self.__db = None
+
+
@@ -0,0 +1,402 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+"""
+Storage backends for jasy.core.Cache.
+
+Every backend stores a binary blob together with a timestamp and the number
+of the last build which accessed the entry in one single record per key.
+Serialization of values is handled by the cache itself so that the backends
+only deal with raw bytes.
+"""
+
+import os, struct, dbm, threading
+
+import jasy.core.Console as Console
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+
+__all__ = ["SqliteBackend", "DbmBackend", "getBackend"]
+
+
+class SqliteBackend:
+    """
+    Stores entries inside a SQLite database running in WAL mode. Multiple processes
+    are able to use the same database at once: readers never block and writers are
+    serialized by SQLite.
+
+    Writes are collected in memory and written in one short transaction on sync() or
+    whenever the size of the pending data reaches the configured limit. This keeps the
+    database write lock free for other processes while a build is running.
+    """
+
+    # File extension of the database file
+    extension = ".sqlite"
+
+    # Whether multiple processes are able to use the same database at once
+    concurrent = True
+
+    # Size of pending data in bytes after which pending writes are committed automatically
+    pendingBytes = 16 * 1024 * 1024
+
+    # Seconds to wait for locks held by other processes
+    timeout = 30
+
+    # Seconds to wait for other processes before compaction is skipped
+    compactTimeout = 5
+
+    def __init__(self, fileName):
+        self.__fileName = fileName + self.extension
+        self.__db = None
+
+        # Pending writes: key => (timestamp, access, data) or None for deletions
+        self.__pending = {}
+        self.__pendingSize = 0
+
+        # Pending access updates: key => access build number
+        self.__touched = {}
+
+        # The HTTP server accesses the same cache from different worker threads
+        self.__lock = threading.RLock()
+
+        try:
+            self.__connect()
+        except sqlite3.DatabaseError as dberror:
+            Console.error("Could not open cache database %s: %s", self.__fileName, dberror)
+            Console.warn("Recreating cache database...")
+            self.__recreate()
+
+
+    def __connect(self):
+        db = sqlite3.connect(self.__fileName, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, timestamp REAL, access INTEGER, value BLOB)")
+
+        self.__db = db
+
+
+    def __recreate(self):
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
+
+        for postfix in ("", "-wal", "-shm"):
+            if os.path.exists(self.__fileName + postfix):
+                os.remove(self.__fileName + postfix)
+
+        self.__connect()
+
+
+    def get(self, key):
+        """Returns a tuple of (timestamp, data) for the given key or None"""
+
+        with self.__lock:
+            if key in self.__pending:
+                entry = self.__pending[key]
+                return None if entry is None else (entry[0], entry[2])
+
+            return self.__db.execute("SELECT timestamp, value FROM cache WHERE key=?", (key,)).fetchone()
+
+
+    def put(self, key, timestamp, data, access=0):
+        """Stores the given data with the given timestamp and access build number"""
+
+        with self.__lock:
+            self.__forget(key)
+            self.__pending[key] = (timestamp, access, data)
+            self.__pendingSize += len(data)
+
+            if self.__pendingSize >= self.pendingBytes:
+                self.sync()
+
+
+    def __forget(self, key):
+        """Subtracts the size of the pending write of the given key"""
+
+        entry = self.__pending.get(key)
+        if entry is not None:
+            self.__pendingSize -= len(entry[2])
+
+
+    def touch(self, keys, access):
+        """Updates the access build number of the given keys"""
+
+        with self.__lock:
+            for key in keys:
+                self.__touched[key] = access
+
+
+    def delete(self, key):
+        """Removes the given key from the database"""
+
+        with self.__lock:
+            self.__forget(key)
+            self.__pending[key] = None
+
+
+    def keys(self):
+        """Returns a list of all stored keys"""
+
+        with self.__lock:
+            self.sync()
+            return [row[0] for row in self.__db.execute("SELECT key FROM cache")]
+
+
+    def entries(self):
+        """Returns a list of (key, timestamp, access, size) tuples of all stored entries"""
+
+        with self.__lock:
+            self.sync()
+            return self.__db.execute("SELECT key, timestamp, access, length(value) FROM cache").fetchall()
+
+
+    def sync(self):
+        """Writes all pending changes in one transaction"""
+
+        with self.__lock:
+            if not self.__pending and not self.__touched:
+                return
+
+            stores = [(key, entry[0], entry[1], entry[2]) for key, entry in self.__pending.items() if entry is not None]
+            deletes = [(key,) for key, entry in self.__pending.items() if entry is None]
+            touches = [(access, key) for key, access in self.__touched.items()]
+
+            # Acquire the write lock immediately to fail early (after the timeout) instead of deadlocking
+            self.__db.execute("BEGIN IMMEDIATE")
+            try:
+                self.__db.executemany("INSERT OR REPLACE INTO cache (key, timestamp, access, value) VALUES (?, ?, ?, ?)", stores)
+                self.__db.executemany("DELETE FROM cache WHERE key=?", deletes)
+                self.__db.executemany("UPDATE cache SET access=? WHERE key=?", touches)
+            except:
+                self.__db.execute("ROLLBACK")
+                raise
+
+            self.__db.execute("COMMIT")
+
+            self.__pending = {}
+            self.__pendingSize = 0
+            self.__touched = {}
+
+
+    def compact(self):
+        """
+        Writes pending changes and rebuilds the database file to reclaim unused space. Requires
+        exclusive access and is skipped while other processes are writing to the database.
+        Returns whether the database was compacted.
+        """
+
+        with self.__lock:
+            self.sync()
+
+            self.__db.execute("PRAGMA busy_timeout=%i" % (self.compactTimeout * 1000))
+            try:
+                self.__db.execute("VACUUM")
+                self.__db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+            except sqlite3.OperationalError as error:
+                if not "locked" in str(error) and not "busy" in str(error):
+                    raise
+
+                Console.warn("Skipping compaction of %s as it is used by another process: %s", self.__fileName, error)
+                return False
+
+            finally:
+                self.__db.execute("PRAGMA busy_timeout=%i" % (self.timeout * 1000))
+
+            return True
+
+
+    def close(self):
+        """Writes pending changes and closes the database"""
+
+        with self.__lock:
+            if self.__db is not None:
+                self.sync()
+                self.__db.close()
+                self.__db = None
+
+
+    def clear(self):
+        """Removes all entries. Keeps the database file so that other processes are able to continue using it."""
+
+        with self.__lock:
+            self.__pending = {}
+            self.__pendingSize = 0
+            self.__touched = {}
+
+            if self.__db is None:
+                self.__recreate()
+            else:
+                self.__db.execute("BEGIN IMMEDIATE")
+                self.__db.execute("DELETE FROM cache")
+                self.__db.execute("COMMIT")
+
+
+
+class DbmBackend:
+    """
+    Stores entries inside a dbm database (the storage used by previous versions of Jasy).
+    Timestamp, access build number and data are packed into one record.
+    """
+
+    # File name postfix of the database file (the dbm module might add its own extension)
+    extension = ".dbm"
+
+    # Whether multiple processes are able to use the same database at once
+    concurrent = False
+
+    __header = struct.Struct("<dI")
+
+    def __init__(self, fileName):
+        self.__fileName = fileName + self.extension
+        self.__db = None
+
+        try:
+            self.__db = dbm.open(self.__fileName, "c")
+
+        except dbm.error as dbmerror:
+            errno = None
+            try:
+                errno = dbmerror.errno
+            except:
+                pass
+
+            if errno == 35:
+                raise IOError("Cache file is locked by another process!")
+
+            elif "type could not be determined" in str(dbmerror):
+                Console.error("Could not detect cache file format: %s" % self.__fileName)
+                Console.warn("Recreating cache database...")
+                self.clear()
+
+            elif "module is not available" in str(dbmerror):
+                Console.error("Unsupported cache file format: %s" % self.__fileName)
+                Console.warn("Recreating cache database...")
+                self.clear()
+
+            else:
+                raise dbmerror
+
+
+    def get(self, key):
+        """Returns a tuple of (timestamp, data) for the given key or None"""
+
+        try:
+            record = self.__db[key]
+        except KeyError:
+            return None
+
+        return self.__header.unpack_from(record)[0], record[self.__header.size:]
+
+
+    def put(self, key, timestamp, data, access=0):
+        """Stores the given data with the given timestamp and access build number"""
+
+        self.__db[key] = self.__header.pack(timestamp, access) + data
+
+
+    def touch(self, keys, access):
+        """Updates the access build number of the given keys"""
+
+        for key in keys:
+            try:
+                record = self.__db[key]
+            except KeyError:
+                continue
+
+            timestamp = self.__header.unpack_from(record)[0]
+            self.__db[key] = self.__header.pack(timestamp, access) + record[self.__header.size:]
+
+
+    def delete(self, key):
+        """Removes the given key from the database"""
+
+        try:
+            del self.__db[key]
+        except KeyError:
+            pass
+
+
+    def keys(self):
+        """Returns a list of all stored keys"""
+
+        return [key.decode("utf-8") for key in self.__db.keys()]
+
+
+    def entries(self):
+        """Returns a list of (key, timestamp, access, size) tuples of all stored entries"""
+
+        result = []
+        for key in self.__db.keys():
+            record = self.__db[key]
+            timestamp, access = self.__header.unpack_from(record)
+            result.append((key.decode("utf-8"), timestamp, access, len(record) - self.__header.size))
+
+        return result
+
+
+    def sync(self):
+        """Writes all pending changes to disk"""
+
+        if self.__db is not None and hasattr(self.__db, "sync"):
+            self.__db.sync()
+
+
+    def compact(self):
+        """
+        Reorganizes the database file to reclaim unused space (when supported by the dbm implementation).
+        Returns whether the database was compacted.
+        """
+
+        if hasattr(self.__db, "reorganize"):
+            self.__db.reorganize()
+            return True
+
+        return False
+
+
+    def close(self):
+        """Closes the database"""
+
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
+
+
+    def clear(self):
+        """Clears the database through re-creation of the file"""
+
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
+
+        self.__db = dbm.open(self.__fileName, "n")
+
+
+
+def getBackend(name=None):
+    """
+    Returns the backend class for the given name. Uses SQLite by default and
+    falls back to dbm when Python was compiled without SQLite support.
+    """
+
+    if name is None:
+        name = "sqlite" if sqlite3 is not None else "dbm"
+
+    if name == "sqlite":
+        if sqlite3 is None:
+            raise IOError("SQLite is not supported by this Python installation!")
+
+        return SqliteBackend
+
+    elif name == "dbm":
+        return DbmBackend
+
+    raise IOError("Unsupported cache backend: %s" % name)
@@ -6,6 +6,8 @@
 import os
 
 import jasy.core.Console as Console
+import jasy.core.Warmup as Warmup
+import jasy.js.clean.DeadMembers as DeadMembers
 
 from jasy.core.Permutation import getPermutation
 from jasy.item.Class import ClassError
@@ -39,13 +41,37 @@ def packCode(code):
 
 class OutputManager:
 
-    def __init__(self, session, assetManager=None, compressionLevel=1, formattingLevel=0):
+    def __init__(self, session, assetManager=None, compressionLevel=1, formattingLevel=0, remoteCache=None, remoteToken=None, workers=None, deadMembers=False, keepMembers=None, prescan=False):
 
         Console.info("Initializing OutputManager...")
         Console.indent()
         Console.info("Formatting Level: %s", formattingLevel)
         Console.info("Compression Level: %s", compressionLevel)
 
+        # Number of processes used for processing classes which are not cached yet (see jasy.core.Warmup)
+        self.__workers = Warmup.getWorkers(workers)
+        Console.info("Processes: %s", self.__workers)
+
+        # Optional remote cache (URL of a "cache" route of a Jasy server) for sharing compressed code
+        if remoteCache:
+            Console.info("Remote Cache: %s", remoteCache)
+
+            from jasy.http.RemoteCache import RemoteCache
+            self.__remoteCache = RemoteCache(remoteCache, token=remoteToken)
+        else:
+            self.__remoteCache = None
+
+        # Optional whole-program removal of members which are not referenced by any class (see jasy.js.clean.DeadMembers)
+        self.__deadMembers = deadMembers
+        self.__keepMembers = keepMembers
+        if deadMembers:
+            Console.info("Dead Members: removed (keeping %s)", ", ".join(keepMembers) if keepMembers else "none")
+
+        # Optional dependency extraction from the token stream for loader builds (see jasy.js.Prescanner)
+        self.__prescan = prescan
+        if prescan:
+            Console.info("Dependencies: pre-scanned")
+
         self.__session = session
 
         self.__assetManager = assetManager
@@ -67,6 +93,9 @@ class OutputManager:
             self.__scriptOptimization.enable("blocks")
             self.__scriptOptimization.enable("privates")
 
+        if compressionLevel > 2:
+            self.__scriptOptimization.enable("names")
+
         self.__scriptFormatting = Formatting()
 
         if formattingLevel > 0:
@@ -89,7 +118,7 @@ class OutputManager:
         Console.info("Deploying assets...")
         Console.indent()
 
-        resolver = Resolver(self.__session)
+        resolver = Resolver(self.__session, prescan=self.__prescan)
 
         for className in classes:
             resolver.addClassName(className)
@@ -99,7 +128,90 @@ class OutputManager:
         Console.outdent()
 
 
-    def storeKernel(self, fileName, classes=None, debug=False):
+    def getSortedClasses(self, classes):
+        """
+        Resolves the dependencies of the given classes and returns the sorted list of all included classes
+        e.g. for passing them to storeLoader(). Uses the pre-scanner when enabled.
+
+        :param classes: List of class names to resolve
+        :type classes: list
+        """
+
+        resolver = Resolver(self.__session, prescan=self.__prescan)
+
+        for className in classes:
+            resolver.addClassName(className)
+
+        return resolver.getSortedClasses()
+
+
+    def warmup(self, classes, removed=None):
+        """
+        Processes the given classes for the current permutation and translation in parallel. Fills the caches
+        with the compressed code of the classes (and all data required for resolving dependencies).
+        Automatically executed by storeCompressed(). Returns the number of processed classes.
+
+        :param classes: List of classes to process
+        :type classes: list
+        :param removed: Class IDs mapped to the names of their members to remove (see getRemovedMembers())
+        :type removed: dict
+        """
+
+        permutation = self.__session.getCurrentPermutation()
+        translation = self.__session.getCurrentTranslationBundle()
+
+        return Warmup.warmup(classes, permutation, translation, self.__scriptOptimization, self.__scriptFormatting, workers=self.__workers, removed=removed)
+
+
+    def getRemovedMembers(self, classes, program=None, generated=None):
+        """
+        Returns a dict of class ID => tuple of the names of the members of the given classes which are not
+        referenced by any class of the program or by the generated code for the current permutation. Member
+        usage is cached per class and permutation (see jasy.item.Class.ClassItem.getMembers()).
+
+        :param classes: List of classes to remove members from
+        :type classes: list
+        :param program: List of all classes of the program (defaults to the given classes)
+        :type program: list
+        :param generated: List of generated code which is executed together with the classes
+        :type generated: list
+        """
+
+        permutation = self.__session.getCurrentPermutation()
+
+        datas = []
+        for classObj in set(classes).union(program or ()):
+            if classObj.kind == "class":
+                datas.append(classObj.getMembers(permutation))
+
+        if generated:
+            for code in generated:
+                datas.append(DeadMembers.collect(parse(code)))
+
+        computed = DeadMembers.getComputed(datas)
+        if computed:
+            Console.warn("Keeping all members! Members are accessed with computed keys (e.g. this[name] or obj[\"get\" + name]) by:")
+            Console.indent()
+            for data in computed:
+                Console.warn("- %s: %s accesses, first at line %s", data.className or "generated code", len(data.computed), data.computed[0])
+            Console.outdent()
+
+        live = DeadMembers.getLive(datas, self.__keepMembers)
+
+        removed = {}
+        count = 0
+        for classObj in classes:
+            if classObj.kind == "class":
+                names = DeadMembers.getRemoved(classObj.getMembers(permutation), live, self.__keepMembers)
+                if names:
+                    removed[classObj.getId()] = names
+                    count += len(names)
+
+        Console.info("Removing %s unused members of %s classes", count, len(removed))
+        return removed
+
+
+    def storeKernel(self, fileName, classes=None, debug=False, program=None):
         """
         Writes a so-called kernel script to the given location. This script contains
         data about possible permutations based on current session values. It optionally
@@ -110,6 +222,9 @@ class OutputManager:
         
         This method returns the classes which are included by the script so you can 
         exclude it from the real other generated output files.
+
+        With dead members enabled, unused members are only removed from the kernel classes
+        when the names of the main classes of the program using the kernel are given (program).
         """
         
         Console.info("Storing kernel...")
@@ -147,7 +262,26 @@ class OutputManager:
 
         # Sort resulting class list
         sortedClasses = resolver.getSortedClasses()
-        self.storeCompressed(sortedClasses, fileName, bootCode)
+
+        # Members of the kernel classes might be used by all classes of the program
+        if self.__deadMembers and program:
+            programResolver = Resolver(self.__session)
+            for className in program:
+                programResolver.addClassName(className)
+
+            self.storeCompressed(sortedClasses, fileName, bootCode, programResolver.getIncludedClasses())
+
+        elif self.__deadMembers:
+            Console.info("Keeping all members of kernel classes (no program given)")
+
+            self.__deadMembers = False
+            try:
+                self.storeCompressed(sortedClasses, fileName, bootCode)
+            finally:
+                self.__deadMembers = True
+
+        else:
+            self.storeCompressed(sortedClasses, fileName, bootCode)
         
         # Remember classes for filtering in storeLoader/storeCompressed
         self.__kernelClasses = set(sortedClasses)
@@ -158,7 +292,7 @@ class OutputManager:
         Console.outdent()
 
 
-    def storeCompressed(self, classes, fileName, bootCode=None):
+    def storeCompressed(self, classes, fileName, bootCode=None, program=None):
         """
         Combines the compressed result of the stored class list
         
@@ -168,6 +302,8 @@ class OutputManager:
         :type fileName: string
         :param bootCode: Code to execute once all the classes are loaded
         :type bootCode: string
+        :param program: All classes of the program used for removing dead members (defaults to the given classes)
+        :type program: list
         """
 
         if self.__kernelClasses:
@@ -178,26 +314,58 @@ class OutputManager:
         Console.info("Compressing %s classes...", len(filtered))
         Console.indent()
         result = []
+        generated = [bootCode] if bootCode else []
 
         if self.__assetManager:
             assetData = self.__assetManager.export(filtered)
             if assetData:
                 assetCode = "jasy.Asset.addData(%s);" % assetData
+                generated.append(assetCode)
                 if self.__compressGeneratedCode:
                     result.append(packCode(assetCode))
                 else:
                     result.append(assetCode)
 
         permutation = self.__session.getCurrentPermutation()
+        translation = self.__session.getCurrentTranslationBundle()
+
+        # Members which are not used by any class of the program (and the generated code)
+        if self.__deadMembers:
+            removed = self.getRemovedMembers(filtered, list(classes) + list(program or ()), generated)
+        else:
+            removed = {}
+
+        # Fetch all classes which are not available locally in one go from the remote cache
+        remoteKeys = None
+        if self.__remoteCache and self.__remoteCache.isAvailable():
+            remoteKeys = {}
+            for classObj in filtered:
+                names = removed.get(classObj.getId())
+                if not classObj.hasCompressed(permutation, translation, self.__scriptOptimization, self.__scriptFormatting, names):
+                    remoteKeys[classObj.getCompressedKey(permutation, translation, self.__scriptOptimization, self.__scriptFormatting, names)] = classObj
+
+            if remoteKeys:
+                fetched = self.__remoteCache.get(remoteKeys)
+                Console.info("Fetched %s of %s classes from remote cache", len(fetched), len(remoteKeys))
+
+                for key in fetched:
+                    classObj = remoteKeys.pop(key)
+                    classObj.setCompressed(fetched[key], permutation, translation, self.__scriptOptimization, self.__scriptFormatting, removed.get(classObj.getId()))
+
+        # Process classes which are not cached yet in parallel
+        self.warmup(filtered, removed)
 
         try:
             for classObj in filtered:
-                result.append(classObj.getCompressed(permutation, 
-                    self.__session.getCurrentTranslationBundle(), self.__scriptOptimization, self.__scriptFormatting))
+                result.append(classObj.getCompressed(permutation, translation, self.__scriptOptimization, self.__scriptFormatting, removed=removed.get(classObj.getId())))
                 
         except ClassError as error:
             raise UserError("Error during class compression! %s" % error)
 
+        # Share locally compressed classes
+        if remoteKeys:
+            self.__remoteCache.put({ key : remoteKeys[key].getCompressed(permutation, translation, self.__scriptOptimization, self.__scriptFormatting, removed=removed.get(remoteKeys[key].getId())) for key in remoteKeys })
+
         Console.outdent()
 
         if bootCode:
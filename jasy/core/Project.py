@@ -31,6 +31,9 @@ translationExtensions = (".po", ".xlf", ".properties", ".txt")
 docFiles = ("package.md", "readme.md")
 repositoryFolder = re.compile(r"^([a-zA-Z0-9\.\ _-]+)-([a-f0-9]{40})$")
 
+# Default memory budget of the in-memory cache layer in megabytes
+defaultCacheMemory = 1024
+
 
 projects = {}
 
@@ -141,13 +144,22 @@ class Project():
         self.__config = Config.Config(config)
         self.__config.loadValues(os.path.join(self.__path, "jasyproject"), optional=True)
 
-        # Initialize cache
+        # Initialize cache (memory limit of in-memory layer is configured in megabytes)
+        memoryLimit = self.__config.get("cache.memory") or defaultCacheMemory
+        compressionLevel = self.__config.get("cache.compression")
+        if compressionLevel is None:
+            compressionLevel = jasy.core.Cache.defaultCompressionLevel
+
         try:
             File.mkdir(os.path.join(self.__path, ".jasy"))
-            self.__cache = jasy.core.Cache.Cache(self.__path, filename=".jasy/cache")
+            self.__cache = jasy.core.Cache.Cache(self.__path, filename=".jasy/cache", memoryLimit=memoryLimit * 1024 * 1024, 
+                compressionLevel=compressionLevel, versions=jasy.item.Class.cacheVersions)
         except IOError as err:
             raise UserError("Could not initialize project. Cache file in %s could not be initialized! %s" % (self.__path, err))
         
+        # Whether cache entries of items are keyed by content hash instead of modification time
+        self.__contentCache = bool(self.__config.get("cache.content", False))
+
         # Detect version changes
         if version is None:
             self.__modified = True
@@ -536,12 +548,137 @@ class Project():
         
         return self.__cache
     
+    def hasContentCache(self):
+        """Whether item cache entries are keyed by content hash instead of modification time"""
+
+        return self.__contentCache
+
     def clean(self):
         """Clears the cache of the project"""
         
         Console.info("Clearing cache of %s..." % self.__name)
         self.__cache.clear()
         
+    def __getCacheItem(self, key):
+        """
+        Returns a tuple of the item the given cache key belongs to (or None) and the content hash
+        the key is bound to (or None when the entry is validated by modification time).
+        Returns False for the item when the key does not belong to any item at all.
+        """
+
+        start = key.find("[")
+        end = key.find("]")
+        if start == -1 or end == -1 or key.startswith("project[") or key.startswith("checksum["):
+            return False, None
+
+        itemId = key[start+1:end]
+        item = self.classes.get(itemId) or self.docs.get(itemId)
+        contentHash = key[key.rfind("@")+1:] if "@" in key[end:] else None
+
+        return item, contentHash
+
+    def collect(self, builds=None):
+        """
+        Removes cache entries of items which no longer exist, entries which are outdated
+        compared to their source and (optionally) entries not used during the last N builds.
+        Compacts the cache file afterwards and prints the reclaimed bytes per key family.
+        """
+
+        Console.info("Collecting cache of %s...", self.__name)
+        Console.indent()
+
+        if not self.scanned:
+            self.scan()
+
+        contentCache = self.__contentCache
+
+        def validate(key, timestamp):
+            if key.startswith("checksum["):
+                return os.path.exists(key[len("checksum["):-1])
+
+            item, contentHash = self.__getCacheItem(key)
+            if item is False:
+                return True
+            elif item is None:
+                return False
+            elif contentHash is not None:
+                return contentCache and contentHash == item.getContentHash()
+            else:
+                return not contentCache and timestamp >= item.getModificationTime()
+
+        reclaimed = self.__cache.collect(builds=builds, validate=validate)
+
+        if reclaimed:
+            for family in sorted(reclaimed):
+                Console.info("%s: %s bytes", family, reclaimed[family])
+
+            Console.info("Reclaimed %s bytes in total", sum(reclaimed.values()))
+        else:
+            Console.info("Nothing to reclaim")
+
+        Console.outdent()
+
+        return reclaimed
+
+    def exportCache(self):
+        """
+        Returns a list of (key, data) tuples with all valid cache entries of the items of the project.
+        Keys are bound to the content hash of the item instead of modification times so that the
+        entries are portable between different machines and checkouts.
+        """
+
+        if not self.scanned:
+            self.scan()
+
+        self.__cache.sync()
+
+        result = []
+        for key in self.__cache.keys():
+            item, contentHash = self.__getCacheItem(key)
+            if not item:
+                continue
+
+            entry = self.__cache.readRaw(key)
+            if entry is None:
+                continue
+
+            timestamp, data = entry
+            if contentHash is None:
+                if timestamp < item.getModificationTime():
+                    continue
+
+                key = "%s@%s" % (key, item.getContentHash())
+
+            elif contentHash != item.getContentHash():
+                continue
+
+            result.append((key, data))
+
+        return result
+
+    def importCache(self, entries):
+        """
+        Imports the given list of (key, data) tuples as created by exportCache().
+        Only imports entries matching the current content of the items. Returns the number of imported entries.
+        """
+
+        if not self.scanned:
+            self.scan()
+
+        count = 0
+        for key, data in entries:
+            item, contentHash = self.__getCacheItem(key)
+            if not item or contentHash != item.getContentHash():
+                continue
+
+            if not self.__contentCache:
+                key = key[:key.rfind("@")]
+
+            self.__cache.storeRaw(key, data)
+            count += 1
+
+        return count
+
     def close(self):
         """Closes the project which deletes the internal caches"""
         
@@ -554,15 +691,28 @@ class Project():
         self.docs = None
         self.translations = None
         
+    def sync(self):
+        """Writes pending cache changes to disk"""
+
+        if self.__cache:
+            self.__cache.sync()
+
     def pause(self):
-        """Pauses the project so that other processes could modify/access it"""
+        """
+        Pauses the project so that other processes could modify/access it. Caches which
+        support concurrent access only write down their pending changes.
+        """
         
-        self.__cache.close()
+        if self.__cache.isConcurrent():
+            self.__cache.sync()
+        else:
+            self.__cache.close()
         
     def resume(self):
         """Resumes the paused project"""
         
-        self.__cache.open()
+        if not self.__cache.isConcurrent():
+            self.__cache.open()
 
 
 
@@ -3,8 +3,10 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
-import itertools, time, atexit, json, os
+import itertools, time, atexit, json, os, pickle, zipfile
 
+import jasy
+import jasy.core.Cache
 import jasy.core.Locale
 import jasy.core.Config
 import jasy.core.Project
@@ -12,6 +14,7 @@ import jasy.core.Permutation
 
 import jasy.asset.Manager
 import jasy.item.Translation
+import jasy.item.Class
 
 from jasy import UserError
 import jasy.core.Console as Console
@@ -99,6 +102,99 @@ class Session():
         Console.outdent()
 
 
+    def collect(self, builds=None):
+        """
+        Removes outdated entries from the caches of all registered projects and compacts the cache files.
+        Optionally removes all entries which were not used during the last N builds.
+        """
+
+        if not self.__projects:
+            return
+
+        Console.info("Collecting cache entries...")
+        Console.indent()
+
+        for project in self.__projects:
+            project.collect(builds)
+
+        Console.outdent()
+
+
+    def exportCache(self, fileName):
+        """
+        Exports the caches of all registered projects into the given archive file. Entries are
+        bound to the content hashes of the items and the versions of the components which produced
+        them (but not to the host or file modification times). This way the archive could be used on other machines e.g.
+        for warm starts on fresh checkouts.
+        """
+
+        if not self.__projects:
+            return
+
+        Console.info("Exporting cache to %s...", fileName)
+        Console.indent()
+
+        manifest = {
+            "version" : jasy.__version__,
+            "versions" : jasy.item.Class.cacheVersions,
+            "projects" : {}
+        }
+
+        archive = zipfile.ZipFile(fileName, "w", zipfile.ZIP_STORED)
+
+        for project in self.__projects:
+            name = project.getName()
+            entries = project.exportCache()
+            Console.info("%s: %s entries", name, len(entries))
+
+            # Values are already compressed by the cache itself
+            archive.writestr("projects/%s" % name, pickle.dumps(entries, pickle.HIGHEST_PROTOCOL))
+            manifest["projects"][name] = len(entries)
+
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+        archive.close()
+
+        Console.outdent()
+
+
+    def importCache(self, fileName):
+        """Imports the cache entries of the given archive (see exportCache()) into the registered projects."""
+
+        if not self.__projects:
+            return
+
+        if not os.path.exists(fileName):
+            raise UserError("Cache archive %s does not exist!" % fileName)
+
+        Console.info("Importing cache from %s...", fileName)
+        Console.indent()
+
+        archive = zipfile.ZipFile(fileName, "r")
+        manifest = json.loads(archive.read("manifest.json").decode("utf-8"))
+
+        # Entries produced by components in other versions are ignored
+        versions = jasy.item.Class.cacheVersions
+        outdated = set([family for family in versions if manifest["versions"].get(family) != versions[family]])
+        if outdated:
+            Console.info("Ignoring outdated entries: %s", ", ".join(sorted(outdated)))
+
+        for project in self.__projects:
+            name = project.getName()
+            if not name in manifest["projects"]:
+                Console.debug("%s: No entries available", name)
+                continue
+
+            entries = pickle.loads(archive.read("projects/%s" % name))
+            count = project.importCache([entry for entry in entries if not jasy.core.Cache.getFamily(entry[0]) in outdated])
+            project.sync()
+
+            Console.info("%s: Imported %s of %s entries", name, count, len(entries))
+
+        archive.close()
+
+        Console.outdent()
+
+
     def close(self):
         """Closes the session and stores cache to the harddrive."""
 
@@ -116,10 +212,84 @@ class Session():
         Console.outdent()
     
     
+    def sync(self):
+        """Writes pending cache changes of all registered projects to disk."""
+
+        if not self.__projects:
+            return
+
+        for project in self.__projects:
+            project.sync()
+
+
+    def getCacheStatistics(self):
+        """
+        Returns a JSON compatible dict with cache usage statistics of all registered projects.
+        Contains the statistics of each project, the totals per key family and the largest entries.
+        """
+
+        projects = {}
+        families = {}
+        largest = []
+
+        for project in self.__projects or []:
+            name = project.getName()
+            statistics = project.getCache().getStatistics()
+            projects[name] = statistics
+
+            for family, counters in statistics["families"].items():
+                if not family in families:
+                    families[family] = dict(counters)
+                else:
+                    for counter in counters:
+                        families[family][counter] += counters[counter]
+
+            for entry in statistics["largest"]:
+                largest.append({ "project" : name, "key" : entry["key"], "bytes" : entry["bytes"] })
+
+        largest.sort(key=lambda entry: entry["bytes"], reverse=True)
+
+        return {
+            "projects" : projects,
+            "families" : families,
+            "largest" : largest[:10]
+        }
+
+
+    def printCacheStatistics(self):
+        """Prints cache usage statistics of all registered projects"""
+
+        statistics = self.getCacheStatistics()
+
+        Console.info("Cache usage per key family:")
+        Console.indent()
+
+        families = statistics["families"]
+        for family in sorted(families):
+            counters = families[family]
+            Console.info("%s: %s hits (%s in memory), %s misses (%s stale), %s writes, %s bytes read in %.3fs, %s bytes written in %.3fs",
+                Console.colorize(family, "bold"), counters["hits"], counters["memoryHits"], counters["misses"], counters["stale"],
+                counters["writes"], counters["bytesRead"], counters["readTime"], counters["bytesWritten"], counters["writeTime"])
+
+        Console.outdent()
+
+        if statistics["largest"]:
+            Console.info("Largest entries:")
+            Console.indent()
+
+            for entry in statistics["largest"]:
+                Console.info("%s: %s bytes (%s)", entry["key"], entry["bytes"], entry["project"])
+
+            Console.outdent()
+
+
     def pause(self):
         """
         Pauses the session. This release cache files etc. and makes 
         it possible to call other jasy processes on the same projects.
+
+        Not required for caches supporting concurrent access (default), these
+        only write down their pending changes.
         """
         
         Console.info("Pausing session...")
@@ -596,6 +766,9 @@ class Session():
             self.__currentTranslationBundle = self.__generateTranslationBundle()
             
             yield current
+
+            # Permutations are a natural phase boundary for flushing cache changes
+            self.sync()
             Console.outdent()
 
         Console.outdent()
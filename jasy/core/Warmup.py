@@ -0,0 +1,170 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+"""
+Parallel processing of classes for filling the project caches e.g. on cold builds.
+
+Parsing, scope scanning, permutation patching, cleanups, optimization and compression of each class
+are executed by a pool of worker processes. Workers process the classes without access to the
+project caches and send back the picklable results (meta data, scope data, fields, translations,
+compressed code and sizes). These are stored in the project caches by the main process.
+"""
+
+import os, logging, concurrent.futures
+
+import jasy.core.Cache
+import jasy.core.Console as Console
+import jasy.item.Class
+import jasy.item.Translation
+
+__all__ = ["warmup", "getWorkers"]
+
+
+# Minimum number of classes to process before starting worker processes
+minimumClasses = 8
+
+# Results which are not sent back to the main process (large and only required while processing)
+skippedFamilies = ("tree", "opt-tree")
+
+
+class WorkerCache:
+    """In-memory cache used for the classes processed by a worker. Collects all persistent entries."""
+
+    def __init__(self):
+        self.__values = {}
+        self.__entries = {}
+
+    def read(self, key, timestamp=None, inMemory=True):
+        return self.__values.get(key)
+
+    def store(self, key, value, timestamp=None, transient=False, inMemory=True, size=None):
+        self.__values[key] = value
+
+        if not transient and not jasy.core.Cache.getFamily(key) in skippedFamilies:
+            self.__entries[key] = (value, inMemory)
+
+    def getEntries(self):
+        """Returns a list of (key, value, inMemory) tuples of all persistent entries"""
+        return [(key, self.__entries[key][0], self.__entries[key][1]) for key in self.__entries]
+
+
+class WorkerProject:
+    """Project of the classes processed by a worker. Only offers the cache."""
+
+    def __init__(self):
+        self.__cache = WorkerCache()
+
+    def getCache(self):
+        return self.__cache
+
+    def hasContentCache(self):
+        return False
+
+
+def initWorker():
+    """Initializes a worker process. Hides progress messages of the classes being processed."""
+
+    logging.getLogger().setLevel(logging.WARN)
+
+
+def processClass(job):
+    """
+    Processes a single class inside a worker process. Returns a tuple of the cache entries
+    (see WorkerCache.getEntries()) and an error message.
+    """
+
+    className, path, permutation, translation, optimization, formatting, size, removed = job
+    project = WorkerProject()
+
+    try:
+        classObj = jasy.item.Class.ClassItem(project, className).attach(path)
+        classObj.getMetaData(permutation)
+        classObj.getScopeData(permutation)
+        classObj.getCompressed(permutation, translation, optimization, formatting, removed=removed)
+
+        if size:
+            classObj.getSize()
+
+    # Exceptions might not be picklable, errors are raised again by the main process
+    except Exception as error:
+        return None, "%s" % error
+
+    return project.getCache().getEntries(), None
+
+
+def getWorkers(workers=None):
+    """Returns the number of worker processes to use. Defaults to the number of CPUs."""
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    return max(1, int(workers))
+
+
+def warmup(classes, permutation=None, translation=None, optimization=None, formatting=None, size=False, workers=None, removed=None):
+    """
+    Processes all classes of the given list which have no compressed code for the given
+    configuration (see jasy.item.Class.ClassItem.getCompressed()) in parallel and stores
+    the results in the project caches. Returns the number of processed classes. The optional
+    dict removed maps class IDs to the names of the members to remove (see jasy.js.clean.DeadMembers).
+
+    Nothing is done when using only one worker or when there are too few classes
+    to make up for the costs of starting the worker processes.
+    """
+
+    workers = getWorkers(workers)
+    if workers < 2:
+        return 0
+
+    if removed is None:
+        removed = {}
+
+    pending = [classObj for classObj in classes if classObj.kind == "class" and not classObj.hasCompressed(permutation, translation, optimization, formatting, removed.get(classObj.getId()))]
+    if len(pending) < minimumClasses:
+        return 0
+
+    # Translation bundles are detached from any project for sending them to the workers
+    if translation:
+        translation = jasy.item.Translation.TranslationItem(None, translation.getId(), translation.getTable())
+
+    Console.info("Processing %s classes using %s processes...", len(pending), workers)
+    Console.indent()
+
+    processed = 0
+    failed = 0
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(workers, initializer=initWorker) as executor:
+            futures = {}
+            for classObj in pending:
+                job = (classObj.getId(), classObj.getPath(), permutation, translation, optimization, formatting, size, removed.get(classObj.getId()))
+                futures[executor.submit(processClass, job)] = classObj
+
+            for future in concurrent.futures.as_completed(futures):
+                classObj = futures[future]
+                entries, error = future.result()
+
+                # Failing classes are processed again by the main process for reporting the error
+                if error is not None:
+                    Console.debug("Could not process class %s: %s", classObj.getId(), error)
+                    failed += 1
+                    continue
+
+                for key, value, inMemory in entries:
+                    classObj.storeCache(key, value, inMemory=inMemory)
+
+                processed += 1
+
+    except (OSError, concurrent.futures.process.BrokenProcessPool) as error:
+        Console.warn("Could not process classes in parallel: %s", error)
+
+    if failed:
+        Console.info("Processed %s classes (%s failed)", processed, failed)
+    else:
+        Console.info("Processed %s classes", processed)
+
+    Console.outdent()
+
+    return processed
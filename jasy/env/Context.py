@@ -85,6 +85,84 @@ def create(name="myproject", origin=None, originVersion=None, skeleton=None, des
     return Create.create(name, origin, originVersion, skeleton, destination, session, **argv)
 
 
+@task
+def cache(action="gc", builds=None, file="jasycache.zip"):
+    """Maintains the cache of all projects (actions: gc, export, import)"""
+
+    from jasy import UserError
+
+    if action == "gc":
+        session.collect(builds=int(builds) if builds is not None else None)
+    elif action == "export":
+        session.exportCache(file)
+    elif action == "import":
+        session.importCache(file)
+    else:
+        raise UserError("Unsupported cache action: %s" % action)
+
+
+@task
+def warm(compression=1, formatting=0, workers=None):
+    """Processes all classes of all projects in parallel for all permutations to fill the caches"""
+
+    outputManager = OutputManager(session, compressionLevel=int(compression), formattingLevel=int(formatting), workers=workers)
+
+    classes = []
+    for project in session.getProjects():
+        classes.extend(project.getClasses().values())
+
+    for permutation in session.permutate():
+        outputManager.warmup(classes)
+
+
+@task
+def deps(classes, prescan=1):
+    """Lists the sorted dependencies of the given comma separated classes (pre-scanned unless prescan is 0)"""
+
+    resolver = Resolver(session, prescan=bool(int(prescan)))
+    for className in classes.split(","):
+        resolver.addClassName(className.strip())
+
+    sortedClasses = resolver.getSortedClasses()
+
+    Console.info("Sorted dependencies of %s:", classes)
+    Console.indent()
+
+    for classObj in sortedClasses:
+        Console.info(classObj.getId())
+
+    Console.outdent()
+    Console.info("Total: %s classes", len(sortedClasses))
+
+
+@task
+def names():
+    """Reports the size change of all classes when renaming local variables for gzip (optimization "names")"""
+
+    import jasy.item.Class
+    from jasy.js.output.Optimization import Optimization
+
+    optimization = Optimization("declarations", "blocks", "names")
+    total = { "optimized" : 0, "zipped" : 0 }
+
+    Console.info("Comparing sizes with %s and %s...", jasy.item.Class.defaultOptimization, optimization)
+    Console.indent()
+
+    for project in session.getProjects():
+        classes = project.getClasses()
+        for className in sorted(classes):
+            before = classes[className].getSize()
+            after = classes[className].getSize(optimization)
+
+            for key in total:
+                total[key] += after[key] - before[key]
+
+            Console.info("%s: %s => %s bytes (%+d), %s => %s zipped (%+d)", className, before["optimized"], after["optimized"], after["optimized"] - before["optimized"], before["zipped"], after["zipped"], after["zipped"] - before["zipped"])
+
+    Console.outdent()
+    Console.info("Total: %+d bytes, %+d zipped", total["optimized"], total["zipped"])
+
+
 @task
 def showapi():
     """Shows the official API available in jasyscript.py"""
@@ -136,6 +136,7 @@ def executeTask(taskname, **kwargs):
         try:
             camelCaseArgs = { Util.camelize(key) : kwargs[key] for key in kwargs }
             __taskRegistry[taskname](**camelCaseArgs)
+            session.sync()
         except UserError as err:
             raise
         except:
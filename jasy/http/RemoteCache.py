@@ -0,0 +1,95 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+import json, requests
+
+import jasy.core.Console as Console
+
+
+__all__ = ["RemoteCache"]
+
+
+class RemoteCache:
+    """
+    Client for a content addressed remote cache as served by the "cache" routes of
+    jasy.http.Server. Keeps the HTTP connection alive between requests and transfers
+    keys in batches. Whenever the remote cache is not reachable it is disabled for the
+    rest of the session so that callers fall back to local processing. The token is the
+    shared secret configured for the route on the server (required for storing values).
+    """
+
+    # Maximum number of keys transferred per request
+    batchSize = 500
+
+    def __init__(self, url, timeout=5, token=None):
+        self.__url = url.rstrip("/")
+        self.__timeout = timeout
+        self.__available = True
+
+        # Session keeps connections alive (connection pooling)
+        self.__session = requests.Session()
+        self.__session.headers["Content-Type"] = "application/json"
+        if token is not None:
+            self.__session.headers["X-Jasy-Token"] = token
+
+
+    def isAvailable(self):
+        """Whether the remote cache is still in use (it is disabled after the first connection problem)"""
+
+        return self.__available
+
+
+    def __request(self, action, data):
+        if not self.__available:
+            return None
+
+        try:
+            response = self.__session.post("%s/%s" % (self.__url, action), data=json.dumps(data), timeout=self.__timeout)
+
+            if response.status_code != 200:
+                raise IOError("Unexpected status code %s" % response.status_code)
+
+            return json.loads(response.content.decode("utf-8"))
+
+        except (requests.exceptions.RequestException, IOError, ValueError) as error:
+            Console.warn("Remote cache at %s is not available: %s", self.__url, error)
+            Console.warn("Continuing without remote cache...")
+            self.__available = False
+
+            return None
+
+
+    def get(self, keys):
+        """Returns a dict with the values of all given keys which are available in the remote cache"""
+
+        keys = list(keys)
+        result = {}
+
+        for pos in range(0, len(keys), self.batchSize):
+            found = self.__request("get", keys[pos:pos+self.batchSize])
+            if found is None:
+                break
+
+            result.update(found)
+
+        return result
+
+
+    def put(self, values):
+        """Stores the given dict of keys and values in the remote cache"""
+
+        keys = list(values)
+
+        for pos in range(0, len(keys), self.batchSize):
+            batch = { key : values[key] for key in keys[pos:pos+self.batchSize] }
+            if self.__request("put", batch) is None:
+                break
+
+
+    def close(self):
+        """Closes the pooled connections"""
+
+        self.__session.close()
+
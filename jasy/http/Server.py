@@ -3,7 +3,7 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
-import os, logging, base64, json, requests, cherrypy, locale
+import os, hmac, logging, base64, json, requests, cherrypy, locale
 from collections import namedtuple
 
 import jasy.core.Cache as Cache
@@ -177,6 +177,130 @@ class Proxy(object):
         return result.content
         
         
+class BuildCache(object):
+    """
+    Content addressed key/value store for sharing build results (e.g. compressed class code)
+    between multiple machines. Used by jasy.http.RemoteCache.
+
+    - POST <route>/get: JSON list of keys => JSON dict with all available keys and their values
+    - POST <route>/put: JSON dict of keys and values => JSON dict with the number of stored entries
+    - GET <route>/<key>: Value of the given key as plain text
+
+    All requests have to send the shared secret configured via "token" in the "X-Jasy-Token"
+    header. Without a configured token the cache is read-only. Keys and values are strings.
+    Cross domain access is not enabled as any web page could use it otherwise.
+    """
+
+    # Maximum length of keys in characters
+    maxKeyLength = 512
+
+    def __init__(self, id, config):
+        self.id = id
+        self.config = config
+        self.enableDebug = getKey(config, "debug", False)
+        self.token = getKey(config, "token")
+
+        # Support custom file names or just enabling the cache using the default file name
+        fileName = getKey(config, "cache")
+        if not isinstance(fileName, str):
+            fileName = ".jasy/buildcache-%s" % self.id
+
+        # Relative file names are resolved against the project's root directory (the server's working directory)
+        fileName = os.path.abspath(fileName)
+        folder = os.path.dirname(fileName)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self.storage = Cache.Cache(folder, os.path.basename(fileName), hashkeys=True)
+
+        Console.info('BuildCache "%s" [debug:%s, writable:%s]', self.id, self.enableDebug, self.token is not None)
+
+
+    def __checkToken(self, required=False):
+        """Raises a HTTP error when the request does not send the configured token"""
+
+        if self.token is None:
+            if required:
+                raise cherrypy.HTTPError(403, "Cache is read-only as no token is configured")
+
+            return
+
+        token = cherrypy.request.headers.get("X-Jasy-Token", "")
+        if not hmac.compare_digest(token.encode("utf-8"), str(self.token).encode("utf-8")):
+            raise cherrypy.HTTPError(403, "Invalid token")
+
+
+    def __isKey(self, key):
+        return isinstance(key, str) and 0 < len(key) <= self.maxKeyLength
+
+
+    def __readJson(self):
+        try:
+            return json.loads(cherrypy.request.body.read().decode("utf-8"))
+        except ValueError:
+            raise cherrypy.HTTPError(400, "Invalid JSON data")
+
+
+    def __respond(self, data):
+        cherrypy.response.headers["Content-Type"] = "application/json"
+        cherrypy.response.headers["X-Jasy-Version"] = jasyVersion
+
+        return json.dumps(data).encode("utf-8")
+
+
+    @cherrypy.expose
+    def get(self):
+        self.__checkToken()
+
+        keys = self.__readJson()
+        if not isinstance(keys, list) or not all(self.__isKey(key) for key in keys):
+            raise cherrypy.HTTPError(400, "Expected a list of keys")
+
+        result = {}
+
+        for key in keys:
+            value = self.storage.read(key, inMemory=False)
+            if value is not None:
+                result[key] = value
+
+        if self.enableDebug:
+            Console.info("Cache: %s of %s keys found", len(result), len(keys))
+
+        return self.__respond(result)
+
+
+    @cherrypy.expose
+    def put(self):
+        self.__checkToken(True)
+
+        values = self.__readJson()
+        if not isinstance(values, dict) or not all(self.__isKey(key) and isinstance(values[key], str) for key in values):
+            raise cherrypy.HTTPError(400, "Expected a dict of keys and string values")
+
+        for key in values:
+            self.storage.store(key, values[key], inMemory=False)
+
+        self.storage.sync()
+
+        if self.enableDebug:
+            Console.info("Cache: Stored %s keys", len(values))
+
+        return self.__respond({ "stored" : len(values) })
+
+
+    @cherrypy.expose
+    def default(self, key=None):
+        self.__checkToken()
+
+        value = self.storage.read(key, inMemory=False) if self.__isKey(key) else None
+        if value is None:
+            raise cherrypy.NotFound(key)
+
+        cherrypy.response.headers["X-Jasy-Version"] = jasyVersion
+
+        return value
+
+
 class Static(object):
     
     def __init__(self, id, config, mimeTypes=None):
@@ -344,7 +468,10 @@ class Server:
         webserver either mirroring a remote server or delivering a local directory.
 
         The parameters is a dict where every key is the name of the route
-        and the value is the configuration of that route.
+        and the value is the configuration of that route. Routes with a "host"
+        are proxied, routes with a "cache" (file name) serve a build cache
+        (see jasy.http.RemoteCache, writable when a shared "token" is configured)
+        and all others deliver local files.
         """
 
         Console.info("Adding routes...")
@@ -354,6 +481,8 @@ class Server:
             entry = routes[key]
             if "host" in entry:
                 node = Proxy(key, entry)
+            elif "cache" in entry:
+                node = BuildCache(key, entry)
             else:
                 node = Static(key, entry, mimeTypes=self.__root.mimeTypes)
             
@@ -3,7 +3,7 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
-import os
+import os, hashlib
 
 from jasy import UserError
 import jasy.core.File as File
@@ -16,6 +16,7 @@ class AbstractItem:
 
     __path = None
     __cache = None
+    __contentHash = None
     mtime = None
     
     def __init__(self, project, id=None):
@@ -81,7 +82,57 @@ class AbstractItem:
         """Returns the SHA1 checksum of the item"""
         
         return File.sha1(open(self.getPath(), mode))
-    
+
+    def getContentHash(self):
+        """
+        Returns a SHA1 checksum of the content of the item. Checksums are stored in the
+        project cache together with size and modification time of each file, so
+        unmodified files are not hashed again.
+        """
+
+        if self.__contentHash is None:
+            paths = self.__path if type(self.__path) is list else [self.__path]
+            cache = self.project.getCache()
+            checksums = []
+
+            for path in paths:
+                stat = os.stat(path)
+                field = "checksum[%s]" % path
+                entry = cache.read(field, inMemory=False)
+
+                if entry is None or entry[0] != stat.st_size or entry[1] != stat.st_mtime:
+                    entry = (stat.st_size, stat.st_mtime, File.sha1(path))
+                    cache.store(field, entry, inMemory=False)
+
+                checksums.append(entry[2])
+
+            if len(checksums) == 1:
+                self.__contentHash = checksums[0]
+            else:
+                self.__contentHash = hashlib.sha1("".join(checksums).encode("ascii")).hexdigest()
+
+        return self.__contentHash
+
+    def readCache(self, field, inMemory=True):
+        """
+        Reads the given field from the project cache. Entries are validated using the
+        modification time of the item or are keyed by its content hash when the project
+        enables "cache.content".
+        """
+
+        if self.project.hasContentCache():
+            return self.project.getCache().read("%s@%s" % (field, self.getContentHash()), inMemory=inMemory)
+
+        return self.project.getCache().read(field, self.mtime, inMemory=inMemory)
+
+    def storeCache(self, field, value, transient=False, inMemory=True, size=None):
+        """Stores the given field in the project cache (see readCache())"""
+
+        if self.project.hasContentCache():
+            self.project.getCache().store("%s@%s" % (field, self.getContentHash()), value, transient=transient, inMemory=inMemory, size=size)
+        else:
+            self.project.getCache().store(field, value, self.mtime, transient=transient, inMemory=inMemory, size=size)
+
 
     # Map Python built-ins
     __repr__ = getId
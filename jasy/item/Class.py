@@ -3,20 +3,24 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
-import os, copy, zlib, fnmatch, re
+import os, sys, zlib, fnmatch, re, hashlib
 
 import jasy.js.parse.Parser as Parser
 import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.parse.Serializer as Serializer
+import jasy.js.parse.Visitor as Visitor
 import jasy.js.clean.DeadCode
 import jasy.js.clean.Unused
 import jasy.js.clean.Permutate
+import jasy.js.clean.DeadMembers
+import jasy.js.Prescanner
 import jasy.js.optimize.Translation
 import jasy.js.output.Optimization
 import jasy.js.api.Data
 import jasy.core.Permutation
 import jasy.item.Abstract
 
-from jasy.js.MetaData import MetaData
+from jasy.js.MetaData import MetaData, MetaDataCollector
 from jasy.js.output.Compressor import Compressor
 
 from jasy import UserError
@@ -24,6 +28,7 @@ from jasy.js.util import *
 import jasy.core.Console as Console 
 
 try:
+    import pygments
     from pygments import highlight
     from pygments.lexers import JavascriptLexer
     from pygments.formatters import HtmlFormatter
@@ -33,27 +38,83 @@ except:
 
 aliases = {}
 
+
+# Versions of the components producing cached data. Increase the version of a component whenever
+# its output changes. This way only the cache entries depending on that component are invalidated.
+componentVersions = {
+    "parser" : 3,           # jasy.js.tokenize.Tokenizer, jasy.js.parse.Parser, jasy.js.parse.VanillaBuilder
+    "scope" : 1,            # jasy.js.parse.ScopeScanner, jasy.js.parse.ScopeData
+    "permutate" : 2,        # jasy.js.clean.Permutate
+    "deadcode" : 1,         # jasy.js.clean.DeadCode
+    "unused" : 2,           # jasy.js.clean.Unused
+    "members" : 3,          # jasy.js.clean.DeadMembers
+    "meta" : 1,             # jasy.js.MetaData
+    "prescan" : 1,          # jasy.js.Prescanner
+    "fields" : 1,           # collectFields()
+    "translation" : 1,      # jasy.js.optimize.Translation
+    "declarations" : 1,     # jasy.js.optimize.CombineDeclarations
+    "blocks" : 1,           # jasy.js.optimize.BlockReducer
+    "variables" : 1,        # jasy.js.optimize.LocalVariables
+    "privates" : 1,         # jasy.js.optimize.CryptPrivates
+    "wrap" : 1,             # jasy.js.optimize.ClosureWrapper
+    "compressor" : 1,       # jasy.js.output.Compressor
+    "api" : 1,              # jasy.js.api.Data, jasy.js.api.Comment, jasy.core.Text
+    "serializer" : Serializer.VERSION,
+    "highlighter" : highlight and pygments.__version__
+}
+
+def getComponentVersion(*components):
+    """Returns a combined version string of the given components"""
+    return ",".join(["%s:%s" % (name, componentVersions[name]) for name in components])
+
+treeComponents = ("parser", "scope")
+optimizedComponents = treeComponents + ("permutate", "deadcode", "unused")
+compressedComponents = optimizedComponents + ("members", "translation", "declarations", "blocks", "variables", "privates", "wrap", "compressor")
+
+# Versions per cache key family (see jasy.core.Cache)
+cacheVersions = {
+    "tree" : getComponentVersion(*treeComponents + ("serializer",)),
+    "fields" : getComponentVersion(*treeComponents + ("fields",)),
+    "translations" : getComponentVersion(*treeComponents + ("translation",)),
+    "opt-tree" : getComponentVersion(*optimizedComponents + ("serializer",)),
+    "scope" : getComponentVersion(*optimizedComponents),
+    "meta" : getComponentVersion(*optimizedComponents + ("meta",)),
+    "members" : getComponentVersion(*optimizedComponents + ("members",)),
+    "prescan" : getComponentVersion("parser", "meta", "prescan"),
+    "compressed" : getComponentVersion(*compressedComponents),
+    "size" : getComponentVersion(*compressedComponents),
+    "api" : getComponentVersion(*compressedComponents + ("meta", "fields", "api")),
+    "highlighted" : getComponentVersion("highlighter")
+}
+
 defaultOptimization = jasy.js.output.Optimization.Optimization("declarations", "blocks", "variables")
 defaultPermutation = jasy.core.Permutation.getPermutation({"debug" : False})
 
 
-def collectFields(node, keys=None):
-    
-    if keys is None:
-        keys = set()
-    
+class FieldsCollector:
+    """Collector for jasy.js.parse.Visitor which collects the keys of all fields being read"""
+
+    enterTypes = set(["dot"])
+
     # Always the first parameter
     # Supported calls: jasy.Env.isSet(key, expected?), jasy.Env.getValue(key), jasy.Env.select(key, map)
     calls = ("jasy.Env.isSet", "jasy.Env.getValue", "jasy.Env.select")
-    if node.type == "dot" and node.parent.type == "call" and assembleDot(node) in calls:
-        keys.add(node.parent[1][0].value)
 
-    # Process children
-    for child in reversed(node):
-        if child != None:
-            collectFields(child, keys)
-            
-    return keys
+    def __init__(self, keys=None):
+        if keys is None:
+            keys = set()
+
+        self.keys = keys
+
+    def enter(self, node):
+        if node.parent.type == "call" and assembleDot(node) in self.calls:
+            self.keys.add(node.parent[1][0].value)
+
+
+def collectFields(node, keys=None):
+    collector = FieldsCollector(keys)
+    Visitor.visit(node, [collector])
+    return collector.keys
 
 
 class ClassError(Exception):
@@ -69,30 +130,100 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
     
     kind = "class"
     
+    def __readTree(self, field):
+        """
+        Returns the tree stored under the given field. Trees are kept as objects in the memory 
+        layer of the cache and are restored from their compact representation otherwise.
+        """
+
+        tree = self.readCache(field, inMemory=False)
+        if type(tree) is bytes:
+            try:
+                tree = Serializer.loads(tree)
+            except ValueError as error:
+                Console.debug("Could not restore %s: %s", field, error)
+                return None
+
+            self.storeCache(field, tree, transient=True)
+
+        return tree
+
+
+    def __storeTree(self, field, tree):
+        """Stores the given tree in its compact representation and keeps the object in memory"""
+
+        self.storeCache(field, Serializer.dumps(tree), inMemory=False)
+        self.storeCache(field, tree, transient=True)
+
+
     def __getTree(self, context=None):
         
         field = "tree[%s]" % self.id
-        tree = self.project.getCache().read(field, self.mtime)
+        tree = self.__readTree(field)
         if not tree:
             Console.info("Processing class %s %s...", Console.colorize(self.id, "bold"), Console.colorize("[%s]" % context, "cyan"))
             
             Console.indent()
-            tree = Parser.parse(self.getText(), self.id)
-            ScopeScanner.scan(tree)
+            try:
+                tree = Parser.parse(self.getText(), self.id)
+                self.__analyzeTree(tree)
+            except RecursionError:
+                raise self.__nestingError()
             Console.outdent()
             
-            self.project.getCache().store(field, tree, self.mtime, True)
+            self.__storeTree(field, tree)
         
         return tree
+
+
+    def __analyzeTree(self, tree):
+        """
+        Attaches the scope data to the given plain tree and stores its fields and translations in the
+        cache. Runs all collectors in one traversal of the tree (see jasy.js.parse.Visitor).
+        """
+
+        fields = FieldsCollector()
+        translations = jasy.js.optimize.Translation.TranslationCollector()
+        Visitor.visit(tree, [ScopeScanner.ScopeCollector(), fields, translations])
+
+        self.storeCache("fields[%s]" % self.id, fields.keys)
+        self.storeCache("translations[%s]" % self.id, translations.collection)
+
+
+    def __getAnalysis(self, field, context):
+        """Returns the given cache entry which is filled by the analysis of the plain tree"""
+
+        value = self.readCache(field)
+        if value is None:
+            tree = self.__getTree(context)
+            value = self.readCache(field)
+
+            # Tree was restored without its analysis e.g. after changing the version of a collector
+            if value is None:
+                self.__analyzeTree(tree)
+                value = self.readCache(field)
+
+        return value
     
     
     def __getOptimizedTree(self, permutation=None, context=None):
-        """Returns an optimized tree with permutations applied"""
+        """
+        Returns an optimized tree with permutations applied. Permutations which result in the 
+        same changes to the tree (see jasy.js.clean.Permutate.getSignature) share one tree.
+        """
+
+        alias = "opt-tree[%s]-%s" % (self.id, permutation)
+        tree = self.readCache(alias)
+        if tree:
+            return tree
+
+        plain = self.__getTree("%s:plain" % context)
+        signature = jasy.js.clean.Permutate.getSignature(plain, permutation)
 
-        field = "opt-tree[%s]-%s" % (self.id, permutation)
-        tree = self.project.getCache().read(field, self.mtime)
+        field = "opt-tree[%s]-%s" % (self.id, signature)
+        tree = self.__readTree(field)
         if not tree:
-            tree = copy.deepcopy(self.__getTree("%s:plain" % context))
+            tree = plain.clone()
 
             # Logging
             msg = "Processing class %s" % Console.colorize(self.id, "bold")
@@ -104,36 +235,73 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
             Console.info("%s..." % msg)
             Console.indent()
 
-            # Apply permutation
-            if permutation:
-                Console.debug("Patching tree with permutation: %s", permutation)
-                Console.indent()
-                jasy.js.clean.Permutate.patch(tree, permutation)
-                Console.outdent()
-
-            # Cleanups
-            jasy.js.clean.DeadCode.cleanup(tree)
-            ScopeScanner.scan(tree)
-            jasy.js.clean.Unused.cleanup(tree)
+            try:
+                # Apply permutation
+                if signature:
+                    Console.debug("Patching tree with permutation: %s", permutation)
+                    Console.indent()
+                    jasy.js.clean.Permutate.patch(tree, permutation)
+                    Console.outdent()
+
+                # Cleanups
+                jasy.js.clean.DeadCode.cleanup(tree)
+                meta = self.__analyzeOptimizedTree(tree)
+                if jasy.js.clean.Unused.cleanup(tree, scanned=True):
+                    meta = MetaData(tree)
+
+            except RecursionError:
+                raise self.__nestingError()
         
-            self.project.getCache().store(field, tree, self.mtime, True)
+            self.__storeTree(field, tree)
+            self.storeCache("meta[%s]-%s" % (self.id, permutation), meta)
+            self.storeCache("scope[%s]-%s" % (self.id, permutation), tree.scope)
             Console.outdent()
 
+        if alias != field:
+            self.storeCache(alias, tree, transient=True)
+
         return tree
 
 
-    def getDependencies(self, permutation=None, classes=None, warnings=True):
+    def __nestingError(self):
+        """
+        Returns the error for code which is nested too deeply. Parsing, tree serialization, cloning and
+        visitors are iterative but cleanups, optimizers and the compressor still recurse once per tree level.
+        """
+
+        return ClassError(self, "Code is nested too deeply! Syntax trees deeper than about %s levels are not supported." % sys.getrecursionlimit())
+
+
+    def __analyzeOptimizedTree(self, tree):
+        """
+        Attaches the scope data to the given optimized tree and returns its meta data.
+        Runs all collectors in one traversal of the tree (see jasy.js.parse.Visitor).
+        """
+
+        meta = MetaDataCollector()
+        Visitor.visit(tree, [ScopeScanner.ScopeCollector(), meta])
+
+        return meta.meta
+
+
+    def getDependencies(self, permutation=None, classes=None, warnings=True, prescan=False):
         """ 
         Returns a set of dependencies seen through the given list of known 
         classes (ignoring all unknown items in original set). This method
         makes use of the meta data (see core/MetaData.py) and the variable data 
         (see parse/ScopeData.py).
-        """
 
-        permutation = self.filterPermutation(permutation)
+        With prescan enabled the data is extracted from the token stream when possible
+        (see getPrescanData()).
+        """
 
-        meta = self.getMetaData(permutation)
-        scope = self.getScopeData(permutation)
+        data = prescan and self.getPrescanData()
+        if data:
+            meta, scope = data
+        else:
+            permutation = self.filterPermutation(permutation)
+            meta = self.getMetaData(permutation)
+            scope = self.getScopeData(permutation)
         
         result = set()
         
@@ -199,17 +367,18 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
         permutation = self.filterPermutation(permutation)
         
         field = "scope[%s]-%s" % (self.id, permutation)
-        scope = self.project.getCache().read(field, self.mtime)
+        scope = self.readCache(field)
         if scope is None:
             scope = self.__getOptimizedTree(permutation, "scope").scope
-            self.project.getCache().store(field, scope, self.mtime)
+            if self.readCache(field) is None:
+                self.storeCache(field, scope)
 
         return scope
         
         
     def getApi(self, highlight=True):
         field = "api[%s]-%s" % (self.id, highlight)
-        apidata = self.project.getCache().read(field, self.mtime, inMemory=False)
+        apidata = self.readCache(field, inMemory=False)
         if apidata is None:
             apidata = jasy.js.api.Data.ApiData(self.id, highlight)
             
@@ -228,14 +397,14 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
             apidata.addSize(self.getSize())
             apidata.addFields(self.getFields())
             
-            self.project.getCache().store(field, apidata, self.mtime, inMemory=False)
+            self.storeCache(field, apidata, inMemory=False)
 
         return apidata
 
 
     def getHighlightedCode(self):
         field = "highlighted[%s]" % self.id
-        source = self.project.getCache().read(field, self.mtime)
+        source = self.readCache(field)
         if source is None:
             if highlight is None:
                 raise UserError("Could not highlight JavaScript code! Please install Pygments.")
@@ -244,41 +413,74 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
             formatter = HtmlFormatter(full=True, style="autumn", linenos="table", lineanchors="line")
             source = highlight(self.getText(), lexer, formatter)
             
-            self.project.getCache().store(field, source, self.mtime)
+            self.storeCache(field, source)
 
         return source
 
 
-    def getMetaData(self, permutation=None):
+    def getPrescanData(self):
+        """
+        Returns a tuple of meta data and top level scope data extracted from the token stream of the 
+        class (see jasy.js.Prescanner). Much faster than the full pipeline but might contain more dependencies.
+        Returns None for classes which read fields or could not be scanned (these require the full pipeline).
+        """
+
+        field = "prescan[%s]" % self.id
+        data = self.readCache(field)
+        if data is None:
+            data = jasy.js.Prescanner.scan(self.getText(), self.id) or False
+            self.storeCache(field, data)
+
+        return data or None
+
+
+    def getMetaData(self, permutation=None, prescan=False):
+        if prescan:
+            data = self.getPrescanData()
+            if data:
+                return data[0]
+
         permutation = self.filterPermutation(permutation)
 
         field = "meta[%s]-%s" % (self.id, permutation)
-        meta = self.project.getCache().read(field, self.mtime)
+        meta = self.readCache(field)
         if meta is None:
-            meta = MetaData(self.__getOptimizedTree(permutation, "meta"))
-            self.project.getCache().store(field, meta, self.mtime)
+            tree = self.__getOptimizedTree(permutation, "meta")
+
+            # Filled when the optimized tree was created
+            meta = self.readCache(field)
+            if meta is None:
+                meta = MetaData(tree)
+                self.storeCache(field, meta)
             
         return meta
         
         
+    def getMembers(self, permutation=None):
+        """
+        Returns the member usage of the class for the given permutation (see jasy.js.clean.DeadMembers).
+        Used for removing the members which are not referenced by any class of a program.
+        """
+
+        permutation = self.filterPermutation(permutation)
+
+        field = "members[%s]-%s" % (self.id, permutation)
+        data = self.readCache(field)
+        if data is None:
+            data = jasy.js.clean.DeadMembers.collect(self.__getOptimizedTree(permutation, "members"), self.id)
+            self.storeCache(field, data)
+
+        return data
+
+
     def getFields(self):
         field = "fields[%s]" % (self.id)
-        fields = self.project.getCache().read(field, self.mtime)
-        if fields is None:
-            fields = collectFields(self.__getTree(context="fields"))
-            self.project.getCache().store(field, fields, self.mtime)
-        
-        return fields
+        return self.__getAnalysis(field, "fields")
 
 
     def getTranslations(self):
         field = "translations[%s]" % (self.id)
-        result = self.project.getCache().read(field, self.mtime)
-        if result is None:
-            result = jasy.js.optimize.Translation.collectTranslations(self.__getTree(context="i18n"))
-            self.project.getCache().store(field, result, self.mtime)
-
-        return result
+        return self.__getAnalysis(field, "i18n")
         
         
     def filterPermutation(self, permutation):
@@ -290,43 +492,185 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
         return None
         
         
-    def getCompressed(self, permutation=None, translation=None, optimization=None, formatting=None, context="compressed"):
+    def __getCompressedField(self, permutation, translation, optimization, formatting, removed):
         permutation = self.filterPermutation(permutation)
 
         # Disable translation for caching / patching when not actually used
         if translation and not self.getTranslations():
             translation = None
-        
+
         field = "compressed[%s]-%s-%s-%s-%s" % (self.id, permutation, translation, optimization, formatting)
-        compressed = self.project.getCache().read(field, self.mtime)
-        if compressed == None:
-            tree = self.__getOptimizedTree(permutation, context)
-            
-            if translation or optimization:
-                tree = copy.deepcopy(tree)
-            
-                if translation:
-                    jasy.js.optimize.Translation.optimize(tree, translation)
+        if removed:
+            field += "-%s" % jasy.js.clean.DeadMembers.getKey(removed)
+
+        return field, permutation, translation
+
+
+    def getCompressedKey(self, permutation=None, translation=None, optimization=None, formatting=None, removed=None):
+        """
+        Returns a content addressed key for the compressed code of the class (see getCompressed()).
+        The key is based on the content of the class, the used translations and the component versions. It
+        is independent from file locations, hosts and modification times and is used for sharing
+        compressed code via a remote cache.
+        """
+
+        field, permutation, translation = self.__getCompressedField(permutation, translation, optimization, formatting, removed)
+
+        checksum = hashlib.sha1()
+        checksum.update(("%s|%s|%s" % (field, self.getContentHash(), cacheVersions["compressed"])).encode("utf-8"))
+
+        if translation:
+            table = translation.getTable()
+            checksum.update(repr([(translationId, table.get(translationId)) for translationId in sorted(self.getTranslations())]).encode("utf-8"))
+
+        return checksum.hexdigest()
+
+
+    def hasCompressed(self, permutation=None, translation=None, optimization=None, formatting=None, removed=None):
+        """Whether the compressed code for the given configuration is available in the cache"""
+
+        # Classes which were never processed have no compressed code (omits parsing them just for finding out)
+        if self.readCache("fields[%s]" % self.id) is None or (translation and self.readCache("translations[%s]" % self.id) is None):
+            return False
+
+        field = self.__getCompressedField(permutation, translation, optimization, formatting, removed)[0]
+        return self.readCache(field) is not None
+
+
+    def setCompressed(self, compressed, permutation=None, translation=None, optimization=None, formatting=None, removed=None):
+        """Stores the given compressed code e.g. from a remote cache (see getCompressed())"""
+
+        field = self.__getCompressedField(permutation, translation, optimization, formatting, removed)[0]
+        self.storeCache(field, compressed)
+
+
+    def __getStrippedTree(self, permutation, translation, removed, context):
+        """
+        Returns a copy of the optimized tree without the given members (see jasy.js.clean.DeadMembers)
+        and with the given translation applied.
+        """
+
+        tree = self.__getOptimizedTree(permutation, context).clone()
+
+        # Variables only used by the removed members are not required anymore
+        if removed and jasy.js.clean.DeadMembers.strip(tree, removed):
+            jasy.js.clean.Unused.cleanup(tree)
+
+        if translation:
+            jasy.js.optimize.Translation.optimize(tree, translation)
+
+        return tree
 
+
+    def __getPassTree(self, permutation, translation, optimization, removed, context):
+        """
+        Returns a copy of the optimized tree with the given translation and optimization applied.
+
+        Once a second optimization is requested for the same tree, the trees after the passes it
+        shares with the earlier ones are kept in memory ("pass-tree" entries). Later optimizations
+        which enable more passes (e.g. "declarations+blocks" after "declarations") continue with
+        the tree of the longest prefix of their passes which is already available.
+        """
+
+        passes = optimization.getPasses()
+        base = "[%s]-%s-%s" % (self.id, permutation, translation)
+        if removed:
+            base += "-%s" % jasy.js.clean.DeadMembers.getKey(removed)
+
+        prefix = "pass-tree%s-" % base
+
+        # Lists of passes which were requested before
+        requested = self.readCache("pass-lists%s" % base)
+        if requested is None:
+            requested = ()
+
+        if not tuple(passes) in requested:
+            self.storeCache("pass-lists%s" % base, requested + (tuple(passes),), transient=True)
+
+        done = len(passes) if requested else 0
+        while done > 0:
+            tree = self.readCache(prefix + jasy.js.output.Optimization.getPrefixKey(passes[:done]))
+            if tree is not None:
+                Console.debug("Continuing with %s of %s passes for %s", done, len(passes), self.id)
+                tree = tree.clone()
+                break
+
+            done -= 1
+
+        else:
+            tree = self.__getStrippedTree(permutation, translation, removed, context)
+
+        # Only prefixes shared with other requested optimizations are worth keeping
+        shared = set()
+        for other in requested:
+            length = 0
+            while length < len(other) and length < len(passes) and other[length] == passes[length]:
+                length += 1
+
+            if length > done:
+                shared.add(jasy.js.output.Optimization.getPrefixKey(passes[:length]))
+
+        # All kept trees have about the size of the tree before the passes
+        size = tree.getEstimatedSize() if shared else 0
+
+        def storePass(key, tree):
+            if key in shared:
+                self.storeCache(prefix + key, tree.clone(), transient=True, size=size)
+
+        try:
+            optimization.apply(tree, done, storePass if shared else None)
+        except jasy.js.output.Optimization.Error as error:
+            raise ClassError(self, "Could not compress class! %s" % error)
+
+        return tree
+
+
+    def getCompressed(self, permutation=None, translation=None, optimization=None, formatting=None, context="compressed", removed=None):
+        """
+        Returns the compressed code of the class for the given configuration. The optional list of member
+        names (removed) is stripped from the class before optimizing it (see jasy.js.clean.DeadMembers).
+        """
+
+        field, permutation, translation = self.__getCompressedField(permutation, translation, optimization, formatting, removed)
+        compressed = self.readCache(field)
+        if compressed == None:
+            try:
                 if optimization:
-                    try:
-                        optimization.apply(tree)
-                    except jasy.js.output.Optimization.Error as error:
-                        raise ClassError(self, "Could not compress class! %s" % error)
-                
-            compressed = Compressor(formatting).compress(tree)
-            self.project.getCache().store(field, compressed, self.mtime)
+                    tree = self.__getPassTree(permutation, translation, optimization, removed, context)
+
+                elif translation or removed:
+                    tree = self.__getStrippedTree(permutation, translation, removed, context)
+
+                else:
+                    tree = self.__getOptimizedTree(permutation, context)
+                    
+                compressed = Compressor(formatting).compress(tree)
+
+            except RecursionError:
+                raise self.__nestingError()
+
+            self.storeCache(field, compressed)
             
         return compressed
             
             
-    def getSize(self):
-        field = "size[%s]" % self.id
-        size = self.project.getCache().read(field, self.mtime)
+    def getSize(self, optimization=None):
+        """
+        Returns the size of the compressed code, the optimized code (using the given optimization, defaults
+        to defaultOptimization) and the zipped optimized code of the class in bytes.
+        """
+
+        if optimization is None or optimization.getKey() == defaultOptimization.getKey():
+            optimization = defaultOptimization
+            field = "size[%s]" % self.id
+        else:
+            field = "size[%s]-%s" % (self.id, optimization)
+
+        size = self.readCache(field)
         
         if size is None:
             compressed = self.getCompressed(context="size")
-            optimized = self.getCompressed(permutation=defaultPermutation, optimization=defaultOptimization, context="size")
+            optimized = self.getCompressed(permutation=defaultPermutation, optimization=optimization, context="size")
             zipped = zlib.compress(optimized.encode("utf-8"))
             
             size = {
@@ -335,7 +679,7 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
                 "zipped" : len(zipped)
             }
             
-            self.project.getCache().store(field, size, self.mtime)
+            self.storeCache(field, size)
             
         return size
         
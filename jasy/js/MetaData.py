@@ -3,6 +3,9 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
+import jasy.js.parse.Visitor
+
+
 class MetaData:
     """ 
     Data structure to hold all meta information. 
@@ -16,7 +19,7 @@ class MetaData:
     
     __slots__ = ["name", "requires", "optionals", "breaks", "assets"]
     
-    def __init__(self, tree):
+    def __init__(self, tree=None):
         self.name = None
         
         self.requires = set()
@@ -24,36 +27,49 @@ class MetaData:
         self.breaks = set()
         self.assets = set()
         
-        self.__inspect(tree)
+        if tree is not None:
+            jasy.js.parse.Visitor.visit(tree, [MetaDataCollector(self)])
         
         
-    def __inspect(self, node):
-        """ The internal inspection routine """
-    
-        # Parse comments
-        comments = getattr(node, "comments", None)
-        if comments:
-            for comment in comments:
-                commentTags = comment.getTags()
-                if commentTags:
-
-                    if "name" in commentTags:
-                        self.name = list(commentTags["name"])[0]
-                    if "require" in commentTags:
-                        self.requires.update(commentTags["require"])
-                    if "load" in commentTags:
-                        # load is a special combination shorthand for requires + breaks
-                        # This means load it but don't require it being loaded first
-                        self.requires.update(commentTags["load"])
-                        self.breaks.update(commentTags["load"])
-                    if "optional" in commentTags:
-                        self.optionals.update(commentTags["optional"])
-                    if "break" in commentTags:
-                        self.breaks.update(commentTags["break"])
-                    if "asset" in commentTags:
-                        self.assets.update(commentTags["asset"])
-
-        # Process children
-        for child in node:
-            if child is not None:
-                self.__inspect(child)
+    def addComments(self, comments):
+        """ Adds the meta data of the given list of comments """
+
+        for comment in comments:
+            commentTags = comment.getTags()
+            if commentTags:
+
+                if "name" in commentTags:
+                    self.name = list(commentTags["name"])[0]
+                if "require" in commentTags:
+                    self.requires.update(commentTags["require"])
+                if "load" in commentTags:
+                    # load is a special combination shorthand for requires + breaks
+                    # This means load it but don't require it being loaded first
+                    self.requires.update(commentTags["load"])
+                    self.breaks.update(commentTags["load"])
+                if "optional" in commentTags:
+                    self.optionals.update(commentTags["optional"])
+                if "break" in commentTags:
+                    self.breaks.update(commentTags["break"])
+                if "asset" in commentTags:
+                    self.assets.update(commentTags["asset"])
+
+
+
+class MetaDataCollector:
+    """ Collector for jasy.js.parse.Visitor which adds the meta data of all doc comments """
+
+    def __init__(self, meta=None):
+        if meta is None:
+            meta = MetaData()
+
+        self.meta = meta
+
+
+    def enter(self, node):
+        # Only few nodes have comments, these are stored in the extra attributes (see jasy.js.parse.Node)
+        extra = node.extra
+        if extra and "comments" in extra:
+            comments = extra["comments"]
+            if comments:
+                self.meta.addComments(comments)
@@ -0,0 +1,248 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+"""
+Fast extraction of the data required for resolving dependencies (see jasy.js.Resolver) directly from
+the token stream of a class without building a syntax tree.
+
+Collects the meta data tags of all comments (see jasy.js.MetaData) and the shared variables and
+packages of the top level scope like jasy.js.parse.ScopeScanner does. Functions are tracked by their
+braces. The result is an approximation of the data produced by the full pipeline: no code is removed
+by jasy.js.clean.DeadCode or jasy.js.clean.Unused, so it might contain more dependencies but not fewer.
+"""
+
+import jasy.js.tokenize.Tokenizer as Tokenizer
+import jasy.js.tokenize.Lang as Lang
+import jasy.js.parse.ScopeData as ScopeData
+
+from jasy.js.MetaData import MetaData
+
+__all__ = ["scan"]
+
+
+# Tokens after which a function keyword starts a declaration
+statementStarts = set([None, "semicolon", "left_curly", "right_curly"])
+
+# Tokens opening and closing nested structures
+openingTokens = set(["left_paren", "left_bracket", "left_curly"])
+closingTokens = set(["right_paren", "right_bracket", "right_curly"])
+
+# Calls reading fields (see jasy.item.Class.collectFields()). Classes using these depend on permutations.
+fieldCalls = set(["jasy.Env.isSet", "jasy.Env.getValue", "jasy.Env.select"])
+
+
+class Unsupported(Exception):
+    """Raised for code which could not be handled by the scanner"""
+    pass
+
+
+def scan(source, fileId=None):
+    """
+    Returns a tuple of MetaData and the ScopeData of the top level scope of the given source.
+    The scope data only contains params, declared, accessed, shared and packages. Returns None
+    for classes reading fields or using syntax the scanner does not handle. These must be
+    processed with the full pipeline.
+    """
+
+    try:
+        tokens, comments = __tokenize(source, fileId)
+        scope = __scanTokens(tokens)
+
+    except (Tokenizer.ParseError, Unsupported, IndexError):
+        return None
+
+    for package in scope.packages:
+        if package in fieldCalls:
+            return None
+
+    meta = MetaData()
+    meta.addComments(comments)
+
+    return meta, scope
+
+
+
+def __tokenize(source, fileId):
+    """Returns a list of all (type, value) tokens and a list of all comments of the given source"""
+
+    tokenizer = Tokenizer.create(source, fileId)
+    tokens = []
+    tokenType = None
+
+    while True:
+        tokenType = tokenizer.get(not tokenType in Lang.operandEnds)
+        if tokenType == "end":
+            break
+
+        tokens.append((tokenType, getattr(tokenizer.token, "value", None)))
+
+    return tokens, tokenizer.comments
+
+
+
+def __finishScope(data):
+    """Computes shared variables and packages of the given scope like ScopeScanner does"""
+
+    for name in list(data.packages):
+        top = name[0:name.index(".")]
+        if top in data.declared or top in data.params:
+            del data.packages[name]
+
+    for name in data.accessed:
+        if name not in data.declared and name not in data.params and name != "arguments":
+            data.shared[name] = data.accessed[name]
+
+
+
+def __mergeScope(parent, inner):
+    """Merges shared variables and packages of the given inner scope into the parent scope"""
+
+    for name in inner.shared:
+        parent.increment(name, inner.shared[name])
+
+    for package in inner.packages:
+        if package in parent.packages:
+            parent.packages[package] += inner.packages[package]
+        else:
+            parent.packages[package] = inner.packages[package]
+
+
+
+def __scanTokens(tokens):
+    """Scans the given tokens and returns the scope data of the top level scope"""
+
+    root = ScopeData.ScopeData()
+
+    # Scopes of all currently open functions
+    scopes = [root]
+
+    # Stack of open curly braces, function bodies are marked with their scope
+    braces = [root]
+
+    # Nesting depth relative to the start of the current var/let/const statement (None when outside)
+    declarationDepth = None
+
+    length = len(tokens)
+    position = 0
+    previous = None
+
+    while position < length:
+        tokenType, value = tokens[position]
+        data = scopes[-1]
+
+        if tokenType == "function":
+            declared = previous in statementStarts and braces[-1] is data
+            position += 1
+
+            # Function name belongs to the outer scope (declarations) or is local to the function
+            if tokens[position][0] == "identifier":
+                if declared:
+                    data.declared.add(tokens[position][1])
+                position += 1
+
+            if tokens[position][0] != "left_paren":
+                raise Unsupported("Function without parameters")
+
+            inner = ScopeData.ScopeData()
+            position += 1
+            while tokens[position][0] != "right_paren":
+                if tokens[position][0] == "identifier":
+                    inner.params.add(tokens[position][1])
+                position += 1
+
+            # Expression closures (JavaScript 1.8) are not supported
+            position += 1
+            if tokens[position][0] != "left_curly":
+                raise Unsupported("Function without body")
+
+            if declarationDepth is not None:
+                declarationDepth += 1
+
+            scopes.append(inner)
+            braces.append(inner)
+            previous = "left_curly"
+            position += 1
+            continue
+
+        elif tokenType == "left_curly":
+            braces.append(None)
+
+        elif tokenType == "right_curly":
+            if braces.pop() is data:
+                __finishScope(data)
+                scopes.pop()
+                __mergeScope(scopes[-1], data)
+
+        elif tokenType == "catch":
+            if tokens[position+1][0] == "left_paren" and tokens[position+2][0] == "identifier":
+                data.declared.add(tokens[position+2][1])
+                position += 3
+                previous = "identifier"
+                continue
+
+        elif tokenType in ("var", "let", "const"):
+            declarationDepth = 0
+            if tokens[position+1][0] == "identifier":
+                data.declared.add(tokens[position+1][1])
+                position += 2
+                previous = "identifier"
+                continue
+
+        elif tokenType == "identifier" and previous != "dot":
+            nextType = position+1 < length and tokens[position+1][0]
+
+            # Getters and setters in object literals (ES5) are functions without function keyword
+            if value in ("get", "set") and previous in ("left_curly", "comma") and nextType in ("identifier", "string", "number") \
+                and position+2 < length and tokens[position+2][0] == "left_paren":
+                raise Unsupported("Getter/Setter")
+
+            # Names of properties in object literals and labels
+            elif nextType == "colon" and previous in ("left_curly", "comma"):
+                pass
+
+            # Following variables of the same declaration
+            elif declarationDepth == 0 and previous == "comma":
+                data.declared.add(value)
+
+            elif value != "arguments":
+                data.increment(value)
+
+                # Support for package-like object access
+                if nextType == "dot":
+                    package = [value]
+                    while position+2 < length and tokens[position+1][0] == "dot" and tokens[position+2][0] == "identifier":
+                        package.append(tokens[position+2][1])
+                        position += 2
+
+                    if len(package) > 1:
+                        package = ".".join(package)
+                        if package in data.packages:
+                            data.packages[package] += 1
+                        else:
+                            data.packages[package] = 1
+
+                        previous = "identifier"
+                        position += 1
+                        continue
+
+        # Track the end of var/let/const statements
+        if declarationDepth is not None:
+            if tokenType in openingTokens:
+                declarationDepth += 1
+            elif tokenType in closingTokens:
+                declarationDepth -= 1
+
+            if declarationDepth < 0 or (declarationDepth == 0 and tokenType in ("semicolon", "in")):
+                declarationDepth = None
+
+        previous = tokenType
+        position += 1
+
+    if len(scopes) > 1:
+        raise Unsupported("Unbalanced braces")
+
+    __finishScope(root)
+
+    return root
@@ -11,11 +11,14 @@ __all__ = ["Resolver"]
 class Resolver():
     """Resolves dependencies between JavaScript files"""
 
-    def __init__(self, session):
+    def __init__(self, session, prescan=False):
         
         # Keep session reference
         self.__session = session
 
+        # Whether to extract dependencies from the token stream of classes (see jasy.js.Prescanner)
+        self.__prescan = prescan
+
         # Keep permutation reference
         self.__permutation = session.getCurrentPermutation()
 
@@ -72,6 +75,12 @@ class Resolver():
         return self
         
 
+    def usesPrescan(self):
+        """ Whether dependencies are extracted from the token stream of the classes where possible """
+
+        return self.__prescan
+
+
     def getRequiredClasses(self):
         """ Returns the user added classes - the so-called required classes. """
         
@@ -114,7 +123,7 @@ class Resolver():
         """ Internal resolver engine which works recursively through all dependencies """
         
         collection.add(classObj)
-        dependencies = classObj.getDependencies(self.__permutation, classes=self.__classes)
+        dependencies = classObj.getDependencies(self.__permutation, classes=self.__classes, prescan=self.__prescan)
         
         for depObj in dependencies:
             if not depObj in collection:
@@ -19,6 +19,7 @@ class Sorter:
         # Classes is set(classObj, ...)
         self.__resolver = resolver
         self.__permutation = session.getCurrentPermutation()
+        self.__prescan = resolver.usesPrescan()
         
         classes = self.__resolver.getIncludedClasses()
 
@@ -112,8 +113,8 @@ class Sorter:
     
         stack.append(classObj)
 
-        classDeps = classObj.getDependencies(self.__permutation, classes=self.__names, warnings=False)
-        classMeta = classObj.getMetaData(self.__permutation)
+        classDeps = classObj.getDependencies(self.__permutation, classes=self.__names, warnings=False, prescan=self.__prescan)
+        classMeta = classObj.getMetaData(self.__permutation, prescan=self.__prescan)
         
         result = set()
         circular = set()
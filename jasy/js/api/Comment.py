@@ -61,25 +61,23 @@ class Comment():
     Comment class is attached to parsed nodes and used to store all comment related information.
     
     The class supports a new Markdown and TomDoc inspired dialect to make developers life easier and work less repeative.
+
+    Creating comments is cheap: only the raw text, variant and position are stored. Outdenting, 
+    annotation parsing and markdown processing happen on first access to one of the processed
+    fields (text, tags, params, returns, type) or the HTML output.
     """
     
     # Relation to code
     context = None
     
-    # Dictionary of tags
-    tags = None
-    
-    # Dictionary of params
-    params = None
-
-    # List of return types
-    returns = None
-    
-    # Static type
-    type = None
-    
-    # Collected text of the comment (without the extracted doc relevant data)
-    text = None
+    # Fields which are filled by the deferred processing:
+    #
+    # - tags: Dictionary of tags
+    # - params: Dictionary of params
+    # - returns: List of return types
+    # - type: Static type
+    # - text: Collected text of the comment (without the extracted doc relevant data)
+    __processedFields = ("tags", "params", "returns", "type", "text")
     
     # Text with extracted / parsed data
     __processedText = None
@@ -128,6 +126,29 @@ class Comment():
         else:
             raise CommentException("Invalid comment text: %s" % text, lineNo)
 
+        # Keep raw data for deferred processing
+        self.__raw = (text, lineNo, indent)
+
+
+    def __getattr__(self, name):
+        """Processes the comment on first access to one of the processed fields"""
+
+        if name in self.__processedFields and "_Comment__raw" in self.__dict__:
+            self.__process()
+            return getattr(self, name)
+
+        raise AttributeError(name)
+
+
+    def __process(self):
+        """Outdents the text and performs annotation parsing, markdown conversion and code highlighting on doc blocks"""
+
+        text, lineNo, indent = self.__raw
+        del self.__raw
+
+        for name in self.__processedFields:
+            setattr(self, name, None)
+
         # Multi line comments need to have their indentation removed
         if "\n" in text:
             text = self.__outdent(text, indent, lineNo)
@@ -326,6 +347,9 @@ class Comment():
         :type highlight: bool
         """
 
+        if "_Comment__raw" in self.__dict__:
+            self.__process()
+
         if not Text.supportsMarkdown:
             raise UserError("Markdown is not supported by the system. Documentation comments could converted to HTML.")
 
@@ -369,14 +393,20 @@ class Comment():
     
 
     def getTags(self):
+        # Only doc comments with something looking like a tag have to be processed for finding tags
+        raw = self.__dict__.get("_Comment__raw")
+        if raw and (self.variant != "doc" or not tagMatcher.search(raw[0])):
+            return None
+
         return self.tags
         
 
     def hasTag(self, name):
-        if not self.tags:
+        tags = self.getTags()
+        if not tags:
             return False
 
-        return name in self.tags
+        return name in tags
 
 
     def __outdent(self, text, indent, startLineNo):
@@ -0,0 +1,285 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+"""
+Whole-program removal of class members which are not referenced by any class of a program.
+
+Members are the entries of the "members" section of core.Class() and the statics of core.Module()
+and core.Main.declareNamespace(). References are collected by name only: every dot access, every
+string which is a valid identifier (e.g. for obj["name"], "name" in obj or property apply methods)
+and every member of an interface. A member is kept when its name is referenced by code which is
+kept as well. Computed accesses which might reach members (a computed key on this, a class or a
+prototype e.g. this[name], or a key built from strings e.g. obj["get" + name]) might reach members
+of every class, so programs containing such accesses keep all members. Other computed accesses
+e.g. list[i] are expected to access plain data.
+"""
+
+import re, fnmatch, hashlib
+
+import jasy.js.parse.Visitor as Visitor
+import jasy.core.Console as Console
+
+from jasy.js.util import *
+
+__all__ = ["MemberData", "collect", "getLive", "getComputed", "getRemoved", "isKept", "getKey", "strip"]
+
+
+# Members which are called implicitly by the JavaScript runtime or the DOM
+implicit = set(["constructor", "toString", "toLocaleString", "valueOf", "toJSON", "handleEvent"])
+
+# Values of members which can be removed without side-effects
+removableTypes = set(["function", "null", "true", "false", "number", "string", "regexp", "identifier", "this"])
+
+# Strings which might be used for accessing members
+identifier = re.compile(r"^[A-Za-z_$][A-Za-z0-9_$]*$")
+
+
+
+#
+# Public API
+#
+
+class MemberData:
+    """
+    Member usage of one class: the names referenced by the code outside of the removable members
+    (references), the names referenced by each removable member (members) and the lines of all
+    accesses with computed keys (computed).
+    """
+
+    def __init__(self, className):
+        self.className = className
+        self.references = set()
+        self.members = {}
+        self.computed = []
+
+
+
+def collect(tree, className=None):
+    """Returns the member data (see MemberData) of the given tree"""
+
+    data = MemberData(className)
+    callName, members = __findMembers(tree)
+
+    # Members of interfaces are required by all implementations
+    if callName == "core.Interface":
+        data.references.update([name for name, node in members])
+        members = []
+
+    # Members with possible side-effects on creation are always kept
+    members = [(name, node) for name, node in members if node[1].type in removableTypes]
+
+    Visitor.visit(tree, [MemberCollector(data, members)])
+
+    return data
+
+
+def getLive(datas, keep=None):
+    """
+    Returns the set of member names which are referenced by the given list of member data (the
+    whole program). The members matching the given keep-list (see isKept()) are used as roots.
+    All members are live when any class accesses members with computed keys (see getComputed()).
+    """
+
+    live = set(implicit)
+    bodies = {}
+    computed = bool(getComputed(datas))
+
+    for data in datas:
+        live.update(data.references)
+
+        for name in data.members:
+            if name in bodies:
+                bodies[name].append(data.members[name])
+            else:
+                bodies[name] = [data.members[name]]
+
+            if computed or isKept(data.className, name, keep):
+                live.add(name)
+
+    # Members referenced by live members are live as well
+    queue = list(live)
+    while queue:
+        for references in bodies.get(queue.pop(), ()):
+            for name in references:
+                if not name in live:
+                    live.add(name)
+                    queue.append(name)
+
+    return live
+
+
+def getComputed(datas):
+    """Returns the member data of all classes of the given list which access members with computed keys"""
+
+    return [data for data in datas if data.computed]
+
+
+def getRemoved(data, live, keep=None):
+    """Returns a sorted tuple of the names of all members of the given member data which are not live"""
+
+    return tuple(sorted([name for name in data.members if not name in live and not isKept(data.className, name, keep)]))
+
+
+def isKept(className, name, keep=None):
+    """
+    Whether the given member is matched by the given keep-list. Entries are member names ("reset") or
+    class names and member names joined by "#" ("my.Application#main"). Both support wildcards ("my.*#*").
+    """
+
+    if keep:
+        for pattern in keep:
+            if "#" in pattern:
+                if fnmatch.fnmatchcase("%s#%s" % (className, name), pattern):
+                    return True
+            elif fnmatch.fnmatchcase(name, pattern):
+                return True
+
+    return False
+
+
+def getKey(names):
+    """Returns a short key of the given list of removed member names for use in cache keys"""
+
+    return hashlib.sha1(",".join(sorted(names)).encode("utf-8")).hexdigest()[:16]
+
+
+def strip(tree, names):
+    """Removes the members with the given names from the given tree. Returns the number of removed members."""
+
+    removed = 0
+    names = set(names)
+
+    callName, members = __findMembers(tree)
+    if callName == "core.Interface":
+        return 0
+
+    for name, node in members:
+        if name in names:
+            Console.debug("Removing unused member %s at line %s", name, node.line)
+            node.parent.remove(node)
+            removed += 1
+
+    return removed
+
+
+
+#
+# Implementation
+#
+
+class MemberCollector:
+    """Collector for jasy.js.parse.Visitor which fills the given member data"""
+
+    enterTypes = set(["dot", "string", "index", "property_init"])
+    leaveTypes = set(["property_init"])
+
+    def __init__(self, data, members):
+        self.__data = data
+
+        # Maps the IDs of the property_init nodes of members to their names
+        self.__members = {}
+        for name, node in members:
+            self.__members[id(node)] = name
+            data.members[name] = set()
+
+        # Stack of the reference sets of the current member
+        self.__stack = [data.references]
+
+
+    def enter(self, node):
+        if node.type == "property_init":
+            if id(node) in self.__members:
+                self.__stack.append(self.__data.members[self.__members[id(node)]])
+
+        elif node.type == "dot":
+            if node[1].type == "identifier":
+                self.__stack[-1].add(node[1].value)
+
+        elif node.type == "string":
+            if identifier.match(node.value) and not (node.parent.type == "property_init" and node.parent[0] is node):
+                self.__stack[-1].add(node.value)
+
+        elif node.type == "index":
+            if self.__isMemberAccess(node):
+                self.__data.computed.append(node.line)
+
+
+    def leave(self, node):
+        if id(node) in self.__members:
+            self.__stack.pop()
+
+
+    def __isMemberAccess(self, index):
+        """Whether the given index node might access class members using a computed key"""
+
+        base, key = index
+        if key.type in ("string", "number"):
+            return False
+
+        # Keys built from strings e.g. obj["get" + name]
+        if key.type == "plus":
+            stack = [key]
+            while stack:
+                node = stack.pop()
+                if node.type == "string":
+                    return True
+                elif node.type == "plus":
+                    stack.extend(node)
+
+        # Computed keys on this, classes (upper case names) and prototypes e.g. this[name], my.Class[name]
+        if base.type == "this":
+            return True
+        elif base.type == "dot" and base[1].type == "identifier":
+            name = base[1].value
+        elif base.type == "identifier":
+            name = base.value
+        else:
+            return False
+
+        return name == "prototype" or name[0].isupper()
+
+
+
+def __getName(propertyInit):
+    key = propertyInit[0]
+    if key.type in ("identifier", "string"):
+        return key.value
+
+    return None
+
+
+def __findMembers(tree):
+    """
+    Returns a tuple of the name of the call defining the class of the given tree and a list of
+    (name, property_init node) of its members.
+    """
+
+    callNode = findCall(tree, ("core.Module", "core.Interface", "core.Class", "core.Main.declareNamespace"))
+    if not callNode:
+        return None, []
+
+    callName = getCallName(callNode)
+    section = getParameterFromCall(callNode, 1)
+    if not section or section.type != "object_init":
+        return callName, []
+
+    if callName in ("core.Class", "core.Interface"):
+        for propertyInit in section:
+            if __getName(propertyInit) == "members":
+                section = propertyInit[1]
+                break
+        else:
+            return callName, []
+
+        if section.type != "object_init":
+            return callName, []
+
+    result = []
+    for propertyInit in section:
+        name = __getName(propertyInit)
+        if name is not None:
+            result.append((name, propertyInit))
+
+    return callName, result
@@ -3,13 +3,15 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
+import hashlib
+
 import jasy.js.parse.Parser as Parser
 import jasy.core.Console as Console
 
 from jasy.js.util import *
 
 
-__all__ = ["patch"]
+__all__ = ["patch", "getSignature"]
 
 
 def __translateToJS(code):
@@ -31,103 +33,140 @@ def __translateToJS(code):
     return code
     
 
-def patch(node, permutation):
-    """ Replaces all occourences with incoming values """
+def __decide(node, permutation):
+    """
+    Returns the replacement decision for the jasy.Env call the given dot node belongs to. The
+    decision is a tuple of kind and value or None when the call is kept. Does not modify the tree.
+    """
 
-    modified = False
+    if node.type != "dot" or node.parent.type != "call":
+        return None
+
+    assembled = assembleDot(node)
     
-    if node.type == "dot" and node.parent.type == "call":
-        assembled = assembleDot(node)
-        
-        # jasy.Env.getValue(key)
-        if assembled == "jasy.Env.getValue" and node.parent.type == "call":
-            callNode = node.parent
-            params = callNode[1]
-            name = params[0].value
-
-            Console.debug("Found jasy.Env.getValue(%s) in line %s", name, node.line)
-
-            replacement = __translateToJS(permutation.get(name))
-            if replacement:
-                replacementNode = Parser.parseExpression(replacement)
-                callNode.parent.replace(callNode, replacementNode)
-                modified = True
+    # jasy.Env.getValue(key)
+    if assembled == "jasy.Env.getValue":
+        callNode = node.parent
+        params = callNode[1]
+        name = params[0].value
 
-                Console.debug("Replaced with %s", replacement)
-         
-        
-        # jasy.Env.isSet(key, expected)
-        # also supports boolean like: jasy.Env.isSet(key)
-        elif assembled == "jasy.Env.isSet" and node.parent.type == "call":
-
-            callNode = node.parent
-            params = callNode[1]
-            name = params[0].value
-
-            Console.debug("Found jasy.Env.isSet(%s) in line %s", name, node.line)
-
-            replacement = __translateToJS(permutation.get(name))
-
-            if replacement != None:
-                # Auto-fill second parameter with boolean "true"
-                expected = params[1] if len(params) > 1 else Parser.parseExpression("true")
-
-                if expected.type in ("string", "number", "true", "false"):
-                    parsedReplacement = Parser.parseExpression(replacement)
-                    expectedValue = getattr(expected, "value", None)
-                    
-                    if expectedValue is not None:
-                        if getattr(parsedReplacement, "value", None) is not None:
-                            replacementResult = parsedReplacement.value in str(expected.value).split("|")
-                        else:
-                            replacementResult = parsedReplacement.type in str(expected.value).split("|")
-                    else:
-                        replacementResult = parsedReplacement.type == expected.type
+        Console.debug("Found jasy.Env.getValue(%s) in line %s", name, node.line)
 
-                    # Do actual replacement
-                    replacementNode = Parser.parseExpression("true" if replacementResult else "false")
-                    callNode.parent.replace(callNode, replacementNode)
-                    modified = True
+        replacement = __translateToJS(permutation.get(name))
+        if replacement:
+            return ("value", replacement)
 
-                    Console.debug("Replaced with %s", "true" if replacementResult else "false")
+    # jasy.Env.isSet(key, expected)
+    # also supports boolean like: jasy.Env.isSet(key)
+    elif assembled == "jasy.Env.isSet":
+        callNode = node.parent
+        params = callNode[1]
+        name = params[0].value
 
-        
-        # jasy.Env.select(key, map)
-        elif assembled == "jasy.Env.select" and node.parent.type == "call":
-            Console.debug("Found jasy.Env.select() in line %s", node.line)
-
-            callNode = node.parent
-            params = callNode[1]
-            replacement = __translateToJS(permutation.get(params[0].value))
-            if replacement:
+        Console.debug("Found jasy.Env.isSet(%s) in line %s", name, node.line)
+
+        replacement = __translateToJS(permutation.get(name))
+
+        if replacement != None:
+            # Auto-fill second parameter with boolean "true"
+            expected = params[1] if len(params) > 1 else Parser.parseExpression("true")
+
+            if expected.type in ("string", "number", "true", "false"):
                 parsedReplacement = Parser.parseExpression(replacement)
-                if parsedReplacement.type != "string":
-                    raise Exception("jasy.Env.select requires that the given replacement is of type string.")
+                expectedValue = getattr(expected, "value", None)
+                
+                if expectedValue is not None:
+                    if getattr(parsedReplacement, "value", None) is not None:
+                        replacementResult = parsedReplacement.value in str(expected.value).split("|")
+                    else:
+                        replacementResult = parsedReplacement.type in str(expected.value).split("|")
+                else:
+                    replacementResult = parsedReplacement.type == expected.type
+
+                return ("value", "true" if replacementResult else "false")
+
+    # jasy.Env.select(key, map)
+    elif assembled == "jasy.Env.select":
+        Console.debug("Found jasy.Env.select() in line %s", node.line)
+
+        callNode = node.parent
+        params = callNode[1]
+        replacement = __translateToJS(permutation.get(params[0].value))
+        if replacement:
+            parsedReplacement = Parser.parseExpression(replacement)
+            if parsedReplacement.type != "string":
+                raise Exception("jasy.Env.select requires that the given replacement is of type string.")
 
-                # Directly try to find matching identifier in second param (map)
-                objectInit = params[1]
-                if objectInit.type == "object_init":
-                    fallbackNode = None
-                    for propertyInit in objectInit:
-                        if propertyInit[0].value == "default":
-                            fallbackNode = propertyInit[1]
+            # Directly try to find matching identifier in second param (map)
+            objectInit = params[1]
+            if objectInit.type == "object_init":
+                fallback = None
+                for position, propertyInit in enumerate(objectInit):
+                    if propertyInit[0].value == "default":
+                        fallback = position
 
-                        elif parsedReplacement.value in str(propertyInit[0].value).split("|"):
-                            callNode.parent.replace(callNode, propertyInit[1])
-                            modified = True
-                            break
+                    elif parsedReplacement.value in str(propertyInit[0].value).split("|"):
+                        return ("select", position)
 
-                    if not modified and fallbackNode is not None:
-                        callNode.parent.replace(callNode, fallbackNode)
-                        modified = True
+                if fallback is not None:
+                    return ("select", fallback)
 
-                        Console.debug("Updated with %s", replacement)
+    return None
 
 
+def patch(node, permutation):
+    """ Replaces all occourences with incoming values """
+
+    modified = False
+    
+    decision = __decide(node, permutation)
+    if decision:
+        callNode = node.parent
+        kind, value = decision
+
+        if kind == "value":
+            callNode.parent.replace(callNode, Parser.parseExpression(value))
+        else:
+            callNode.parent.replace(callNode, callNode[1][1][value][1])
+
+        modified = True
+        Console.debug("Replaced with %s", value)
+
     # Process children
     for child in reversed(node):
         if child != None:
             if patch(child, permutation):
                 modified = True
 
-    return modified
\ No newline at end of file
+    return modified
+
+
+def getSignature(node, permutation):
+    """
+    Returns a key describing the changes patch() would apply to the given tree without modifying it.
+    Permutations with the same signature result in the same patched tree. Returns None when the
+    tree stays unchanged.
+    """
+
+    decisions = []
+    position = 0
+
+    def collect(node):
+        nonlocal position
+
+        decision = __decide(node, permutation)
+        if decision:
+            decisions.append("%s:%s" % (position, decision))
+
+        position += 1
+        for child in node:
+            if child != None:
+                collect(child)
+
+    if permutation:
+        collect(node)
+
+    if not decisions:
+        return None
+
+    return hashlib.sha1("|".join(decisions).encode("utf-8")).hexdigest()
@@ -3,8 +3,12 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
+import collections
+
 import jasy.js.parse.Node as Node
+import jasy.js.parse.ScopeData as ScopeData
 import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.parse.Visitor as Visitor
 
 import jasy.core.Console as Console
 
@@ -25,31 +29,25 @@ class Error(Exception):
 
 
 
-def cleanup(node):
+def cleanup(node, scanned=False):
     """
+    Removes unused variables, params and functions from the given tree. Returns whether
+    anything was removed. The scope data attached to the tree (see jasy.js.parse.ScopeScanner)
+    is kept up to date. When scanned is enabled, the existing scope data is expected to be
+    up to date already and the initial scan is omitted.
     """
-    
-    if not hasattr(node, "variables"):
-        ScopeScanner.scan(node)
 
-    # Re cleanup until nothing to remove is found
-    x = 0
-    cleaned = False
-    
+    usage = UsageCollector()
+    if scanned:
+        Visitor.visit(node, [usage])
+    else:
+        Visitor.visit(node, [ScopeScanner.ScopeCollector(), usage])
+
     Console.debug("Removing unused variables...")
-    while True:
-        x = x + 1
-        #debug("Removing unused variables [Iteration: %s]...", x)
-        Console.indent()
-
-        if __cleanup(node):
-            ScopeScanner.scan(node)
-            cleaned = True
-            Console.outdent()
-        else:
-            Console.outdent()
-            break
-        
+    Console.indent()
+    cleaned = Cleaner(usage.records).run()
+    Console.outdent()
+
     return cleaned
 
 
@@ -58,135 +56,418 @@ def cleanup(node):
 # Implementation
 #
 
-def __cleanup(node):
-    """ The scanner part which looks for scopes with unused variables/params """
-    
-    cleaned = False
-    
-    for child in list(node):
-        if child != None and __cleanup(child):
-            cleaned = True
+class Usage:
+    """
+    Counters of one scope which are not part of its scope data but required to keep the scope
+    data up to date while removing code: the nodes declaring each variable (declarations, declared
+    functions, catch blocks) and the number of modifications of each variable. Modifications of
+    shared variables in inner scopes are counted in the outer scope as well.
+    """
 
-    if node.type == "script" and node.scope.unused and hasattr(node, "parent"):
-        if __recurser(node, node.scope.unused):
-            cleaned = True
+    __slots__ = ["script", "parent", "declarations", "modified", "dead"]
 
-    return cleaned
-            
-            
-            
-def __recurser(node, unused):
-    """ 
-    The cleanup part which always processes one scope and cleans up params and
-    variable definitions which are unused
+    def __init__(self, script, parent):
+        self.script = script
+        self.parent = parent
+        self.declarations = {}
+        self.modified = {}
+        self.dead = False
+
+    def declare(self, name, node):
+        if name in self.declarations:
+            self.declarations[name].append(node)
+        else:
+            self.declarations[name] = [node]
+
+    def modify(self, name, by=1):
+        if name in self.modified:
+            self.modified[name] += by
+        else:
+            self.modified[name] = by
+
+
+
+class UsageCollector:
     """
-    
-    retval = False
-    
-    # Process children
-    if node.type != "function":
-        for child in node:
-            # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
-            if child != None:
-                if __recurser(child, unused):
-                    retval = True
-                    
+    Collector for jasy.js.parse.Visitor which creates a Usage instance for every scope. Must run after
+    (or together with and after) jasy.js.parse.ScopeScanner.ScopeCollector. The records are available
+    in post order (inner scopes first) afterwards.
+    """
+
+    enterTypes = set(["script", "function", "declaration", "identifier", "block"])
+    leaveTypes = set(["script"])
+
+    def __init__(self, usage=None):
+        self.records = []
+
+        # Usage of all currently open scopes, see ScopeCollector
+        self.__stack = [] if usage is None else [usage]
+
+
+    def enter(self, node):
+        if node.type == "script":
+            self.__stack.append(Usage(node, self.__stack[-1] if self.__stack else None))
+            return
+
+        usage = self.__stack[-1]
+
+        if node.type == "function":
+            if node.functionForm == "declared_form":
+                usage.declare(node.name, node)
+                usage.modify(node.name)
+
+        elif node.type == "declaration":
+            varName = getattr(node, "name", None)
+            if varName != None:
+                usage.declare(varName, node)
+                if hasattr(node, "initializer"):
+                    usage.modify(varName)
+
+            else:
+                for identifier in node.names:
+                    usage.declare(identifier.value, node)
+                    usage.modify(identifier.value)
+
+        elif node.type == "identifier":
+            parent = node.parent
+            if parent.type in ("increment", "decrement") or (parent.type == "assign" and parent[0] == node):
+                if node.value != "arguments":
+                    usage.modify(node.value)
+
+        elif node.type == "block" and node.parent.type == "catch":
+            usage.declare(node.parent.exception.value, node)
+
+
+    def leave(self, node):
+        usage = self.__stack.pop()
+        self.records.append(usage)
+
+        if self.__stack:
+            outer = self.__stack[-1]
+            shared = node.scope.shared
+            for name in usage.modified:
+                if name in shared:
+                    outer.modify(name, usage.modified[name])
+
+
+
+class Cleaner:
+    """
+    Removes unused variables, params and functions using a work list of (usage, name) entries. Instead
+    of scanning the whole tree again after each round, the counters of the removed code are subtracted
+    from the scope data of the enclosing scopes. Only variables which became unused this way are queued again.
+    """
+
+    def __init__(self, records):
+        self.__records = {}
+        self.__queue = collections.deque()
+
+        for usage in records:
+            self.__records[id(usage.script)] = usage
+
+            # Top-level scope is never cleaned up
+            if hasattr(usage.script, "parent"):
+                for name in sorted(usage.script.scope.unused):
+                    self.__queue.append((usage, name))
+
+
+    def run(self):
+        """Processes the queue until it is empty. Returns whether anything was removed."""
+
+        cleaned = False
+        queue = self.__queue
+
+        while queue:
+            usage, name = queue.popleft()
+            if not usage.dead and name in usage.script.scope.unused and hasattr(usage.script, "parent"):
+                if self.__clean(usage, name):
+                    cleaned = True
+
+        return cleaned
+
+
+    def __clean(self, usage, name):
+        """Removes the given unused variable from the scope of the given usage"""
+
+        script = usage.script
+        scope = script.scope
+        function = script.parent
+        retval = False
 
-    if node.type == "script" and hasattr(node, "parent"):
         # Remove unused parameters
-        params = getattr(node.parent, "params", None)
-        if params:
-            # Start from back, as we can only remove params as long
-            # as there is not a required one after the current one
-            for identifier in reversed(params):
-                if identifier.value in unused:
-                    Console.debug("Removing unused parameter '%s' in line %s", identifier.value, identifier.line)
-                    params.remove(identifier)
+        if name in scope.params and self.__removeParams(usage):
+            retval = True
+
+        # Remove function name which is unused
+        if name == scope.name and function.functionForm == "expressed_form" and getattr(function, "name", None) == name:
+            Console.debug("Removing unused function name at line %s" % script.line)
+            del function.name
+            scope.name = None
+            self.__release(usage, name)
+            retval = True
+
+            # A variable initialized with this function might be removable now
+            if getattr(function, "rel", None) == "initializer" and usage.parent:
+                declName = getattr(function.parent, "name", None)
+                if declName in usage.parent.script.scope.unused:
+                    self.__queue.append((usage.parent, declName))
+
+        for node in list(usage.declarations.get(name, ())):
+            if node.type == "function":
+                if self.__removeFunction(usage, node):
                     retval = True
-                else:
-                    break
-
-        # Remove function names which are unused
-        if node.parent.functionForm == "expressed_form":
-            funcName = getattr(node.parent, "name", None)
-            if funcName != None and funcName in unused:
-                Console.debug("Removing unused function name at line %s" % node.line)
-                del node.parent.name
-                retval = True
-                    
-                    
-    elif node.type == "function":
-        # Remove full unused functions (when not in top-level scope)
-        if node.functionForm == "declared_form" and getattr(node, "parent", None) and node.parent.type != "call":
-            funcName = getattr(node, "name", None)
-            if funcName != None and funcName in unused:
-                Console.debug("Removing unused function declaration %s at line %s" % (funcName, node.line))
-                node.parent.remove(node)
-                retval = True
-            
-    
-    elif node.type == "var":
-        for decl in reversed(node):
-            if getattr(decl, "name", None) in unused:
-                if hasattr(decl, "initializer"):
-                    init = decl.initializer
-                    if init.type in ("null", "this", "true", "false", "identifier", "number", "string", "regexp"):
-                        Console.debug("Removing unused primitive variable %s at line %s" % (decl.name, decl.line))
-                        node.remove(decl)
-                        retval = True
-                        
-                    elif init.type == "function" and (not hasattr(init, "name") or init.name in unused):
-                        Console.debug("Removing unused function variable %s at line %s" % (decl.name, decl.line))
-                        node.remove(decl)
-                        retval = True
-                    
-                    # If we have only one child, we replace the whole var statement with just the init block
-                    elif len(node) == 1:
-                        semicolon = Node.Node(init.tokenizer, "semicolon")
-                        semicolon.append(init, "expression")
-
-                        # Protect non-expressions with parens
-                        if init.type in ("array_init", "object_init"):
-                            init.parenthesized = True
-                        elif init.type == "call" and init[0].type == "function":
-                            init[0].parenthesized = True
-                        
-                        node.parent.replace(node, semicolon)
-                        retval = True
-
-                    # If we are the last declaration, move it out of node and append after var block
-                    elif node[-1] == decl or node[0] == decl:
-                        isFirst = node[0] == decl
-                        
-                        node.remove(decl)
-                        nodePos = node.parent.index(node)
-                        semicolon = Node.Node(init.tokenizer, "semicolon")
-                        semicolon.append(init, "expression")
-
-                        # Protect non-expressions with parens
-                        if init.type in ("array_init", "object_init"):
-                            init.parenthesized = True
-                        elif init.type == "call" and init[0].type == "function":
-                            init[0].parenthesized = True
-
-                        if isFirst:
-                            node.parent.insert(nodePos, semicolon)
-                        else:
-                            node.parent.insert(nodePos + 1, semicolon)
-                            
-                        retval = True
-                        
-                    else:
-                        Console.debug("Could not automatically remove unused variable %s at line %s without possible side-effects" % (decl.name, decl.line))
-                    
-                else:
-                    node.remove(decl)
+
+            elif node.type == "declaration" and node.parent.type == "var":
+                if self.__removeDeclaration(usage, node):
                     retval = True
-                    
+
+        return retval
+
+
+    def __removeParams(self, usage):
+        """Removes unused parameters as long as there is no required one after them"""
+
+        scope = usage.script.scope
+        params = usage.script.parent.params
+        retval = False
+
+        # Start from back, as we can only remove params as long
+        # as there is not a required one after the current one
+        for identifier in reversed(list(params)):
+            if not identifier.value in scope.unused:
+                break
+
+            Console.debug("Removing unused parameter '%s' in line %s", identifier.value, identifier.line)
+            params.remove(identifier)
+            retval = True
+
+            if not any(other.value == identifier.value for other in params):
+                scope.params.discard(identifier.value)
+                self.__release(usage, identifier.value)
+
+        return retval
+
+
+    def __removeFunction(self, usage, node):
+        """Removes the given declared function (when not in top-level scope)"""
+
+        if node.functionForm != "declared_form" or not getattr(node, "parent", None) or node.parent.type == "call":
+            return False
+
+        Console.debug("Removing unused function declaration %s at line %s" % (node.name, node.line))
+        self.__forget(usage, *self.__collect(node))
+        node.parent.remove(node)
+        self.__undeclare(usage, node.name, node)
+
+        return True
+
+
+    def __removeDeclaration(self, usage, decl):
+        """Removes the given declaration of a var statement. Keeps initializers with possible side-effects."""
+
+        node = decl.parent
+        name = decl.name
+
+        if hasattr(decl, "initializer"):
+            init = decl.initializer
+            if init.type in ("null", "this", "true", "false", "identifier", "number", "string", "regexp"):
+                Console.debug("Removing unused primitive variable %s at line %s" % (name, decl.line))
+                self.__forget(usage, *self.__collect(decl))
+                node.remove(decl)
+
+            elif init.type == "function" and (not self.__hasUsedName(init) or init.name in usage.script.scope.unused):
+                Console.debug("Removing unused function variable %s at line %s" % (name, decl.line))
+                self.__forget(usage, *self.__collect(decl))
+                node.remove(decl)
+
+            # If we have only one child, we replace the whole var statement with just the init block
+            elif len(node) == 1:
+                semicolon = Node.Node(init.tokenizer, "semicolon")
+                semicolon.append(init, "expression")
+
+                # Protect non-expressions with parens
+                if init.type in ("array_init", "object_init"):
+                    init.parenthesized = True
+                elif init.type == "call" and init[0].type == "function":
+                    init[0].parenthesized = True
+
+                # The initializer itself is kept, only the assignment to the variable is gone
+                self.__forget(usage, {}, { name : 1 }, {})
+                node.parent.replace(node, semicolon)
+
+            # If we are the last declaration, move it out of node and append after var block
+            elif node[-1] == decl or node[0] == decl:
+                isFirst = node[0] == decl
+
+                node.remove(decl)
+                nodePos = node.parent.index(node)
+                semicolon = Node.Node(init.tokenizer, "semicolon")
+                semicolon.append(init, "expression")
+
+                # Protect non-expressions with parens
+                if init.type in ("array_init", "object_init"):
+                    init.parenthesized = True
+                elif init.type == "call" and init[0].type == "function":
+                    init[0].parenthesized = True
+
+                if isFirst:
+                    node.parent.insert(nodePos, semicolon)
+                else:
+                    node.parent.insert(nodePos + 1, semicolon)
+
+                self.__forget(usage, {}, { name : 1 }, {})
+
+            else:
+                Console.debug("Could not automatically remove unused variable %s at line %s without possible side-effects" % (name, decl.line))
+                return False
+
+        else:
+            node.remove(decl)
+
+        self.__undeclare(usage, name, decl)
+
         if len(node) == 0:
             Console.debug("Removing empty 'var' block at line %s" % node.line)
             node.parent.remove(node)
 
-    return retval
+        else:
+            # Declarations which could not be removed before might be first or last now
+            unused = usage.script.scope.unused
+            for other in node:
+                otherName = getattr(other, "name", None)
+                if otherName in unused:
+                    self.__queue.append((usage, otherName))
+
+        return True
+
+
+    def __hasUsedName(self, function):
+        """
+        Whether the given function has a name which is accessed inside of the function itself. Variables
+        and params of the same name hide the name of the function.
+        """
+
+        name = getattr(function, "name", None)
+        if name is None:
+            return False
+
+        # Expression closures have no scope of their own
+        scope = getattr(function.body, "scope", None)
+        if scope is None:
+            return True
+
+        return name == scope.name and not name in scope.unused and not name in scope.declared and not name in scope.params
+
+
+    def __collect(self, node):
+        """
+        Returns the accessed, modified and package counters of the given sub tree as seen by the enclosing scope.
+        Marks all scopes inside the sub tree as dead as it is about to be removed.
+        """
+
+        scope = ScopeData.ScopeData()
+        usage = Usage(None, None)
+        collector = UsageCollector(usage)
+        Visitor.visit(node, [ScopeScanner.ScopeCollector(scope), collector])
+
+        for inner in collector.records:
+            key = id(inner.script)
+            if key in self.__records:
+                self.__records[key].dead = True
+
+        return scope.accessed, usage.modified, scope.packages
+
+
+    def __forget(self, usage, accessed, modified, packages):
+        """
+        Subtracts the given counters of removed code from the scope data of the given usage. Counters
+        of shared variables and packages are subtracted from the outer scopes as well. Variables which
+        are not accessed anymore are marked as unused and queued.
+        """
+
+        while usage and (accessed or modified or packages):
+            scope = usage.script.scope
+            declared = scope.declared
+            params = scope.params
+
+            outerAccessed = {}
+            outerModified = {}
+            outerPackages = {}
+
+            for name in accessed:
+                count = accessed[name]
+                left = scope.accessed[name] - count
+                if left:
+                    scope.accessed[name] = left
+                else:
+                    del scope.accessed[name]
+
+                if name in declared or name in params:
+                    if not left:
+                        scope.unused.add(name)
+                        self.__queue.append((usage, name))
+
+                    continue
+
+                if left:
+                    scope.shared[name] = left
+                else:
+                    del scope.shared[name]
+
+                    if name == scope.name:
+                        scope.unused.add(name)
+                        self.__queue.append((usage, name))
+
+                outerAccessed[name] = count
+
+            for name in modified:
+                count = modified[name]
+                left = usage.modified[name] - count
+                if left:
+                    usage.modified[name] = left
+                else:
+                    del usage.modified[name]
+                    scope.modified.discard(name)
+
+                if not name in declared and not name in params:
+                    outerModified[name] = count
+
+            for package in packages:
+                top = package[0:package.index(".")]
+                if top in declared or top in params:
+                    continue
+
+                count = packages[package]
+                left = scope.packages[package] - count
+                if left:
+                    scope.packages[package] = left
+                else:
+                    del scope.packages[package]
+
+                outerPackages[package] = count
+
+            usage = usage.parent
+            accessed = outerAccessed
+            modified = outerModified
+            packages = outerPackages
+
+
+    def __undeclare(self, usage, name, node):
+        """Removes the given declaring node of the given variable"""
+
+        declarations = usage.declarations[name]
+        declarations.remove(node)
+
+        if not declarations:
+            del usage.declarations[name]
+            usage.script.scope.declared.discard(name)
+            self.__release(usage, name)
+
+
+    def __release(self, usage, name):
+        """Removes the given variable from the unused list when it is not part of the scope anymore"""
 
-    
\ No newline at end of file
+        scope = usage.script.scope
+        if not name in scope.declared and not name in scope.params:
+            if name != scope.name or name in scope.accessed:
+                scope.unused.discard(name)
@@ -9,6 +9,9 @@ import jasy.js.tokenize.Lang
 __all__ = ["optimize", "Error"]
 
 
+# Supported renaming modes (see optimize())
+modes = ("default", "gzip")
+
 
 #
 # Public API
@@ -24,15 +27,23 @@ class Error(Exception):
         return "Unallowed private field access to %s at line %s!" % (self.__name, self.__line)
 
 
-def optimize(node):
+def optimize(node, mode="default"):
     """
     Node to optimize with the global variables to ignore as names
+
+    In every scope the shortest names are given to the most accessed variables. The "gzip" mode
+    additionally gives a variable the same name as a variable with the same original name in a
+    sibling scope (e.g. the "value" param of all members of a class) whenever this name is not longer
+    than the next free one. This produces more repeated strings which compress better using gzip.
     """
     
+    if not mode in modes:
+        raise Exception("Unsupported mode: %s" % mode)
+
     blocked = set(node.scope.shared.keys())
     blocked.update(node.scope.modified)
     
-    __patch(node, blocked)
+    __patch(node, blocked, mode=mode)
 
 
 
@@ -53,7 +64,7 @@ def __baseEncode(num, alphabet=string.ascii_letters):
     return "".join(arr)
 
 
-def __patch(node, blocked=None, enable=False, translate=None):
+def __patch(node, blocked=None, enable=False, translate=None, mode="default", siblings=None):
     # Start with first level scopes (global scope should not be affected)
     if node.type == "script" and hasattr(node, "parent"):
         enable = True
@@ -110,9 +121,22 @@ def __patch(node, blocked=None, enable=False, translate=None):
                         pos += 1
                         if not repl in usedRepl and not repl in jasy.js.tokenize.Lang.keywords and not repl in blocked:
                             break
+
+                    # Prefer the name of the same variable in a sibling scope when it is not longer. The
+                    # replacement found above is used for the next variable then.
+                    if mode == "gzip" and siblings and name in siblings:
+                        preferred = siblings[name]
+                        if preferred != repl and len(preferred) <= len(repl) and not preferred in usedRepl and not preferred in blocked:
+                            pos -= 1
+                            repl = preferred
                 
                     # print("Translate: %s => %s" % (name, repl))
                     translate[name] = repl
+                    usedRepl.add(repl)
+
+                if mode == "gzip" and siblings is not None:
+                    for name in namesSorted:
+                        siblings.setdefault(name, translate[name])
 
 
     #
@@ -168,9 +192,14 @@ def __patch(node, blocked=None, enable=False, translate=None):
     #
     # PROCESS CHILDREN
     #
+
+    # Names of variables in scopes which are direct children of the current one
+    if node.type == "script":
+        siblings = {}
+
     for child in node:
         # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
         if child != None:
-            __patch(child, blocked, enable, translate)
+            __patch(child, blocked, enable, translate, mode, siblings)
 
 
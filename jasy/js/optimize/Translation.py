@@ -6,6 +6,7 @@
 import re, copy, polib
 
 import jasy.js.parse.Node as Node
+import jasy.js.parse.Visitor as Visitor
 import jasy.item.Translation as Translation
 
 from jasy import UserError
@@ -16,7 +17,7 @@ import jasy.core.Console as Console
 # Public API
 #
 
-__all__ = ["hasText", "optimize", "collectTranslations"]
+__all__ = ["hasText", "optimize", "collectTranslations", "TranslationCollector"]
 
 translationFunctions = ("tr", "trc", "trn", "marktr")
 
@@ -62,8 +63,15 @@ def parseParams(params, funcName):
 
 
 
-def __collectionRecurser(node, collection):
-    if node.type == "call":
+class TranslationCollector:
+    """Collector for jasy.js.parse.Visitor which maps the IDs of all used translations to their lines"""
+
+    enterTypes = set(["call"])
+
+    def __init__(self):
+        self.collection = {}
+
+    def enter(self, node):
         funcName = None
         
         if node[0].type == "identifier":
@@ -74,21 +82,16 @@ def __collectionRecurser(node, collection):
         if funcName in translationFunctions:
             translationId = Translation.generateId(*parseParams(node[1], funcName))
             if translationId:
-                if translationId in collection:
-                    collection[translationId].append(node.line)
+                if translationId in self.collection:
+                    self.collection[translationId].append(node.line)
                 else:
-                    collection[translationId] = [node.line]
-
-    # Process children
-    for child in node:
-        if child != None:
-            __collectionRecurser(child, collection)
-
-    return collection
+                    self.collection[translationId] = [node.line]
 
 
 def collectTranslations(node):
-    return __collectionRecurser(node, dict())
+    collector = TranslationCollector()
+    Visitor.visit(node, [collector])
+    return collector.collection
 
 
 
@@ -10,7 +10,7 @@ import jasy.js.optimize.CombineDeclarations as CombineDeclarations
 import jasy.js.optimize.ClosureWrapper as ClosureWrapper
 
 
-__all__ = ["Error", "Optimization"]
+__all__ = ["Error", "Optimization", "getPrefixKey"]
 
 
 class Error(Exception):
@@ -26,6 +26,29 @@ class Error(Exception):
 
 
 
+# Optimization passes in the order they are applied: (name, method, error class)
+passes = (
+    ("wrap", ClosureWrapper.optimize, CryptPrivates.Error),
+    ("declarations", CombineDeclarations.optimize, CombineDeclarations.Error),
+    ("blocks", BlockReducer.optimize, BlockReducer.Error),
+    ("variables", LocalVariables.optimize, LocalVariables.Error),
+    ("names", lambda tree: LocalVariables.optimize(tree, "gzip"), LocalVariables.Error),
+    ("privates", lambda tree: CryptPrivates.optimize(tree, tree.fileId), CryptPrivates.Error)
+)
+
+passMethods = dict((name, (method, error)) for name, method, error in passes)
+
+
+def getPrefixKey(names):
+    """
+    Returns the key of the given list of passes (a prefix of Optimization.getPasses()). Other than
+    Optimization.getKey() the names are kept in the order in which the passes are applied.
+    """
+    
+    return ">".join(names)
+
+
+
 class Optimization:
     """
     Configures an optimization object which can be used to compress classes afterwards.
@@ -60,45 +83,46 @@ class Optimization:
         self.__key = None
         
 
-    def apply(self, tree):
+    def getPasses(self):
+        """
+        Returns the names of the enabled optimization passes in the order they are applied.
+        """
+        
+        enabled = self.__optimizations
+        result = [name for name, method, error in passes if name in enabled]
+
+        # Local variables are renamed only once. The gzip friendly names win.
+        if "names" in enabled and "variables" in enabled:
+            result.remove("variables")
+
+        return result
+
+
+    def apply(self, tree, done=0, callback=None):
         """
         Applies the configured optimizations to the given node tree. Modifies the tree in-place
         to be sure to have a deep copy if you need the original one. It raises an error instance
         whenever any optimization could not be applied to the given tree.
+
+        The first done passes (see getPasses()) are expected to be applied to the tree already
+        e.g. when it was restored from a cache. The optional callback is called with the key of
+        the applied passes (see getPrefixKey()) and the tree after each pass.
         """
         
-        enabled = self.__optimizations
+        enabled = self.getPasses()
         
-        if "wrap" in enabled:
-            try:
-                ClosureWrapper.optimize(tree)
-            except CryptPrivates.Error as err:
-                raise Error(err)
+        for pos in range(done, len(enabled)):
+            name = enabled[pos]
+            method, error = passMethods[name]
             
-        if "declarations" in enabled:
-            try:
-                CombineDeclarations.optimize(tree)
-            except CombineDeclarations.Error as err:
-                raise Error(err)
-
-        if "blocks" in enabled:
             try:
-                BlockReducer.optimize(tree)
-            except BlockReducer.Error as err:
-                raise Error(err)
-
-        if "variables" in enabled:
-            try:
-                LocalVariables.optimize(tree)
-            except LocalVariables.Error as err:
-                raise Error(err)
-
-        if "privates" in enabled:
-            try:
-                CryptPrivates.optimize(tree, tree.fileId)
-            except CryptPrivates.Error as err:
+                method(tree)
+            except error as err:
                 raise Error(err)
                 
+            if callback:
+                callback(getPrefixKey(enabled[:pos+1]), tree)
+                
                 
     def getKey(self):
         """
@@ -10,29 +10,25 @@
 #   - Sebastian Werner <info@sebastian-werner.net> (Refactoring Python) (2010)
 #
 
-import json, copy
+import json
 
 class Node(list):
     
+    # Only core data is stored inline. Node type specific and dynamically added data 
+    # (see extraAttributes) is stored in a mapping which is only allocated when used.
     __slots__ = [
         # core data
         "line", "type", "tokenizer", "start", "end", "rel", "parent", 
         
-        # dynamic added data by other modules
-        "comments", "scope", 
-        
-        # node type specific
-        "value", "expression", "body", "functionForm", "parenthesized", "fileId", "params", 
-        "name", "readOnly", "initializer", "condition", "isLoop", "isEach", "object", "assignOp",
-        "iterator", "thenPart", "exception", "elsePart", "setup", "postfix", "update", "tryBlock",
-        "block", "defaultIndex", "discriminant", "label", "statements", "finallyBlock", 
-        "statement", "variables", "names", "guard", "for", "tail", "expressionClosure"
+        # mapping of extra attributes
+        "extra"
     ]
     
     
     def __init__(self, tokenizer=None, type=None, args=[]):
         list.__init__(self)
         
+        self.extra = None
         self.start = 0
         self.end = 0
         self.line = None
@@ -57,8 +53,11 @@ class Node(list):
 
             self.tokenizer = tokenizer
             
-        elif type:
-            self.type = type
+        else:
+            self.tokenizer = None
+
+            if type:
+                self.type = type
 
         for arg in args:
             self.append(arg)
@@ -125,7 +124,7 @@ class Node(list):
             if not isinstance(kid, Node):
                 raise Exception("Invalid kid: %s" % kid)
             
-            if hasattr(kid, "tokenizer"):
+            if kid.tokenizer:
                 if hasattr(kid, "start"):
                     if not hasattr(self, "start") or self.start == None or kid.start < self.start:
                         self.start = kid.start
@@ -184,7 +183,7 @@ class Node(list):
         relatedChildren = []
         attrsCollection = []
         
-        for name in self.__slots__:
+        for name in allAttributes:
             # "type" is used as node name - no need to repeat it as an attribute
             # "parent" is a relation to the parent node - for serialization we ignore these at the moment
             # "rel" is used internally to keep the relation to the parent - used by nodes which need to keep track of specific children
@@ -232,7 +231,7 @@ class Node(list):
                     statValue = scope[statKey]
                     if statValue != None and len(statValue) > 0:
                         if type(statValue) is set:
-                            statValue = ",".join(statValue)
+                            statValue = ",".join(sorted(statValue))
                         elif type(statValue) is dict:
                             statValue = ",".join(statValue.keys())
                         
@@ -256,41 +255,101 @@ class Node(list):
         return result
         
         
-    def __deepcopy__(self, memo):
-        """Used by deepcopy function to clone Node instances"""
-        
-        # Create copy
-        if hasattr(self, "tokenizer"):
-            result = Node(tokenizer=self.tokenizer)
-        else:
-            result = Node(type=self.type)
-        
-        # Copy children
-        for child in self:
-            if child is None:
-                list.append(result, None)
-            else:
-                # Using simple list appends for better performance
-                childCopy = copy.deepcopy(child, memo)
-                childCopy.parent = result
-                list.append(result, childCopy)
-        
-        # Sync attributes
-        # Note: "parent" attribute is handled by append() already
-        for name in self.__slots__:
-            if hasattr(self, name) and not name in ("parent", "tokenizer"):
-                value = getattr(self, name)
-                if value is None:
-                    pass
-                elif type(value) in (bool, int, float, str):
-                    setattr(result, name, value)
-                elif type(value) in (list, set, dict, Node):
-                    setattr(result, name, copy.deepcopy(value, memo))
-                # Scope can be assigned (will be re-created when needed for the copied node)
-                elif name == "scope":
-                    result.scope = self.scope
+    def clone(self):
+        """
+        Returns a copy of the node including all children. Attribute values which are not 
+        modified in place by the tree processing (strings, numbers, comments, scope data) 
+        are shared with the original. Containers (list, set, dict) are copied flat.
+        Children are copied using an explicit stack (not limited by the recursion limit).
+        """
+
+        result = self.__copy()
+
+        stack = [(self, result)]
+        while stack:
+            original, copy = stack.pop()
+
+            for child in original:
+                if child is None:
+                    list.append(copy, None)
+                else:
+                    childCopy = child.__copy()
+                    childCopy.parent = copy
+                    list.append(copy, childCopy)
+
+                    rel = getattr(childCopy, "rel", None)
+                    if rel is not None:
+                        setattr(copy, rel, childCopy)
+
+                    if len(child):
+                        stack.append((child, childCopy))
+
+        return result
+
+
+    def __copy(self):
+        """Returns a copy of the node without any children (see clone())"""
+
+        result = Node.__new__(Node)
+
+        result.type = self.type
+        result.line = self.line
+        result.start = self.start
+        result.end = self.end
+        result.tokenizer = self.tokenizer
+        result.extra = None
+
+        rel = getattr(self, "rel", None)
+        if rel is not None:
+            result.rel = rel
+
+        extra = self.extra
+        if extra:
+            copied = {}
+            for name in extra:
+                value = extra[name]
+                valueClass = value.__class__
+
+                if valueClass is Node:
+                    # Related children are re-assigned while copying the children
+                    continue
+                elif valueClass in (list, set, dict):
+                    value = valueClass(value)
+
+                copied[name] = value
+
+            if copied:
+                result.extra = copied
 
         return result
+
+
+    def getEstimatedSize(self):
+        """
+        Returns a rough estimation of the memory used by the node and its children in bytes (see
+        jasy.core.Cache.estimateSize()). Based on the length of the source range when available
+        and on the number of nodes otherwise (e.g. trees restored by jasy.js.parse.Serializer).
+        """
+
+        if self.start is not None and self.end is not None and self.end > self.start:
+            return (self.end - self.start) * estimatedBytesPerChar
+
+        count = 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            count += 1
+            for child in node:
+                if child is not None:
+                    stack.append(child)
+
+        return count * estimatedBytesPerNode
+
+
+    def __deepcopy__(self, memo):
+        """Used by deepcopy function to clone Node instances (see clone())"""
+
+        return self.clone()
         
         
     def getSource(self):
@@ -320,3 +379,53 @@ class Node(list):
 
     def __bool__(self): 
         return True
+
+
+# Average memory used per node and per character of source code (see Node.getEstimatedSize())
+estimatedBytesPerNode = 140
+estimatedBytesPerChar = 24
+
+# Node type specific and dynamically added (comments, scope) attributes
+extraAttributes = (
+    "comments", "scope", 
+    "value", "expression", "body", "functionForm", "parenthesized", "fileId", "params", 
+    "name", "readOnly", "initializer", "condition", "isLoop", "isEach", "object", "assignOp",
+    "iterator", "thenPart", "exception", "elsePart", "setup", "postfix", "update", "tryBlock",
+    "block", "defaultIndex", "discriminant", "label", "statements", "finallyBlock", 
+    "statement", "variables", "names", "guard", "for", "tail", "expressionClosure"
+)
+
+# All supported attributes in a stable order
+allAttributes = tuple(["line", "type", "tokenizer", "start", "end", "rel", "parent"] + list(extraAttributes))
+
+
+def __createExtraProperty(name):
+    """Creates a property which maps the given attribute to the extra mapping of the node"""
+
+    def getter(self):
+        try:
+            return self.extra[name]
+        except (KeyError, TypeError):
+            raise AttributeError(name)
+
+    def setter(self, value):
+        extra = self.extra
+        if extra is None:
+            self.extra = { name : value }
+        else:
+            extra[name] = value
+
+    def deleter(self):
+        try:
+            del self.extra[name]
+        except (KeyError, TypeError):
+            raise AttributeError(name)
+
+        if not self.extra:
+            self.extra = None
+
+    return property(getter, setter, deleter)
+
+
+for name in extraAttributes:
+    setattr(Node, name, __createExtraProperty(name))
@@ -24,7 +24,7 @@ def parseExpression(source, fileId=None, line=1, builder=None):
     if not source.endswith(";"):
         source = source + ";"
     
-    tokenizer = jasy.js.tokenize.Tokenizer.Tokenizer(source, fileId, line)
+    tokenizer = jasy.js.tokenize.Tokenizer.create(source, fileId, line)
     staticContext = StaticContext(False, builder)
     
     return Expression(tokenizer, staticContext)
@@ -35,7 +35,7 @@ def parse(source, fileId=None, line=1, builder=None):
     if builder == None:
         builder = jasy.js.parse.VanillaBuilder.VanillaBuilder()
     
-    tokenizer = jasy.js.tokenize.Tokenizer.Tokenizer(source, fileId, line)
+    tokenizer = jasy.js.tokenize.Tokenizer.create(source, fileId, line)
     staticContext = StaticContext(False, builder)
     node = Script(tokenizer, staticContext)
     
@@ -1135,7 +1135,7 @@ def AssignExpression(tokenizer, staticContext):
 
 def ConditionalExpression(tokenizer, staticContext):
     builder = staticContext.builder
-    node = OrExpression(tokenizer, staticContext)
+    node = BinaryExpression(tokenizer, staticContext)
 
     if tokenizer.match("hook"):
         childNode = node
@@ -1159,151 +1159,70 @@ def ConditionalExpression(tokenizer, staticContext):
     return node
     
 
-def OrExpression(tokenizer, staticContext):
-    builder = staticContext.builder
-    node = AndExpression(tokenizer, staticContext)
-    
-    while tokenizer.match("or"):
-        childNode = builder.OR_build(tokenizer)
-        builder.OR_addOperand(childNode, node)
-        builder.OR_addOperand(childNode, AndExpression(tokenizer, staticContext))
-        builder.OR_finish(childNode)
-        node = childNode
-
-    return node
-
-
-def AndExpression(tokenizer, staticContext):
-    builder = staticContext.builder
-    node = BitwiseOrExpression(tokenizer, staticContext)
-
-    while tokenizer.match("and"):
-        childNode = builder.AND_build(tokenizer)
-        builder.AND_addOperand(childNode, node)
-        builder.AND_addOperand(childNode, BitwiseOrExpression(tokenizer, staticContext))
-        builder.AND_finish(childNode)
-        node = childNode
-
-    return node
-
-
-def BitwiseOrExpression(tokenizer, staticContext):
-    builder = staticContext.builder
-    node = BitwiseXorExpression(tokenizer, staticContext)
-    
-    while tokenizer.match("bitwise_or"):
-        childNode = builder.BITWISEOR_build(tokenizer)
-        builder.BITWISEOR_addOperand(childNode, node)
-        builder.BITWISEOR_addOperand(childNode, BitwiseXorExpression(tokenizer, staticContext))
-        builder.BITWISEOR_finish(childNode)
-        node = childNode
-
-    return node
-
-
-def BitwiseXorExpression(tokenizer, staticContext):
-    builder = staticContext.builder
-    node = BitwiseAndExpression(tokenizer, staticContext)
-    
-    while tokenizer.match("bitwise_xor"):
-        childNode = builder.BITWISEXOR_build(tokenizer)
-        builder.BITWISEXOR_addOperand(childNode, node)
-        builder.BITWISEXOR_addOperand(childNode, BitwiseAndExpression(tokenizer, staticContext))
-        builder.BITWISEXOR_finish(childNode)
-        node = childNode
-
-    return node
-
-
-def BitwiseAndExpression(tokenizer, staticContext):
-    builder = staticContext.builder
-    node = EqualityExpression(tokenizer, staticContext)
-
-    while tokenizer.match("bitwise_and"):
-        childNode = builder.BITWISEAND_build(tokenizer)
-        builder.BITWISEAND_addOperand(childNode, node)
-        builder.BITWISEAND_addOperand(childNode, EqualityExpression(tokenizer, staticContext))
-        builder.BITWISEAND_finish(childNode)
-        node = childNode
-
-    return node
-
-
-def EqualityExpression(tokenizer, staticContext):
-    builder = staticContext.builder
-    node = RelationalExpression(tokenizer, staticContext)
-    
-    while tokenizer.match("eq") or tokenizer.match("ne") or tokenizer.match("strict_eq") or tokenizer.match("strict_ne"):
-        childNode = builder.EQUALITY_build(tokenizer)
-        builder.EQUALITY_addOperand(childNode, node)
-        builder.EQUALITY_addOperand(childNode, RelationalExpression(tokenizer, staticContext))
-        builder.EQUALITY_finish(childNode)
-        node = childNode
-
-    return node
+# Binary operators with their precedence (higher binds tighter) and the prefix of the builder methods
+binaryOperators = {
+    "or" : (1, "OR"),
+    "and" : (2, "AND"),
+    "bitwise_or" : (3, "BITWISEOR"),
+    "bitwise_xor" : (4, "BITWISEXOR"),
+    "bitwise_and" : (5, "BITWISEAND"),
+    "eq" : (6, "EQUALITY"), "ne" : (6, "EQUALITY"), "strict_eq" : (6, "EQUALITY"), "strict_ne" : (6, "EQUALITY"),
+    "lt" : (7, "RELATIONAL"), "le" : (7, "RELATIONAL"), "ge" : (7, "RELATIONAL"), "gt" : (7, "RELATIONAL"), 
+    "in" : (7, "RELATIONAL"), "instanceof" : (7, "RELATIONAL"),
+    "lsh" : (8, "SHIFT"), "rsh" : (8, "SHIFT"), "ursh" : (8, "SHIFT"),
+    "plus" : (9, "ADD"), "minus" : (9, "ADD"),
+    "mul" : (10, "MULTIPLY"), "div" : (10, "MULTIPLY"), "mod" : (10, "MULTIPLY")
+}
+
+
+def BinaryExpression(tokenizer, staticContext):
+    """
+    Parses all binary operators (from "||" down to "*", "/" and "%") in one loop using
+    stacks for pending operators and operands instead of one function per precedence level.
+    Builds the same nodes in the same order as a recursive descent parser would do.
+    """
 
-
-def RelationalExpression(tokenizer, staticContext):
     builder = staticContext.builder
     oldLoopInit = staticContext.inForLoopInit
 
-    # Uses of the in operator in shiftExprs are always unambiguous,
+    # Uses of the in operator in operands are always unambiguous,
     # so unset the flag that prohibits recognizing it.
     staticContext.inForLoopInit = False
-    node = ShiftExpression(tokenizer, staticContext)
-
-    while tokenizer.match("lt") or tokenizer.match("le") or tokenizer.match("ge") or tokenizer.match("gt") or (oldLoopInit == False and tokenizer.match("in")) or tokenizer.match("instanceof"):
-        childNode = builder.RELATIONAL_build(tokenizer)
-        builder.RELATIONAL_addOperand(childNode, node)
-        builder.RELATIONAL_addOperand(childNode, ShiftExpression(tokenizer, staticContext))
-        builder.RELATIONAL_finish(childNode)
-        node = childNode
-    
-    staticContext.inForLoopInit = oldLoopInit
-
-    return node
 
+    operands = [UnaryExpression(tokenizer, staticContext)]
+    operators = []
 
-def ShiftExpression(tokenizer, staticContext):
-    builder = staticContext.builder
-    node = AddExpression(tokenizer, staticContext)
-    
-    while tokenizer.match("lsh") or tokenizer.match("rsh") or tokenizer.match("ursh"):
-        childNode = builder.SHIFT_build(tokenizer)
-        builder.SHIFT_addOperand(childNode, node)
-        builder.SHIFT_addOperand(childNode, AddExpression(tokenizer, staticContext))
-        builder.SHIFT_finish(childNode)
-        node = childNode
+    while True:
+        tokenType = tokenizer.get()
+        entry = binaryOperators.get(tokenType)
+        if entry is None or (tokenType == "in" and oldLoopInit):
+            tokenizer.unget()
+            break
 
-    return node
+        precedence, prefix = entry
 
+        # All operators are left associative: finish pending operators binding at least as tight
+        while operators and operators[-1][0] >= precedence:
+            pendingPrecedence, pendingPrefix, pendingNode = operators.pop()
+            getattr(builder, pendingPrefix + "_addOperand")(pendingNode, operands.pop())
+            getattr(builder, pendingPrefix + "_finish")(pendingNode)
+            operands.append(pendingNode)
 
-def AddExpression(tokenizer, staticContext):
-    builder = staticContext.builder
-    node = MultiplyExpression(tokenizer, staticContext)
-    
-    while tokenizer.match("plus") or tokenizer.match("minus"):
-        childNode = builder.ADD_build(tokenizer)
-        builder.ADD_addOperand(childNode, node)
-        builder.ADD_addOperand(childNode, MultiplyExpression(tokenizer, staticContext))
-        builder.ADD_finish(childNode)
-        node = childNode
+        node = getattr(builder, prefix + "_build")(tokenizer)
+        getattr(builder, prefix + "_addOperand")(node, operands.pop())
+        operators.append((precedence, prefix, node))
 
-    return node
+        operands.append(UnaryExpression(tokenizer, staticContext))
 
+    while operators:
+        pendingPrecedence, pendingPrefix, pendingNode = operators.pop()
+        getattr(builder, pendingPrefix + "_addOperand")(pendingNode, operands.pop())
+        getattr(builder, pendingPrefix + "_finish")(pendingNode)
+        operands.append(pendingNode)
 
-def MultiplyExpression(tokenizer, staticContext):
-    builder = staticContext.builder
-    node = UnaryExpression(tokenizer, staticContext)
-    
-    while tokenizer.match("mul") or tokenizer.match("div") or tokenizer.match("mod"):
-        childNode = builder.MULTIPLY_build(tokenizer)
-        builder.MULTIPLY_addOperand(childNode, node)
-        builder.MULTIPLY_addOperand(childNode, UnaryExpression(tokenizer, staticContext))
-        builder.MULTIPLY_finish(childNode)
-        node = childNode
+    staticContext.inForLoopInit = oldLoopInit
 
-    return node
+    return operands[0]
 
 
 def UnaryExpression(tokenizer, staticContext):
@@ -4,9 +4,10 @@
 #
 
 import jasy.js.parse.ScopeData
+import jasy.js.parse.Visitor
 
 
-__all__ = ["scan"]
+__all__ = ["scan", "ScopeCollector"]
 
 
 #
@@ -21,82 +22,109 @@ def scan(tree):
     it might make sense to re-execute this method to bring it in sync to the current tree structure.
     """
     
-    return __scanScope(tree)
+    jasy.js.parse.Visitor.visit(tree, [ScopeCollector()])
+    return tree.scope
 
 
 
-#
-# Implementation
-#
-
-def __scanNode(node, data):
+class ScopeCollector:
     """
-    Scans nodes recursively and collects all variables which are declared and accessed.
+    Collector for jasy.js.parse.Visitor which attaches the variable data to every scope (see scan()).
+    The visited tree must start with a script node.
     """
+
+    enterTypes = set(["script", "function", "declaration", "identifier", "block"])
+    leaveTypes = set(["script"])
+
+    def __init__(self, scope=None):
+        # Data of all currently open scopes. An already opened scope is used to collect
+        # the variables of a fragment of a tree (e.g. a removed sub tree) into it.
+        self.__scopes = [] if scope is None else [scope]
+
+
+    def enter(self, node):
+        """
+        Collects all variables which are declared and accessed.
+        """
+
+        if node.type == "script":
+            self.__enterScope(node)
+            return
+
+        data = self.__scopes[-1]
+
+        if node.type == "function":
+            if node.functionForm == "declared_form":
+                data.declared.add(node.name)
+                data.modified.add(node.name)
     
-    if node.type == "function":
-        if node.functionForm == "declared_form":
-            data.declared.add(node.name)
-            data.modified.add(node.name)
-    
-    elif node.type == "declaration":
-        varName = getattr(node, "name", None)
-        if varName != None:
-            data.declared.add(varName)
+        elif node.type == "declaration":
+            varName = getattr(node, "name", None)
+            if varName != None:
+                data.declared.add(varName)
             
-            if hasattr(node, "initializer"):
-                data.modified.add(varName)
+                if hasattr(node, "initializer"):
+                    data.modified.add(varName)
             
-            # If the variable is used as a iterator, we need to add it to the use counter as well
-            if getattr(node.parent, "rel", None) == "iterator":
-                data.increment(varName)
+                # If the variable is used as a iterator, we need to add it to the use counter as well
+                if getattr(node.parent, "rel", None) == "iterator":
+                    data.increment(varName)
             
-        else:
-            # JS 1.7 Destructing Expression
-            varNames = node.names
-            for identifier in node.names:
-                data.declared.add(identifier.value)
-                data.modified.add(identifier.value)
-                
-            # If the variable is used as a iterator, we need to add it to the use counter as well
-            if getattr(node.parent, "rel", None) == "iterator":
+            else:
+                # JS 1.7 Destructing Expression
+                varNames = node.names
                 for identifier in node.names:
-                    data.increment(identifier.value)
+                    data.declared.add(identifier.value)
+                    data.modified.add(identifier.value)
+                
+                # If the variable is used as a iterator, we need to add it to the use counter as well
+                if getattr(node.parent, "rel", None) == "iterator":
+                    for identifier in node.names:
+                        data.increment(identifier.value)
             
-    elif node.type == "identifier":
-        # Ignore parameter names (of inner functions, these are handled by __scanScope)
-        if node.parent.type == "list" and getattr(node.parent, "rel", None) == "params":
-            pass
+        elif node.type == "identifier":
+            # Ignore parameter names (of inner functions, these are handled by __enterScope)
+            if node.parent.type == "list" and getattr(node.parent, "rel", None) == "params":
+                pass
         
-        # Ignore property initialization names
-        elif node.parent.type == "property_init" and node.parent[0] == node:
-            pass
+            # Ignore property initialization names
+            elif node.parent.type == "property_init" and node.parent[0] == node:
+                pass
             
-        # Ignore non first identifiers in dot-chains
-        elif node.parent.type != "dot" or node.parent.index(node) == 0:
-            if node.value != "arguments":
-                data.increment(node.value)
+            # Ignore non first identifiers in dot-chains
+            elif node.parent.type != "dot" or node.parent.index(node) == 0:
+                if node.value != "arguments":
+                    data.increment(node.value)
             
-                if node.parent.type in ("increment", "decrement"):
-                    data.modified.add(node.value)
+                    if node.parent.type in ("increment", "decrement"):
+                        data.modified.add(node.value)
                 
-                elif node.parent.type == "assign" and node.parent[0] == node:
-                    data.modified.add(node.value)
-
-                # Support for package-like object access
-                if node.parent.type == "dot":
-                    package = __combinePackage(node)
-                    if package in data.packages:
-                        data.packages[package] += 1
-                    else:
-                        data.packages[package] = 1
+                    elif node.parent.type == "assign" and node.parent[0] == node:
+                        data.modified.add(node.value)
+
+                    # Support for package-like object access
+                    if node.parent.type == "dot":
+                        package = self.__combinePackage(node)
+                        if package in data.packages:
+                            data.packages[package] += 1
+                        else:
+                            data.packages[package] = 1
                 
-    # Treat exception variables in catch blocks like declared
-    elif node.type == "block" and node.parent.type == "catch":
-        data.declared.add(node.parent.exception.value)                
-    
-    if node.type == "script":
-        innerVariables = __scanScope(node)
+        # Treat exception variables in catch blocks like declared
+        elif node.type == "block" and node.parent.type == "catch":
+            data.declared.add(node.parent.exception.value)
+
+
+    def leave(self, node):
+        """
+        Finishes the statistics of the scope and merges its shared variables into the outer scope.
+        """
+
+        innerVariables = self.__leaveScope()
+        if not self.__scopes:
+            return
+
+        data = self.__scopes[-1]
         for name in innerVariables.shared:
             data.increment(name, innerVariables.shared[name])
             
@@ -108,85 +136,82 @@ def __scanNode(node, data):
                 data.packages[package] += innerVariables.packages[package]
             else:
                 data.packages[package] = innerVariables.packages[package]
-                
-    else:
-        for child in node:
-            # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
-            if child != None:
-                __scanNode(child, data)
-
 
 
-def __combinePackage(node):
-    """
-    Combines a package variable (e.g. foo.bar.baz) into one string
-    """
+    def __combinePackage(self, node):
+        """
+        Combines a package variable (e.g. foo.bar.baz) into one string
+        """
 
-    result = [node.value]
-    parent = node.parent
-    while parent.type == "dot":
-        result.append(parent[1].value)
-        parent = parent.parent
+        result = [node.value]
+        parent = node.parent
+        while parent.type == "dot":
+            result.append(parent[1].value)
+            parent = parent.parent
 
-    return ".".join(result)
-    
+        return ".".join(result)
     
     
-def __scanScope(node):
-    """ 
-    Scans a scope and collects statistics on variable declaration and usage 
-    """
-    
-    # Initialize statistics object for this scope
-    data = jasy.js.parse.ScopeData.ScopeData()
-    node.scope = data
-    
-    # Add params to declaration list
-    __addParams(node, data)
-
-    # Collect all data from all children (excluding sub-scopes)
-    for child in node:
-        __scanNode(child, data)
+    def __enterScope(self, node):
+        """ 
+        Starts collecting statistics on variable declaration and usage of a scope
+        """
         
-    # Remove all objects which are based on locally declared variables
-    for name in list(data.packages):
-        top = name[0:name.index(".")]
-        if top in data.declared or top in data.params:
-            del data.packages[name]
-    
-    # Look for accessed varibles which have not been defined
-    # Might be a part of a closure or just a mistake
-    for name in data.accessed:
-        if name not in data.declared and name not in data.params and name != "arguments":
-            data.shared[name] = data.accessed[name]
-            
-    # Look for variables which have been defined, but not accessed.
-    if data.name and not data.name in data.accessed:
-        data.unused.add(data.name)
-    for name in data.params:
-        if not name in data.accessed:
-            data.unused.add(name)
-    for name in data.declared:
-        if not name in data.accessed:
-            data.unused.add(name)
-    
-    return data
-    
-    
-    
-def __addParams(node, data):
-    """
-    Adds all param names from outer function to the definition list
-    """
-
-    rel = getattr(node, "rel", None)
-    if rel == "body" and node.parent.type == "function":
-        # In expressed_form the function name belongs to the function body, not to the parent scope
-        if node.parent.functionForm == "expressed_form":
-            data.name = getattr(node.parent, "name", None)
+        # Initialize statistics object for this scope
+        data = jasy.js.parse.ScopeData.ScopeData()
+        node.scope = data
         
-        paramList = getattr(node.parent, "params", None)
-        if paramList:
-            for paramIdentifier in paramList:
-                data.params.add(paramIdentifier.value)
+        # Add params to declaration list
+        self.__addParams(node, data)
+
+        # Following nodes (excluding sub-scopes) are collected into this scope
+        self.__scopes.append(data)
+
 
+    def __leaveScope(self):
+        """ 
+        Finishes the statistics of the current scope and returns them
+        """
+
+        data = self.__scopes.pop()
+            
+        # Remove all objects which are based on locally declared variables
+        for name in list(data.packages):
+            top = name[0:name.index(".")]
+            if top in data.declared or top in data.params:
+                del data.packages[name]
+        
+        # Look for accessed varibles which have not been defined
+        # Might be a part of a closure or just a mistake
+        for name in data.accessed:
+            if name not in data.declared and name not in data.params and name != "arguments":
+                data.shared[name] = data.accessed[name]
+                
+        # Look for variables which have been defined, but not accessed.
+        if data.name and not data.name in data.accessed:
+            data.unused.add(data.name)
+        for name in data.params:
+            if not name in data.accessed:
+                data.unused.add(name)
+        for name in data.declared:
+            if not name in data.accessed:
+                data.unused.add(name)
+        
+        return data
+        
+        
+    def __addParams(self, node, data):
+        """
+        Adds all param names from outer function to the definition list
+        """
+
+        rel = getattr(node, "rel", None)
+        if rel == "body" and node.parent.type == "function":
+            # In expressed_form the function name belongs to the function body, not to the parent scope
+            if node.parent.functionForm == "expressed_form":
+                data.name = getattr(node.parent, "name", None)
+            
+            paramList = getattr(node.parent, "params", None)
+            if paramList:
+                for paramIdentifier in paramList:
+                    data.params.add(paramIdentifier.value)
@@ -0,0 +1,170 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+"""
+Compact serialization of syntax trees (see jasy.js.parse.Node) e.g. for storing them in the cache.
+
+Trees are encoded as a flat list of node records in preorder. Type and attribute names are
+interned into tables. Each record only contains the attributes which are actually set. Relations
+to the parent (parent, rel-attributes) are restored from the structure and the tokenizer (with
+the full source code, token ring and comments) is not stored at all. Source ranges (start/end)
+are optional.
+"""
+
+import pickle, sys
+
+import jasy.js.parse.Node as Node
+
+__all__ = ["dumps", "loads"]
+
+
+# Format version, increment whenever the structure of the records changes
+VERSION = 1
+
+# Marker for empty children e.g. elisions in array literals: [1, , 2]
+EMPTY = -1
+
+
+def dumps(tree, ranges=False):
+    """
+    Returns a bytes object with the compact representation of the given tree.
+    Source ranges (start/end) of the nodes are only stored when ranges is enabled.
+    """
+
+    types = {}
+    names = {}
+    records = []
+
+    NodeClass = Node.Node
+
+    def intern(table, value):
+        index = table.get(value)
+        if index is None:
+            index = table[value] = len(table)
+
+        return index
+
+    # Nodes are encoded in preorder using an explicit stack (not limited by the recursion limit)
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+
+        if node is None:
+            records.append(EMPTY)
+            continue
+
+        records.append(intern(types, node.type))
+        records.append(getattr(node, "line", None))
+
+        if ranges:
+            records.append(getattr(node, "start", None))
+            records.append(getattr(node, "end", None))
+
+        records.append(len(node))
+
+        # Reserve space for number of attributes
+        countPosition = len(records)
+        records.append(0)
+
+        count = 0
+        rel = getattr(node, "rel", None)
+        if rel is not None:
+            records.append(intern(names, "rel"))
+            records.append(rel)
+            count += 1
+
+        extra = node.extra
+        if extra:
+            for name in extra:
+                value = extra[name]
+
+                # Related children are restored from the "rel" attribute of the child
+                if value.__class__ is NodeClass:
+                    continue
+
+                records.append(intern(names, name))
+                records.append(value)
+                count += 1
+
+        records[countPosition] = count
+
+        stack.extend(reversed(node))
+
+    return pickle.dumps((VERSION, ranges, sorted(types, key=types.get), sorted(names, key=names.get), records), pickle.HIGHEST_PROTOCOL)
+
+
+def loads(data):
+    """Restores a tree from data created by dumps()"""
+
+    version, ranges, types, names, records = pickle.loads(data)
+    if version != VERSION:
+        raise ValueError("Unsupported tree format: %s" % version)
+
+    # Node types are sometimes compared by identity
+    types = [sys.intern(name) for name in types]
+
+    createNode = Node.Node.__new__
+    NodeClass = Node.Node
+    appendChild = list.append
+
+    root = None
+    stack = []
+    position = 0
+    length = len(records)
+
+    while position < length:
+        typeIndex = records[position]
+
+        if typeIndex == EMPTY:
+            node = None
+            children = 0
+            position += 1
+
+        else:
+            node = createNode(NodeClass)
+            node.type = types[typeIndex]
+            node.line = records[position+1]
+            node.tokenizer = None
+            node.extra = None
+
+            if ranges:
+                node.start = records[position+2]
+                node.end = records[position+3]
+                position += 4
+            else:
+                node.start = 0
+                node.end = 0
+                position += 2
+
+            children = records[position]
+            attributes = records[position+1]
+            position += 2
+
+            for pos in range(attributes):
+                setattr(node, names[records[position]], records[position+1])
+                position += 2
+
+        if stack:
+            entry = stack[-1]
+            parent = entry[0]
+            appendChild(parent, node)
+            entry[1] -= 1
+
+            if node is not None:
+                node.parent = parent
+                rel = getattr(node, "rel", None)
+                if rel is not None:
+                    setattr(parent, rel, node)
+
+        else:
+            root = node
+
+        if children:
+            stack.append([node, children])
+        else:
+            while stack and stack[-1][1] == 0:
+                stack.pop()
+
+    return root
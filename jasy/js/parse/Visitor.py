@@ -0,0 +1,81 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2010-2012 Zynga Inc.
+#
+
+"""
+Traversal of syntax trees (see jasy.js.parse.Node) running multiple collectors in one pass.
+
+A collector is an object with an "enter(node)" method which is called for every node before its
+children and/or a "leave(node)" method which is called after all its children have been visited.
+Collectors might limit these calls to some node types by defining "enterTypes" and "leaveTypes"
+(sets of node types, the default None means all types).
+
+The tree is walked in document order using an explicit stack instead of recursion. This way the
+depth of the tree is not limited by the recursion limit of Python. Collectors must not modify the
+structure of the tree while it is visited.
+"""
+
+__all__ = ["visit"]
+
+
+def visit(tree, collectors):
+    """Visits all nodes of the given tree and calls the given collectors in their order"""
+
+    # Handlers per node type: (list of enter methods, list of leave methods)
+    handlers = {}
+
+    stack = [tree]
+    pop = stack.pop
+    push = stack.append
+    extend = stack.extend
+
+    while stack:
+        node = pop()
+
+        # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
+        if node is None:
+            continue
+
+        # Leave marker of a node whose children have been visited
+        if type(node) is tuple:
+            node, leaves = node
+            for leave in leaves:
+                leave(node)
+
+            continue
+
+        nodeType = node.type
+        try:
+            enters, leaves = handlers[nodeType]
+        except KeyError:
+            enters, leaves = handlers[nodeType] = __getHandlers(collectors, nodeType)
+
+        for enter in enters:
+            enter(node)
+
+        if leaves:
+            push((node, leaves))
+
+        extend(reversed(node))
+
+
+
+def __getHandlers(collectors, nodeType):
+    """Returns a tuple of the enter and leave methods of the given collectors for the given node type"""
+
+    enters = []
+    leaves = []
+
+    for collector in collectors:
+        if hasattr(collector, "enter"):
+            types = getattr(collector, "enterTypes", None)
+            if types is None or nodeType in types:
+                enters.append(collector.enter)
+
+        if hasattr(collector, "leave"):
+            types = getattr(collector, "leaveTypes", None)
+            if types is None or nodeType in types:
+                leaves.append(collector.leave)
+
+    return enters, leaves
@@ -20,3 +20,12 @@ keywords = set([
     "yield",
     "while", "with"
 ])
+
+
+"""Token types after which a slash is a division and not the start of a regular expression"""
+operandEnds = set([
+    "identifier", "number", "string", "regexp",
+    "right_paren", "right_bracket",
+    "this", "true", "false", "null",
+    "increment", "decrement"
+])
@@ -16,7 +16,7 @@ import jasy.js.tokenize.Lang as Lang
 import jasy.js.api.Comment as Comment
 import jasy.core.Console as Console
 
-__all__ = [ "Tokenizer" ]
+__all__ = [ "Tokenizer", "RegexTokenizer", "create" ]
 
 
 # Operator and punctuator mapping from token to tree node type name.
@@ -605,3 +605,274 @@ class Tokenizer(object):
         self.lookahead = point["lookahead"]
         self.scanNewline = point["scanNewline"]
         self.line = point["line"]
+
+
+
+#
+# Regular expression based engine
+#
+
+# Whitespace runs, newline runs and comment starts as eaten by skip()
+skipMatcher = re.compile(r"[\xA0 \t]+|\n+|/\*|//")
+skipChars = frozenset("\xA0 \t\n/")
+
+# Exponent part of a number
+exponentPattern = r"[eE][+-]?[0-9]+"
+
+# Operators sorted by length so that the longest operator wins. This is the same as
+# the prefix extending loop in lexOp() as all prefixes of operators are operators, too.
+operatorPattern = "|".join(re.escape(op) for op in sorted(operatorNames, key=len, reverse=True))
+
+# Master expression with one named group per token class. The order matches the
+# dispatching order of Tokenizer.get().
+tokenPattern = r"""
+    (?P<identifier>[A-Za-z$_][A-Za-z0-9$_]*)
+  | (?P<dotnumber>\.[0-9]+(?:%(exponent)s)?)
+  | (?P<dot>\.)
+  | (?P<newline>\n)
+  | (?P<operator>%(operator)s)
+  | (?P<number>[1-9][0-9]*(?P<floating>\.[0-9]*)?(?P<exponent>%(exponent)s)?)
+  | (?P<zero>0(?:[xX][0-9a-fA-F]*|[0-7]+|(?P<zerofloat>\.[0-9]*(?:%(exponent)s)?)|%(exponent)s)?)
+  | (?P<string>"(?:[^"\\]|\\[\s\S])*"|'(?:[^'\\]|\\[\s\S])*')
+""" % { "exponent" : exponentPattern, "operator" : operatorPattern }
+
+# Regular expression literals are only allowed where an operand is expected
+regexpPattern = r"""
+    (?P<regexp>/(?:[^\\\[/]|\\[\s\S]|\[(?:[^\\\]]|\\[\s\S])*\])*/[a-z]*)
+  |
+"""
+
+tokenMatcher = re.compile(tokenPattern, re.VERBOSE)
+operandMatcher = re.compile(regexpPattern + tokenPattern, re.VERBOSE)
+
+
+class RegexTokenizer(Tokenizer):
+    """
+    Tokenizer engine which lexes whole whitespace runs, comments, identifiers, numbers, strings
+    and operators with one call to a precompiled regular expression each instead of walking the 
+    source one character at a time. Produces the same tokens and comments as the classic engine.
+    """
+
+    def skip(self):
+        """Eats comments and whitespace."""
+        input = self.source
+        startLine = self.line
+        cursor = self.cursor
+
+        # Whether this is the first called as happen on start parsing a file (eat leading comments/white space)
+        startOfFile = cursor == 0
+
+        indent = ""
+
+        while True:
+            match = skipMatcher.match(input, cursor)
+            if match is None:
+                break
+
+            text = match.group()
+            ch = text[0]
+
+            if ch == "\n":
+                if self.scanNewlines:
+                    break
+
+                self.line += len(text)
+                indent = ""
+                cursor = match.end()
+
+            elif ch == "/":
+                if startLine == self.line and not startOfFile:
+                    mode = "inline"
+                elif (self.line-1) > startLine:
+                    # distance before this comment means it is a comment block for a whole section (multiple lines of code)
+                    mode = "section"
+                else:
+                    # comment for maybe multiple following lines of code, but not that important (no visual white space divider)
+                    mode = "block"
+
+                if text == "/*":
+                    end = input.find("*/", cursor + 2)
+                    if end == -1:
+                        self.cursor = len(input)
+                        raise ParseError("Unterminated comment", self.fileId, self.line + input.count("\n", cursor))
+
+                    text = input[cursor:end+2]
+                    commentStartLine = self.line
+                    commentIndent = indent
+                    self.line += text.count("\n")
+                    cursor = end + 2
+
+                    # Filter escaping on slash-star combinations in comment text
+                    text = text.replace("*\\/", "*/")
+
+                else:
+                    end = input.find("\n", cursor + 2)
+                    if end == -1:
+                        text = input[cursor:]
+                        cursor = len(input)
+                    else:
+                        text = input[cursor:end]
+                        cursor = end + 1
+                        self.line += 1
+
+                    commentStartLine = self.line - 1
+                    commentIndent = ""
+
+                try:
+                    self.comments.append(Comment.Comment(text, mode, commentStartLine, commentIndent, self.fileId))
+                except Comment.CommentException as commentError:
+                    Console.error("Ignoring comment in %s: %s", self.fileId, commentError)
+
+            else:
+                indent += text
+                cursor = match.end()
+
+        self.cursor = cursor
+
+
+    def get(self, scanOperand=False):
+        """ 
+        It consumes input *only* if there is no lookahead.
+        Matches the next token using the master expression.
+        """
+        while self.lookahead:
+            self.lookahead -= 1
+            self.tokenIndex = (self.tokenIndex + 1) & 3
+            token = self.tokens[self.tokenIndex]
+            if token.type != "newline" or self.scanNewlines:
+                return token.type
+
+        # Only call skip() when there is something to eat
+        input = self.source
+        if input[self.cursor:self.cursor+1] in skipChars:
+            self.skip()
+
+        self.tokenIndex = (self.tokenIndex + 1) & 3
+        self.tokens[self.tokenIndex] = token = Token()
+
+        cursor = token.start = self.cursor
+        token.line = self.line
+
+        if cursor == len(input):
+            token.end = cursor
+            token.type = "end"
+            return token.type
+
+        if scanOperand:
+            match = operandMatcher.match(input, cursor)
+        else:
+            match = tokenMatcher.match(input, cursor)
+
+        kind = match and match.lastgroup
+        if kind is None:
+            ch = input[cursor]
+            if ch == '"' or ch == "'":
+                raise ParseError("Unterminated string", self.fileId, self.line)
+
+            raise ParseError("Illegal token: %s (Code: %s)" % (ch, ord(ch)), self.fileId, self.line)
+
+        segment = match.group()
+        end = match.end()
+
+        if kind == "identifier":
+            if segment in Lang.keywords:
+                token.type = segment
+            else:
+                token.type = "identifier"
+                token.value = segment
+
+        elif kind == "operator":
+            if segment == "/" and scanOperand:
+                raise ParseError("Unterminated regex", self.fileId, self.line)
+
+            if input.startswith("=", end) and segment in assignOperators:
+                end += 1
+                token.type = "assign"
+                token.assignOp = operatorNames[segment]
+            else:
+                token.type = operatorNames[segment]
+                token.assignOp = None
+
+        elif kind == "number":
+            self.__checkExponent(match, end)
+            token.type = "number"
+
+            # Protect float or exponent numbers
+            if match.group("floating") or match.group("exponent"):
+                token.value = segment
+            else:
+                token.value = int(segment)
+
+        elif kind == "string":
+            token.type = "string"
+            if "\\" in segment:
+                token.value = eval(segment)
+            else:
+                token.value = segment[1:-1]
+
+        elif kind == "dotnumber":
+            self.__checkExponent(match, end)
+            token.type = "number"
+            token.value = segment
+
+        elif kind == "dot":
+            token.type = "dot"
+
+        elif kind == "zero":
+            token.type = "number"
+            if segment == "0" or segment[1] in "eE":
+                self.__checkExponent(match, end)
+                token.value = 0
+            else:
+                if match.group("zerofloat"):
+                    self.__checkExponent(match, end)
+
+                token.value = segment
+
+        elif kind == "regexp":
+            token.type = "regexp"
+            token.value = segment
+
+        elif kind == "newline":
+            token.type = "newline"
+            self.line += 1
+
+        self.cursor = token.end = end
+        return token.type
+
+
+    def __checkExponent(self, match, end):
+        """Numbers directly followed by an exponent marker without digits are invalid (like the classic engine)"""
+
+        if "e" not in match.group().lower():
+            next = self.source[end:end+1]
+            if next == "e" or next == "E":
+                raise ParseError("Missing exponent", self.fileId, self.line)
+
+
+
+def create(source, fileId="", line=1, engine=None):
+    """
+    Returns a new tokenizer instance for the given source using the given engine
+    ("regex" or "classic"). Defaults to the engine configured in defaultEngine.
+    """
+
+    if engine is None:
+        engine = defaultEngine
+
+    try:
+        engineClass = engines[engine]
+    except KeyError:
+        raise ValueError("Unknown tokenizer engine: %s" % engine)
+
+    return engineClass(source, fileId, line)
+
+
+# Available engines
+engines = {
+    "classic" : Tokenizer,
+    "regex" : RegexTokenizer
+}
+
+# Engine used by the parser
+defaultEngine = "regex"
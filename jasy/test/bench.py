@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile
+
+# Extend PYTHONPATH with local 'lib' folder
+jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, jasyroot)
+
+import jasy.bench.suite as Suite
+import jasy.bench.tokenizer as TokenizerBench
+
+class Tests(unittest.TestCase):
+
+    def test_corpus(self):
+
+        sources = Suite.loadCorpus()
+        self.assertTrue(len(sources) > 0)
+        for name in sources:
+            self.assertTrue(name.endswith(".js"))
+
+    def test_tokenize_regexp(self):
+
+        self.assertEqual(TokenizerBench.tokenize('var x = /a\\/b/g.test(y) / 2;', "classic"), 12)
+
+    def test_tokenize_division(self):
+
+        for engine in ("classic", "regex"):
+            self.assertEqual(TokenizerBench.tokenize('x = i++ / 2 / 3;', engine), 9)
+            self.assertEqual(TokenizerBench.tokenize('x = y-- / 2 / 3;', engine), 9)
+
+    def test_run(self):
+
+        results = Suite.run((2,), rounds=1, only=set(("parse", "compress")))
+        self.assertEqual(sorted(results["suites"]), ["corpus", "synthetic-2"])
+
+        phases = results["suites"]["synthetic-2"]["phases"]
+        self.assertEqual(sorted(phases), ["compress", "parse"])
+        self.assertTrue(phases["parse"]["ops"] > 0)
+        self.assertTrue(phases["parse"]["peak"] > 0)
+
+    def test_all_phases(self):
+
+        results = Suite.run((1,), corpus=False, rounds=1, memory=False)
+        phases = results["suites"]["synthetic-1"]["phases"]
+        self.assertEqual(sorted(phases), sorted(Suite.phaseNames))
+        self.assertFalse("peak" in phases["scan"])
+
+    def test_store_and_compare(self):
+
+        results = Suite.run((1,), corpus=False, rounds=1, memory=False, only=set(("parse",)))
+        fileName = os.path.join(tempfile.mkdtemp(), "bench.json")
+        Suite.store(results, fileName)
+        previous = Suite.load(fileName)
+
+        self.assertEqual(Suite.compare(previous, previous), [("synthetic-1", "parse", previous["suites"]["synthetic-1"]["phases"]["parse"]["time"], previous["suites"]["synthetic-1"]["phases"]["parse"]["time"], 1.0, False)])
+
+        slower = Suite.load(fileName)
+        slower["suites"]["synthetic-1"]["phases"]["parse"]["time"] *= 1.5
+        self.assertTrue(Suite.compare(previous, slower)[0][5])
+        self.assertFalse(Suite.compare(previous, slower, 0.6)[0][5])
+        self.assertFalse(Suite.compare(slower, previous)[0][5])
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
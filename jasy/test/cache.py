@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 
-import sys, os, unittest, logging, tempfile
+import sys, os, unittest, logging, tempfile, pickle, sqlite3
 
 # Extend PYTHONPATH with local 'lib' folder
 jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
 sys.path.insert(0, jasyroot)
 
 import jasy.core.Cache as Cache
+import jasy.core.CacheBackend as CacheBackend
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.Serializer as Serializer
 
 class Tests(unittest.TestCase):
 
@@ -85,6 +88,274 @@ class Tests(unittest.TestCase):
         cache.store("test", 1337, transient=True, inMemory=False)
         self.assertEqual(cache.read("test", inMemory=False), None)
 
+    def test_timestamp(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        cache.store("test", 1337, timestamp=1000, inMemory=False)
+        self.assertEqual(cache.read("test", timestamp=900, inMemory=False), 1337)
+        self.assertEqual(cache.read("test", timestamp=1100, inMemory=False), None)
+
+    def test_sync_and_reopen(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        cache.store("test", {"a" : [1, 2, 3]})
+        cache.sync()
+        cache2 = Cache.Cache(tempDirectory)
+        self.assertEqual(cache2.read("test"), {"a" : [1, 2, 3]})
+
+    def test_dbm_backend(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, backend="dbm")
+        cache.store("test", 1337)
+        cache.close()
+        cache2 = Cache.Cache(tempDirectory, backend="dbm")
+        self.assertEqual(cache2.read("test"), 1337)
+
+    def test_memory_limit_evicts_trees_first(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, memoryLimit=2000)
+        cache.store("meta[a]", "x" * 500, transient=True)
+        cache.store("tree[a]", "x" * 500, transient=True)
+        cache.store("scope[a]", "x" * 500, transient=True)
+        cache.store("tree[b]", "x" * 500, transient=True)
+        cache.store("tree[c]", "x" * 500, transient=True)
+
+        self.assertEqual(cache.read("tree[a]"), None)
+        self.assertEqual(cache.read("tree[b]"), None)
+        self.assertEqual(cache.read("tree[c]"), "x" * 500)
+        self.assertEqual(cache.read("meta[a]"), "x" * 500)
+        self.assertEqual(cache.read("scope[a]"), "x" * 500)
+
+    def test_memory_limit_reloads_from_disk(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, memoryLimit=100)
+        cache.store("compressed[a]", "x" * 500)
+        self.assertEqual(cache.read("compressed[a]"), "x" * 500)
+
+    def test_transient_store_lru(self):
+
+        store = Cache.TransientStore(300)
+        store.put("a", 1, "tree", 100)
+        store.put("b", 2, "tree", 100)
+        store.put("c", 3, "tree", 100)
+        store.get("a", "tree")
+        store.put("d", 4, "tree", 100)
+
+        self.assertTrue("a" in store)
+        self.assertFalse("b" in store)
+        self.assertEqual(store.getUsage(), 300)
+
+    def test_estimate_tree(self):
+
+        tree = Parser.parse("var first = 1; var second = first + 2;")
+        self.assertEqual(Cache.estimateSize(tree), tree.getEstimatedSize())
+        self.assertTrue(tree.getEstimatedSize() > 0)
+
+        # Restored trees have no source ranges and are estimated by their number of nodes
+        restored = Serializer.loads(Serializer.dumps(tree))
+        self.assertTrue(restored.getEstimatedSize() > 0)
+
+        store = Cache.TransientStore(1000000)
+        store.put("tree[a]", restored, "tree")
+        self.assertEqual(store.getUsage(), restored.getEstimatedSize())
+
+    def test_collect(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        cache.store("tree[a]", "x" * 100)
+        cache.store("tree[b]", "x" * 100)
+        cache.store("meta[b]", "x" * 100)
+
+        reclaimed = cache.collect(validate=lambda key, timestamp: not key.endswith("[a]"))
+        self.assertEqual(list(reclaimed), ["tree"])
+        self.assertTrue(reclaimed["tree"] > 100)
+        self.assertEqual(cache.read("tree[a]"), None)
+        self.assertEqual(cache.read("tree[b]"), "x" * 100)
+
+    def test_collect_unused(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        cache.store("tree[a]", 1)
+        cache.store("tree[b]", 2)
+        cache.close()
+
+        cache2 = Cache.Cache(tempDirectory)
+        self.assertEqual(cache2.read("tree[a]"), 1)
+        cache2.close()
+
+        cache3 = Cache.Cache(tempDirectory)
+        reclaimed = cache3.collect(builds=2)
+        self.assertEqual(list(reclaimed), ["tree"])
+        self.assertEqual(cache3.read("tree[a]"), 1)
+        self.assertEqual(cache3.read("tree[b]"), None)
+
+    def test_concurrent_access(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        cache2 = Cache.Cache(tempDirectory)
+        self.assertTrue(cache.isConcurrent())
+
+        # Pending writes of one instance must not block the other one
+        cache.store("first", 1)
+        cache2.store("second", 2)
+        cache2.sync()
+        cache.sync()
+
+        self.assertEqual(cache.read("second"), 2)
+        self.assertEqual(cache2.read("first"), 1)
+
+    def test_pending_bytes(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        backend = CacheBackend.SqliteBackend(os.path.join(tempDirectory, "cache"))
+        backend.pendingBytes = 1000
+
+        other = sqlite3.connect(os.path.join(tempDirectory, "cache.sqlite"))
+        count = lambda: other.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+        # Many small entries stay pending, large data is written once the limit is reached
+        for pos in range(50):
+            backend.put("small%s" % pos, 0, b"x" * 10)
+        backend.put("small0", 0, b"x" * 500)
+        self.assertEqual(count(), 0)
+
+        backend.put("large", 0, b"x" * 600)
+        self.assertEqual(count(), 51)
+
+        backend.put("other", 0, b"x" * 10)
+        self.assertEqual(count(), 51)
+        self.assertEqual(backend.get("other")[1], b"x" * 10)
+
+        other.close()
+        backend.close()
+
+    def test_compact_locked(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        cache.store("tree[a]", "x" * 100)
+        cache.store("tree[b]", "x" * 100)
+        cache.sync()
+
+        backend = CacheBackend.SqliteBackend(os.path.join(tempDirectory, "jasycache"))
+        backend.compactTimeout = 0.1
+
+        # Another process is writing to the database
+        other = sqlite3.connect(os.path.join(tempDirectory, "jasycache.sqlite"), isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        self.assertFalse(backend.compact())
+        self.assertNotEqual(backend.get("tree[a]"), None)
+
+        other.execute("COMMIT")
+        self.assertTrue(backend.compact())
+
+        other.close()
+        backend.close()
+        cache.close()
+
+    def test_statistics(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        cache.store("tree[a]", "x" * 1000, timestamp=1000, inMemory=False)
+        cache.store("meta[a]", 1)
+
+        cache.read("tree[a]", inMemory=False)
+        cache.read("tree[a]", timestamp=2000)
+        cache.read("tree[b]")
+        cache.read("meta[a]")
+
+        statistics = cache.getStatistics()
+        tree = statistics["families"]["tree"]
+        self.assertEqual(tree["hits"], 1)
+        self.assertEqual(tree["misses"], 2)
+        self.assertEqual(tree["stale"], 1)
+        self.assertEqual(tree["writes"], 1)
+        self.assertTrue(tree["bytesRead"] > 1000)
+        self.assertEqual(tree["bytesRead"], tree["bytesWritten"])
+        self.assertEqual(statistics["families"]["meta"]["memoryHits"], 1)
+        self.assertEqual(statistics["largest"][0]["key"], "tree[a]")
+
+    def test_compression(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, compressionThreshold=100)
+        cache.store("small", "x")
+        cache.store("large", "x" * 10000)
+        cache.close()
+
+        cache2 = Cache.Cache(tempDirectory)
+        self.assertEqual(cache2.read("small"), "x")
+        self.assertEqual(cache2.read("large"), "x" * 10000)
+        self.assertTrue(cache2.getStatistics()["families"]["large"]["bytesRead"] < 1000)
+
+    def test_codecs(self):
+
+        data, size = Cache.encodeValue("x" * 10000, 9, 100)
+        self.assertEqual(data[0], Cache.CODEC_ZLIB)
+        self.assertEqual(Cache.decodeValue(data), ("x" * 10000, size))
+
+        data, size = Cache.encodeValue("x" * 10000, 0, 100)
+        self.assertEqual(data[0], Cache.CODEC_PICKLE)
+        self.assertEqual(Cache.decodeValue(data)[0], "x" * 10000)
+
+        # Entries of previous versions have no codec header
+        self.assertEqual(Cache.decodeValue(pickle.dumps([1, 2], 3))[0], [1, 2])
+
+    def test_corrupt_entries(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+
+        cache.storeRaw("tree[garbage]", b"\x00\xde\xad\xbe\xef")
+        cache.storeRaw("tree[truncated]", Cache.encodeValue([1, 2, 3], 0)[0][:-3])
+        cache.storeRaw("tree[zlib]", b"\x01garbage")
+        cache.storeRaw("tree[empty]", b"")
+        cache.storeRaw("tree[moved]", b"\x00" + pickle.dumps(Cache.Statistics()).replace(b"jasy.core.Cache", b"jasy.core.Moved"))
+
+        for key in ("tree[garbage]", "tree[truncated]", "tree[zlib]", "tree[empty]", "tree[moved]"):
+            self.assertEqual(cache.read(key), None)
+
+            # Undecodable entries are dropped
+            self.assertEqual(cache.readRaw(key), None)
+
+    def test_versions(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, versions={"tree" : "parser:1", "compressed" : "parser:1,compressor:1"})
+        cache.store("tree[a]", 1)
+        cache.store("compressed[a]", 2)
+        cache.store("project[version]", 3)
+        cache.close()
+
+        cache2 = Cache.Cache(tempDirectory, versions={"tree" : "parser:1", "compressed" : "parser:1,compressor:2"})
+        self.assertEqual(cache2.read("tree[a]"), 1)
+        self.assertEqual(cache2.read("compressed[a]"), None)
+        self.assertEqual(cache2.read("project[version]"), 3)
+        self.assertEqual(cache2.getVersion("compressed"), "parser:1,compressor:2")
+
 
 if __name__ == '__main__':
     logging.getLogger().setLevel(logging.ERROR)
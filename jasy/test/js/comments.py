@@ -1511,6 +1511,54 @@ class Tests(unittest.TestCase):
 
 
 
+    #
+    # DEFERRED PROCESSING
+    #
+
+    def test_deferred(self):
+
+        parsed = self.process('''
+
+        /**
+         * Returns the {String} name of @obj {Object}.
+         */
+        docCommentCmd();
+
+        ''')
+
+        comment = parsed[0].comments[0]
+        self.assertEqual(comment.variant, "doc")
+        self.assertTrue("text" not in comment.__dict__)
+
+        # No tags means no need for processing
+        self.assertEqual(comment.getTags(), None)
+        self.assertFalse(comment.hasTag("require"))
+        self.assertTrue("text" not in comment.__dict__)
+
+        self.assertEqual(comment.text, "Returns the String name of obj.")
+        self.assertEqual(comment.params["obj"]["type"][0]["name"], "Object")
+        self.assertEqual(comment.tags, None)
+
+
+    def test_deferred_tags(self):
+
+        parsed = self.process('''
+
+        /**
+         * Hello #require(foo.Bar) #deprecated
+         */
+        docCommentCmd();
+
+        ''')
+
+        comment = parsed[0].comments[0]
+        self.assertEqual(comment.getTags(), {"require" : set(["foo.Bar"]), "deprecated" : True})
+        self.assertTrue(comment.hasTag("deprecated"))
+        self.assertEqual(comment.text, "Hello")
+
+
+
+
 
 if __name__ == '__main__':
     logging.getLogger().setLevel(logging.ERROR)
@@ -125,6 +125,24 @@ class Tests(unittest.TestCase):
     def test_getter(self):
         self.assertEqual(self.process('var obj={get name() { return myName; }};'), 'var obj={get name(){return myName}};')
 
+    def test_precedence(self):
+        self.assertEqual(self.process('a || b && c | d ^ e & f == g < h << i + j * k;'), 'a||b&&c|d^e&f==g<h<<i+j*k;')
+        self.assertEqual(self.process('a * b + c << d > e != f & g ^ h | i && j || k;'), 'a*b+c<<d>e!=f&g^h|i&&j||k;')
+        self.assertEqual(self.process('a - b - c; a - (b - c); (a + b) * c;'), 'a-b-c;a-(b-c);(a+b)*c;')
+
+        node = Parser.parse('a + b * c - d;')[0].expression
+        self.assertEqual([node.type, node[0].type, node[0][1].type], ["minus", "plus", "mul"])
+
+    def test_precedence_for_in(self):
+        self.assertEqual(self.process('for (var i = (a in b); i < 3; i++) {}'), 'for(var i=(a in b);i<3;i++){}')
+        self.assertEqual(self.process('for (x = a ? b in c : d; x;) {}'), 'for(x=a?b in c:d;x;){}')
+
+    def test_precedence_long(self):
+        # Left associative chains are parsed without recursion
+        node = Parser.parse('x = ' + ' + '.join(['"%s"' % pos for pos in range(5000)]) + ';')[0].expression[1]
+        self.assertEqual(node.type, "plus")
+        self.assertEqual(node[1].value, "4999")
+
     def test_setter(self):
         self.assertEqual(self.process('var obj={set name(value) { myName = value; }};'), 'var obj={set name(value){myName=value}};')
 
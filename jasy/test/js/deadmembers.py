@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.output.Compressor as Compressor
+import jasy.js.clean.DeadMembers as DeadMembers
+
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, sources, keep=None):
+        trees = [Parser.parse(code) for code in sources]
+        datas = [DeadMembers.collect(tree, "my.Class%s" % pos) for pos, tree in enumerate(trees)]
+        live = DeadMembers.getLive(datas, keep)
+
+        result = []
+        for tree, data in zip(trees, datas):
+            DeadMembers.strip(tree, DeadMembers.getRemoved(data, live, keep))
+            result.append(Compressor.Compressor().compress(tree))
+
+        return result
+
+    def test_members(self):
+        self.assertEqual(self.process([
+            '''
+            core.Class("my.Class0", {
+              construct : function() { this.used(); },
+              members : { used : function() {}, unused : function() {} }
+            });
+            '''])[0],
+            'core.Class("my.Class0",{construct:function(){this.used()},members:{used:function(){}}});'
+        )
+
+    def test_statics(self):
+        self.assertEqual(self.process([
+            '''core.Module("my.Class0", { used : function() {}, unused : 42 });''',
+            '''my.Class0.used();'''])[0],
+            'core.Module("my.Class0",{used:function(){}});'
+        )
+
+    def test_chain(self):
+        """ first is only used by second which is unused itself """
+        self.assertEqual(self.process([
+            '''core.Module("my.Class0", { first : function() {}, second : function() { this.first(); }, third : function() {} });''',
+            '''my.Class0.third();'''])[0],
+            'core.Module("my.Class0",{third:function(){}});'
+        )
+
+    def test_recursion(self):
+        self.assertEqual(self.process([
+            '''core.Module("my.Class0", { loop : function() { this.loop(); } });'''])[0],
+            'core.Module("my.Class0",{});'
+        )
+
+    def test_strings(self):
+        self.assertEqual(self.process([
+            '''core.Module("my.Class0", { byIndex : 1, byIn : 2, unused : 3, "quoted" : 4 });''',
+            '''x = my.Class0["byIndex"] + ("byIn" in my.Class0);'''])[0],
+            'core.Module("my.Class0",{byIndex:1,byIn:2});'
+        )
+
+    def test_dynamic(self):
+        self.assertEqual(self.process([
+            '''core.Module("my.Class0", { call : function(name) { return this[name](); }, unused : 1 });'''])[0],
+            'core.Module("my.Class0",{call:function(name){return this[name]()},unused:1});'
+        )
+
+    def test_computed(self):
+        """ Computed keys on this, classes and prototypes or built from strings might access members of any class """
+        for access in ('obj["get" + name]()', 'obj[prefix + "Value" + name]', 'this[name]()', 'my.Class0[name]', 'Other.prototype[name]'):
+            result = self.process([
+                '''core.Module("my.Class0", { foo : 1, bar : function() {} });''',
+                '''core.Module("my.Class1", { run : function(obj, name) { return %s; } });''' % access])
+            self.assertEqual(result[0], 'core.Module("my.Class0",{foo:1,bar:function(){}});')
+
+        data = DeadMembers.collect(Parser.parse('x = 1;\ny = this[m]();'), "my.Class0")
+        self.assertEqual(data.computed, [2])
+        self.assertEqual(DeadMembers.getComputed([DeadMembers.collect(Parser.parse('x = a.b;')), data]), [data])
+
+    def test_indexing(self):
+        """ Plain indexing by variables and numbers does not keep members """
+        self.assertEqual(self.process([
+            '''core.Module("my.Class0", { foo : 1, bar : function() {} });''',
+            '''for (var i = 0; i < arr.length; i++) { x = arr[i] + tokens[i + 1] + this.stack[i] + map[key] + list[0] + map["foo"]; }'''])[0],
+            'core.Module("my.Class0",{foo:1});'
+        )
+
+    def test_side_effects(self):
+        self.assertEqual(self.process([
+            '''core.Module("my.Class0", { created : create(), map : { x : 1 }, unused : 1 });'''])[0],
+            'core.Module("my.Class0",{created:create(),map:{x:1}});'
+        )
+
+    def test_interface(self):
+        self.assertEqual(self.process([
+            '''core.Interface("my.Class0", { members : { required : function() {} } });''',
+            '''core.Class("my.Class1", { implement : [my.Class0], members : { required : function() {}, unused : function() {} } });'''])[1],
+            'core.Class("my.Class1",{implement:[my.Class0],members:{required:function(){}}});'
+        )
+
+    def test_implicit(self):
+        self.assertEqual(self.process([
+            '''core.Class("my.Class0", { members : { toString : function() { return "x"; }, unused : function() {} } });'''])[0],
+            'core.Class("my.Class0",{members:{toString:function(){return"x"}}});'
+        )
+
+    def test_keep(self):
+        self.assertEqual(self.process([
+            '''core.Module("my.Class0", { main : function() { this.helper(); }, helper : function() {}, other : 1 });''',
+            '''core.Module("my.Class1", { main : function() {}, other : 1 });'''], ["my.Class0#main", "oth*"]),
+            ['core.Module("my.Class0",{main:function(){this.helper()},helper:function(){},other:1});', 'core.Module("my.Class1",{main:function(){},other:1});']
+        )
+
+    def test_key(self):
+        self.assertEqual(DeadMembers.getKey(["a", "b"]), DeadMembers.getKey(("b", "a")))
+        self.assertNotEqual(DeadMembers.getKey(["a"]), DeadMembers.getKey(["a", "b"]))
+
+
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
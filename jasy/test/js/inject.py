@@ -171,6 +171,37 @@ class Tests(unittest.TestCase):
             'var prefix="Webkit";'
         )             
 
+    def test_signature(self):
+        node = Parser.parse('var debug = jasy.Env.isSet("debug"); var prefix = jasy.Env.select("engine", { webkit: "Webkit", "default": "" });')
+
+        def signature(values):
+            return Permutate.getSignature(node, Permutation.Permutation(values))
+
+        # Same changes to the tree share a signature
+        self.assertEqual(signature({"debug" : False, "engine" : "gecko"}), signature({"debug" : False, "engine" : "trident"}))
+        self.assertNotEqual(signature({"debug" : False, "engine" : "gecko"}), signature({"debug" : False, "engine" : "webkit"}))
+        self.assertNotEqual(signature({"debug" : False, "engine" : "gecko"}), signature({"debug" : True, "engine" : "gecko"}))
+
+        # Unchanged trees
+        self.assertEqual(signature({"other" : True}), None)
+        self.assertEqual(Permutate.getSignature(node, None), None)
+
+        # Signature must not modify the tree
+        self.assertEqual(Compressor.Compressor().compress(node), 'var debug=jasy.Env.isSet("debug");var prefix=jasy.Env.select("engine",{webkit:"Webkit","default":""});')
+
+    def test_clone(self):
+        node = Parser.parse('if (jasy.Env.isSet("debug", true)) { var x = [1, , 2]; }')
+        ScopeScanner.scan(node)
+        copied = node.clone()
+        self.assertEqual(Compressor.Compressor().compress(copied), Compressor.Compressor().compress(node))
+        self.assertEqual(copied[0].thenPart, copied[0][1])
+        self.assertEqual(copied[0].thenPart.parent, copied[0])
+        self.assertEqual(copied.scope, node.scope)
+
+        Permutate.patch(copied, Permutation.Permutation({"debug" : True}))
+        self.assertEqual(Compressor.Compressor().compress(copied), 'if(true){var x=[1,,2]}')
+        self.assertEqual(Compressor.Compressor().compress(node), 'if(jasy.Env.isSet("debug",true)){var x=[1,,2]}')
+
 
     
 if __name__ == '__main__':
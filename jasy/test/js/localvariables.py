@@ -17,12 +17,42 @@ import jasy.js.optimize.LocalVariables as LocalVariables
 
 class Tests(unittest.TestCase):
 
-    def process(self, code):
+    def process(self, code, mode="default"):
         node = Parser.parse(code)
         ScopeScanner.scan(node)
-        LocalVariables.optimize(node)
+        LocalVariables.optimize(node, mode)
         return Compressor.Compressor().compress(node)
 
+    def test_gzip_siblings(self):
+        code = '''
+            var members = {
+              setValue : function(value, other) { other.x(); other.y(); this.v = value; },
+              getValue : function(key, value) { return this.v[key] + value; },
+              third : function(value) { var tmp = value * 2, other = 3; return tmp + other + tmp; }
+            };
+            '''
+
+        self.assertEqual(self.process(code), 
+            'var members={setValue:function(b,a){a.x();a.y();this.v=b},getValue:function(b,a){return this.v[b]+a},third:function(b){var a=b*2,c=3;return a+c+a}};'
+        )
+
+        # Same names for "value" in all members
+        self.assertEqual(self.process(code, "gzip"), 
+            'var members={setValue:function(b,a){a.x();a.y();this.v=b},getValue:function(a,b){return this.v[a]+b},third:function(b){var a=b*2,c=3;return a+c+a}};'
+        )
+
+    def test_gzip_shorter(self):
+        # Most accessed variables keep the shortest names
+        self.assertEqual(self.process(
+            '''
+            function wrapper() {
+              function first(value, other) { return value + other + other; }
+              function second(value) { return value; }
+            }
+            ''', "gzip"),
+            'function wrapper(){function b(b,a){return b+a+a}function a(b){return b}}'
+        )
+
     def test_basic(self):
         self.assertEqual(self.process(
             'function test(para1, para2) { var result = para1 + para2; return result; }'), 
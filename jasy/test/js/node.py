@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.Node as Node
+import jasy.js.parse.Serializer as Serializer
+
+
+class Tests(unittest.TestCase):
+
+    def test_core(self):
+        node = Node.Node(None, "block")
+        self.assertEqual(node.type, "block")
+        self.assertEqual(node.tokenizer, None)
+        self.assertEqual(node.extra, None)
+        self.assertFalse(hasattr(node, "rel"))
+        self.assertFalse(hasattr(node, "parent"))
+
+    def test_extra(self):
+        node = Node.Node(None, "identifier")
+        self.assertFalse(hasattr(node, "value"))
+        self.assertEqual(getattr(node, "value", None), None)
+        self.assertRaises(AttributeError, lambda: node.value)
+
+        node.value = "foo"
+        self.assertTrue(hasattr(node, "value"))
+        self.assertEqual(node.value, "foo")
+        self.assertEqual(node.extra, {"value" : "foo"})
+
+        del node.value
+        self.assertFalse(hasattr(node, "value"))
+        self.assertEqual(node.extra, None)
+
+        def remove():
+            del node.value
+
+        self.assertRaises(AttributeError, remove)
+
+    def test_unknown(self):
+        node = Node.Node(None, "identifier")
+
+        def assign():
+            node.unknownAttribute = 1
+
+        self.assertRaises(AttributeError, assign)
+
+    def test_relations(self):
+        tree = Parser.parse("if (a) { b(); }")
+        node = tree[0]
+        self.assertEqual(node.condition, node[0])
+        self.assertEqual(node.thenPart.rel, "thenPart")
+        self.assertEqual(set(node.extra), set(["condition", "thenPart"]))
+
+    def test_clone(self):
+        tree = Parser.parse("var x = 1;")
+        copy = tree.clone()
+        node = copy[0][0]
+        self.assertEqual(node.name, "x")
+        self.assertEqual(node.initializer.value, 1)
+        self.assertEqual(node.initializer.parent, node)
+        self.assertIsNot(node.extra, tree[0][0].extra)
+
+    def test_clone_deep(self):
+        tree = Parser.parse('var x = %s;' % " + ".join(['"s%s"' % pos for pos in range(5000)]))
+        copy = tree.clone()
+        self.assertEqual(Serializer.dumps(copy, True), Serializer.dumps(tree, True))
+        self.assertEqual(copy[0][0].initializer.parent, copy[0][0])
+
+    def test_xml(self):
+        tree = Parser.parse("x = 1;")
+        self.assertEqual(tree.toXml(), tree.clone().toXml())
+        self.assertTrue('<identifier line="1" value="x"/>' in tree.toXml())
+
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.Prescanner as Prescanner
+
+from jasy.js.MetaData import MetaData
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, code):
+        tree = Parser.parse(code)
+        ScopeScanner.scan(tree)
+
+        meta, scope = Prescanner.scan(code)
+
+        # Same data as the full pipeline
+        self.assertEqual(scope.shared, tree.scope.shared)
+        self.assertEqual(scope.packages, tree.scope.packages)
+        self.assertEqual(meta.requires, MetaData(tree).requires)
+
+        return meta, scope
+
+    def test_globals(self):
+        meta, scope = self.process('foo(bar, baz.qux); var local = 1; local++;')
+        self.assertEqual(set(scope.shared), set(["foo", "bar", "baz"]))
+        self.assertEqual(scope.packages, {"baz.qux" : 1})
+
+    def test_functions(self):
+        meta, scope = self.process('''
+            function declared(a, b) { var c = a + b + outer; return c; }
+            var expressed = function inner(x) { return inner(x, declared, core.Main.create()); };
+            declared(1, 2);
+        ''')
+        self.assertEqual(set(scope.shared), set(["outer", "inner", "core"]))
+        self.assertEqual(scope.packages, {"core.Main.create" : 1})
+
+    def test_nested(self):
+        meta, scope = self.process('''
+            (function(global) {
+                var Class = global.core.Class;
+                Class("my.Class", {
+                    construct : function(first) { this.__value = my.Other.get(first) ? 1 : Missing; },
+                    members : {
+                        test : function() { try { return x; } catch (ex) { return ex; } }
+                    }
+                });
+            })(this);
+        ''')
+        self.assertEqual(set(scope.shared), set(["my", "Missing", "x"]))
+        self.assertEqual(scope.packages, {"my.Other.get" : 1})
+
+    def test_declarations(self):
+        meta, scope = self.process('var a = 1, b = [1, 2], c = function(d, e) { return f; }, g = {h: i, j: k}; for (var l in m) {}')
+        self.assertEqual(set(scope.shared), set(["f", "i", "k", "m"]))
+
+    def test_regexp(self):
+        meta, scope = self.process('var x = a / b / c; if (/foo/.test(d)) { e = x / 2; }')
+        self.assertEqual(set(scope.shared), set(["a", "b", "c", "d", "e"]))
+
+    def test_meta(self):
+        meta, scope = self.process('/** #require(my.Other) #optional(my.Optional) #asset(my/*) */\nvar x = 1;\n/** #break(my.Break) */\nfoo();')
+        self.assertEqual(meta.requires, set(["my.Other"]))
+        self.assertEqual(meta.optionals, set(["my.Optional"]))
+        self.assertEqual(meta.breaks, set(["my.Break"]))
+        self.assertEqual(meta.assets, set(["my/*"]))
+
+    def test_fields(self):
+        self.assertEqual(Prescanner.scan('if (jasy.Env.isSet("debug")) { foo(); }'), None)
+
+    def test_unsupported(self):
+        self.assertEqual(Prescanner.scan('var x = function(a) a * 2;'), None)
+        self.assertEqual(Prescanner.scan('function foo() { var x = "'), None)
+        self.assertEqual(Prescanner.scan('function foo() { bar();'), None)
+
+    def test_getters(self):
+        """ Getters and setters are handled by the full pipeline (their variables are local) """
+        self.assertEqual(Prescanner.scan('var o = { get x() { var Foo = 1; return Foo; } }; Foo.bar();'), None)
+        self.assertEqual(Prescanner.scan('var o = { a : 1, set "x"(value) { Bar = value; } };'), None)
+
+        # Properties named get/set are no getters/setters
+        meta, scope = self.process('var o = { get : function() { return Foo; }, set : bar }; Foo.baz();')
+        self.assertEqual(set(scope.shared), set(["Foo", "bar"]))
+
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, pickle
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.parse.Serializer as Serializer
+import jasy.js.output.Compressor as Compressor
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, code, ranges=False):
+        tree = Parser.parse(code)
+        ScopeScanner.scan(tree)
+        return tree, Serializer.loads(Serializer.dumps(tree, ranges))
+
+    def test_roundtrip(self):
+        tree, restored = self.process('var x = [1, , 3]; function foo(a, b) { if (a) { return b || "x"; } else { x++; } }')
+        self.assertEqual(Compressor.Compressor().compress(restored), Compressor.Compressor().compress(tree))
+        self.assertEqual(restored.toXml(), tree.toXml())
+
+    def test_relations(self):
+        tree, restored = self.process('if (a) { b(); } else { c(); }')
+        node = restored[0]
+        self.assertEqual(node.condition, node[0])
+        self.assertEqual(node.thenPart.rel, "thenPart")
+        self.assertEqual(node.elsePart.parent, node)
+        self.assertEqual(node.parent, restored)
+
+    def test_empty_children(self):
+        tree, restored = self.process('var data = [1, , , 4];')
+        self.assertEqual(Compressor.Compressor().compress(restored), "var data=[1,,,4];")
+
+    def test_types_interned(self):
+        tree, restored = self.process('var x = "use strict";')
+        self.assertIs(restored[0][0].initializer.type, "string")
+
+    def test_no_tokenizer(self):
+        tree, restored = self.process('var x = 1;')
+        self.assertEqual(restored[0].tokenizer, None)
+        self.assertTrue(len(Serializer.dumps(tree)) < len(pickle.dumps(tree)) / 2)
+
+    def test_ranges(self):
+        tree, restored = self.process('var x = 1;\nfoo();', True)
+        self.assertEqual(restored[1].start, tree[1].start)
+        self.assertEqual(restored[1].end, tree[1].end)
+        self.assertEqual(restored[1].line, 2)
+
+        tree, restored = self.process('var x = 1;\nfoo();')
+        self.assertEqual(restored[1].start, 0)
+        self.assertEqual(restored[1].line, 2)
+
+    def test_scope_and_comments(self):
+        tree, restored = self.process('/** Hello #require(foo.Bar) */\nfunction foo(a) { var b = a; }')
+        self.assertEqual(restored.scope.declared, tree.scope.declared)
+        self.assertEqual(restored[0].comments[0].getTags(), {"require" : set(["foo.Bar"])})
+
+    def test_deep(self):
+        """ Generated code with deep trees (one level per operand) """
+        tree, restored = self.process('var x = %s;' % " + ".join(['"s%s"' % pos for pos in range(5000)]))
+        self.assertEqual(Serializer.dumps(restored), Serializer.dumps(tree))
+
+    def test_version(self):
+        data = pickle.dumps((Serializer.VERSION + 1, False, [], [], []))
+        self.assertRaises(ValueError, Serializer.loads, data)
+
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
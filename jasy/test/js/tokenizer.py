@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.tokenize.Tokenizer as Tokenizer
+
+
+class Tests(unittest.TestCase):
+
+    def tokenize(self, code, engine, scanOperand=False):
+        tokenizer = Tokenizer.create(code, "test", 1, engine)
+        result = []
+        while True:
+            tokenType = tokenizer.get(scanOperand)
+            token = tokenizer.token
+            result.append((tokenType, token.start, token.end, token.line, getattr(token, "value", None), getattr(token, "assignOp", None)))
+            if tokenType == "end":
+                break
+
+        comments = [(comment.variant, comment.context, comment.text) for comment in tokenizer.comments]
+        return result, comments
+
+    def compare(self, code, scanOperand=False):
+        classic = self.tokenize(code, "classic", scanOperand)
+        regex = self.tokenize(code, "regex", scanOperand)
+        self.assertEqual(classic, regex)
+        return regex[0]
+
+
+    def test_default(self):
+        self.assertTrue(isinstance(Tokenizer.create("x"), Tokenizer.RegexTokenizer))
+        self.assertTrue(isinstance(Tokenizer.create("x", engine="classic"), Tokenizer.Tokenizer))
+        self.assertRaises(ValueError, Tokenizer.create, "x", engine="unknown")
+
+        # Errors of the engine itself are not reported as unknown engine
+        def broken(source, fileId, line):
+            raise KeyError("inner")
+
+        Tokenizer.engines["broken"] = broken
+        try:
+            self.assertRaises(KeyError, Tokenizer.create, "x", engine="broken")
+        finally:
+            del Tokenizer.engines["broken"]
+
+    def test_identifiers(self):
+        tokens = self.compare("var $foo = _bar1 in this;")
+        self.assertEqual([token[0] for token in tokens], ["var", "identifier", "assign", "identifier", "in", "this", "semicolon", "end"])
+
+    def test_numbers(self):
+        tokens = self.compare("1 42 1.5 1. 1e5 1.5E-3 .5 .5e+2 0 0.5 0x1F 017 0e1 08;")
+        self.assertEqual([token[4] for token in tokens[:-2]], [1, 42, "1.5", "1.", "1e5", "1.5E-3", ".5", ".5e+2", 0, "0.5", "0x1F", "017", 0, 0, 8])
+
+    def test_numbers_missing_exponent(self):
+        self.assertRaises(Tokenizer.ParseError, self.tokenize, "1e;", "classic")
+        self.assertRaises(Tokenizer.ParseError, self.tokenize, "1e;", "regex")
+        self.assertRaises(Tokenizer.ParseError, self.tokenize, "0.e+;", "regex")
+
+    def test_strings(self):
+        tokens = self.compare(r"""'single' "double" "esc\"aped" 'new\nline' "" '';""")
+        self.assertEqual([token[4] for token in tokens[:-2]], ["single", "double", "esc\"aped", "new\nline", "", ""])
+
+    def test_operators(self):
+        tokens = self.compare("a === b !== c >>>= d >> e <<= f && g || h++ - --i ^= ~j;")
+        self.assertEqual([token[0] for token in tokens if token[0] != "identifier"], 
+            ["strict_eq", "strict_ne", "assign", "rsh", "assign", "and", "or", "increment", "minus", "decrement", "assign", "bitwise_not", "semicolon", "end"])
+        self.assertEqual([token[5] for token in tokens if token[0] == "assign"], ["ursh", "lsh", "bitwise_xor"])
+
+    def test_regexp(self):
+        tokens = self.compare(r"/[/\]]+\/x/gi;", True)
+        self.assertEqual(tokens[0][0], "regexp")
+        self.assertEqual(tokens[0][4], r"/[/\]]+\/x/gi")
+
+    def test_division(self):
+        tokens = self.compare("a / b /= c")
+        self.assertEqual([token[0] for token in tokens], ["identifier", "div", "identifier", "assign", "identifier", "end"])
+
+    def test_comments(self):
+        self.compare('''/* leading */
+        
+        
+        /** 
+         * Section {String} 
+         */
+        foo(); // inline
+        // single
+        
+        bar(); /* a */ /* b */
+          /* indented
+             block */
+        baz(); //''')
+
+    def test_newlines(self):
+        code = "a\n  b\n\n c"
+        for engine in Tokenizer.engines:
+            tokenizer = Tokenizer.create(code, "test", 1, engine)
+            tokenizer.get()
+            self.assertEqual(tokenizer.peekOnSameLine(), "newline")
+            self.assertEqual(tokenizer.get(), "identifier")
+            self.assertEqual(tokenizer.token.line, 2)
+            self.assertEqual(tokenizer.get(), "identifier")
+            self.assertEqual(tokenizer.token.line, 4)
+
+    def test_lookahead(self):
+        tokenizer = Tokenizer.create("a + b", "test", 1, "regex")
+        self.assertEqual(tokenizer.peek(), "identifier")
+        self.assertEqual(tokenizer.get(), "identifier")
+        self.assertEqual(tokenizer.match("plus"), True)
+        self.assertEqual(tokenizer.match("minus"), None)
+        self.assertEqual(tokenizer.mustMatch("identifier").value, "b")
+        self.assertTrue(tokenizer.done())
+
+    def test_errors(self):
+        for engine in Tokenizer.engines:
+            self.assertRaises(Tokenizer.ParseError, self.tokenize, "a # b", engine)
+            self.assertRaises(Tokenizer.ParseError, self.tokenize, "a /* b", engine)
+            self.assertRaises(Tokenizer.ParseError, self.tokenize, "/abc", engine, True)
+
+        self.assertRaises(Tokenizer.ParseError, self.tokenize, "'abc", "regex")
+
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -436,7 +436,74 @@ class Tests(unittest.TestCase):
             '''),
             'var a=function d(){d()};'
         )
-        
+
+    def test_chain(self):
+        self.assertEqual(self.process(
+            '''
+            function wrapper() {
+              var a = 1;
+              var b = function() { return a; };
+              var c = function() { return b(); };
+              function d() { return c(); }
+              var e = function f() { return d(); };
+            }
+            '''),
+            'function wrapper(){}'
+        )
+
+    def test_chain_params(self):
+        self.assertEqual(self.process(
+            '''
+            function wrapper(x, y, z) {
+              var a = function() { return y + z; };
+              return x;
+            }
+            '''),
+            'function wrapper(x){return x}'
+        )
+
+    def test_function_names(self):
+        """ Names of functions which are hidden by own variables do not keep the function """
+        self.assertEqual(self.process(
+            '''
+            (function() {
+              var e = h(), f;
+              var e = function b() { b(); var b };
+              var a = d, b;
+            })
+            '''),
+            '(function(){h()});'
+        )
+
+    def test_scope_updated(self):
+        code = '''
+            function wrapper(x) {
+              var a = function() { foo.bar.baz(x); counter++; };
+              var b = call(a);
+              var c = function() { return foo.qux; };
+            }
+            '''
+
+        node = Parser.parse(code)
+        self.assertTrue(Unused.cleanup(node))
+        self.assertEqual(Compressor.Compressor().compress(node), 'function wrapper(x){var a=function(){foo.bar.baz(x);counter++};call(a)}')
+
+        def collect(node, result):
+            if node is not None:
+                if node.type == "script":
+                    result.append(node.scope.export())
+                for child in node:
+                    collect(child, result)
+            return result
+
+        # Scope data is the same as the one of a fresh scan
+        updated = collect(node, [])
+        ScopeScanner.scan(node)
+        self.assertEqual(updated, collect(node, []))
+        self.assertEqual(node.scope.shared, {"call" : 1, "foo" : 1, "counter" : 1})
+        self.assertEqual(node.scope.packages, {"foo.bar.baz" : 1})
+        self.assertEqual(node.scope.modified, set(["wrapper", "counter"]))
+
         
 
 
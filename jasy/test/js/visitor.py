@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.parse.Visitor as Visitor
+
+from jasy.js.MetaData import MetaDataCollector
+from jasy.js.optimize.Translation import TranslationCollector
+from jasy.item.Class import FieldsCollector
+
+
+class Recorder:
+
+    def __init__(self, enterTypes=None, leaveTypes=None):
+        self.enterTypes = enterTypes
+        self.leaveTypes = leaveTypes
+        self.events = []
+
+    def enter(self, node):
+        self.events.append("+%s" % node.type)
+
+    def leave(self, node):
+        self.events.append("-%s" % node.type)
+
+
+class Tests(unittest.TestCase):
+
+    def test_order(self):
+        recorder = Recorder()
+        Visitor.visit(Parser.parse("a = [1,,2];"), [recorder])
+        self.assertEqual(recorder.events, ["+script", "+semicolon", "+assign", "+identifier", "-identifier", "+array_init", 
+            "+number", "-number", "+number", "-number", "-array_init", "-assign", "-semicolon", "-script"])
+
+    def test_types(self):
+        recorder = Recorder(set(["identifier"]), set(["script"]))
+        Visitor.visit(Parser.parse("function foo(a) { return a + b; }"), [recorder])
+        self.assertEqual(recorder.events, ["+identifier", "+identifier", "+identifier", "-script", "-script"])
+
+    def test_enter_only(self):
+        class Counter:
+            count = 0
+            def enter(self, node):
+                self.count += 1
+
+        counter = Counter()
+        Visitor.visit(Parser.parse("x = 1;"), [counter])
+        self.assertEqual(counter.count, 5)
+
+    def test_fused(self):
+        tree = Parser.parse('''
+            /** #require(my.Other) */
+            function translate(value) {
+                return jasy.Env.isSet("debug") ? tr("Hello %1", value) : core.Main.format(trn("File", "Files", value));
+            }
+        ''')
+
+        meta = MetaDataCollector()
+        fields = FieldsCollector()
+        translations = TranslationCollector()
+        Visitor.visit(tree, [ScopeScanner.ScopeCollector(), meta, fields, translations])
+
+        self.assertEqual(meta.meta.requires, set(["my.Other"]))
+        self.assertEqual(fields.keys, set(["debug"]))
+        self.assertEqual(sorted(translations.collection), ["File[N:Files]", "Hello %1"])
+        self.assertEqual(set(tree.scope.shared), set(["jasy", "tr", "core", "trn"]))
+        self.assertEqual(tree.scope.packages, {"jasy.Env.isSet" : 1, "core.Main.format" : 1})
+
+    def test_deep(self):
+        tree = Parser.parse("x = " + " + ".join(["a"] * 5000) + ";")
+        self.assertEqual(ScopeScanner.scan(tree).shared, {"x" : 1, "a" : 5000})
+
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
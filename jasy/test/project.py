@@ -7,6 +7,11 @@ jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir
 sys.path.insert(0, jasyroot)
 
 import jasy.core.Project as Project
+import jasy.js.parse.Serializer as Serializer
+import jasy.js.output.Optimization as Optimization
+import jasy.core.Permutation as Permutation
+import jasy.core.Warmup as Warmup
+import jasy.item.Class as Class
 
 
 class Tests(unittest.TestCase):
@@ -140,6 +145,17 @@ content: {myproject.Main: [man/Main.js, man/Add.js], myproject/main.css: [man/ma
         return Project.getProjectFromPath(path)
 
 
+    def createProject(self, files, config=None):
+        """Creates a project with the given classes (dict of file name => content) in a temporary folder"""
+
+        path = os.path.join(tempfile.TemporaryDirectory().name, "myproject")
+        os.makedirs(os.path.join(path, "source", "class"))
+        for fileName in files:
+            self.writeFile(os.path.join(path, "source", "class"), fileName, files[fileName])
+
+        return Project.Project(path, config or {"name" : "myproject"})
+
+
     def getProjects(self):
         return [self.createCaseOne(),self.createCaseTwo(),self.createCaseThree(),self.createCaseFour()]
 
@@ -180,6 +196,215 @@ content: {myproject.Main: [man/Main.js, man/Add.js], myproject/main.css: [man/ma
     def test_manual_class_fusion(self):
         self.assertEqual(self.createCaseOne().getClassByName("myproject.Main").getText(), ";;")
 
+    def test_content_cache(self):
+        config = {"name" : "myproject", "cache" : {"content" : True}}
+        project = self.createProject({"Main.js" : "var x = 1;"}, config)
+        self.assertTrue(project.hasContentCache())
+
+        classObj = project.getClassByName("myproject.Main")
+        classObj.storeCache("test[myproject.Main]", 42, inMemory=False)
+        project.sync()
+
+        # Touching the file must not invalidate content based entries
+        os.utime(classObj.getPath(), (1, 1))
+        touched = Project.Project(project.getPath(), config).getClassByName("myproject.Main")
+        self.assertEqual(touched.getContentHash(), classObj.getContentHash())
+        self.assertEqual(touched.readCache("test[myproject.Main]", inMemory=False), 42)
+
+    def test_tree_cache(self):
+        project = self.createProject({"Main.js" : "var x = 1;"})
+        self.assertEqual(project.getClassByName("myproject.Main").getCompressed(), "var x=1;")
+        project.sync()
+
+        # Trees are stored in their compact representation
+        restored = Project.Project(project.getPath(), {"name" : "myproject"}).getClassByName("myproject.Main")
+        data = restored.readCache("tree[myproject.Main]", inMemory=False)
+        self.assertEqual(type(data), bytes)
+        self.assertEqual(Serializer.loads(data).type, "script")
+        self.assertEqual(restored.getCompressed(), "var x=1;")
+
+    def test_pass_cache(self):
+        project = self.createProject({"Main.js" : """
+            (function() {
+                var first = 1;
+                var second = 2;
+                if (first) { global.value = first + second; } else { global.value = second; }
+            })();"""})
+
+        permutation = Permutation.getPermutation({"debug" : False})
+        basic = Optimization.Optimization("declarations")
+        full = Optimization.Optimization("declarations", "blocks", "variables")
+
+        classObj = project.getClassByName("myproject.Main")
+        classObj.getCompressed(permutation, optimization=basic)
+
+        # Nothing is kept for the first optimization
+        prefix = "pass-tree[myproject.Main]-%s-None-" % classObj.filterPermutation(permutation)
+        self.assertEqual(classObj.readCache(prefix + "declarations"), None)
+
+        # Only the tree after the pass shared with the first optimization is kept
+        compressed = classObj.getCompressed(permutation, optimization=full)
+        self.assertNotEqual(classObj.readCache(prefix + "declarations"), None)
+        self.assertEqual(classObj.readCache(prefix + "declarations>blocks"), None)
+        self.assertEqual(classObj.readCache(prefix + "declarations>blocks>variables"), None)
+
+        # Continues with the tree after the "declarations" pass and keeps the one shared with the second optimization
+        privates = Optimization.Optimization("declarations", "blocks", "privates")
+        classObj.getCompressed(permutation, optimization=privates)
+        self.assertNotEqual(classObj.readCache(prefix + "declarations>blocks"), None)
+        self.assertEqual(classObj.readCache(prefix + "declarations>blocks>privates"), None)
+
+        fresh = Project.Project(project.getPath(), {"name" : "myproject"}).getClassByName("myproject.Main")
+        self.assertEqual(compressed, fresh.getCompressed(permutation, optimization=full))
+        self.assertEqual(classObj.getCompressed(permutation, optimization=basic), fresh.getCompressed(permutation, optimization=basic))
+        self.assertEqual(classObj.getCompressed(permutation, optimization=privates), fresh.getCompressed(permutation, optimization=privates))
+
+    def test_size_names(self):
+        classObj = self.createProject({"Main.js" : """
+            var members = {
+                setValue : function(value, other) { other.x(); other.y(); this.v = value; },
+                getValue : function(key, value) { return this.v[key] + value; }
+            };"""}).getClassByName("myproject.Main")
+        before = classObj.getSize()
+        after = classObj.getSize(Optimization.Optimization("declarations", "blocks", "names"))
+
+        self.assertEqual(before["compressed"], after["compressed"])
+        self.assertEqual(before["optimized"], after["optimized"])
+        self.assertNotEqual(classObj.readCache("size[myproject.Main]-blocks+declarations+names"), None)
+
+    def test_dead_members(self):
+        project = self.createProject({"Main.js" : """
+            (function() {
+                var helper = function(value) { return value * 2; };
+                core.Module("myproject.Main", {
+                    used : function() { return 1; },
+                    unused : function(value) { return helper(value); }
+                });
+            })();"""})
+
+        permutation = Permutation.getPermutation({"debug" : False})
+        optimization = Optimization.Optimization("declarations", "variables")
+
+        classObj = project.getClassByName("myproject.Main")
+        data = classObj.getMembers(permutation)
+        self.assertEqual(sorted(data.members), ["unused", "used"])
+
+        # Variables only used by removed members are removed as well
+        full = classObj.getCompressed(permutation, optimization=optimization)
+        stripped = classObj.getCompressed(permutation, optimization=optimization, removed=("unused",))
+        self.assertEqual(stripped, '(function(){core.Module("myproject.Main",{used:function(){return 1}})})();')
+        self.assertNotEqual(full, stripped)
+
+        self.assertTrue(classObj.hasCompressed(permutation, optimization=optimization, removed=("unused",)))
+        self.assertNotEqual(classObj.getCompressedKey(permutation, optimization=optimization), classObj.getCompressedKey(permutation, optimization=optimization, removed=("unused",)))
+
+    def test_deep_nesting(self):
+        def generate(count):
+            return 'core.Module("myproject.Main", { text : %s });' % " + ".join(['"s%s" + x' % pos for pos in range(count)])
+
+        permutation = Permutation.getPermutation({"debug" : False})
+        optimization = Optimization.Optimization("wrap", "declarations", "blocks", "variables", "privates")
+
+        # Whole pipeline including tree cache, permutation trees, optimization passes and compressor
+        project = self.createProject({"Main.js" : generate(300)})
+        compressed = project.getClassByName("myproject.Main").getCompressed(permutation, optimization=optimization)
+        project.sync()
+
+        restored = Project.Project(project.getPath(), {"name" : "myproject"}).getClassByName("myproject.Main")
+        self.assertEqual(restored.getCompressed(permutation, optimization=optimization), compressed)
+        self.assertTrue(compressed.endswith('"s299"+x});'))
+
+        # Parsing and caching the tree works for any depth. Deeper code is reported as class error.
+        classObj = self.createProject({"Main.js" : generate(5000)}).getClassByName("myproject.Main")
+        self.assertEqual(classObj.getFields(), set())
+        self.assertNotEqual(classObj.readCache("tree[myproject.Main]", inMemory=False), None)
+        self.assertRaises(Class.ClassError, classObj.getCompressed)
+
+    def test_analysis(self):
+        project = self.createProject({"Main.js" : """
+            /** #require(myproject.Other) */
+            var message = jasy.Env.isSet("debug") ? tr("Debug") : core.Main.get();"""})
+        classObj = project.getClassByName("myproject.Main")
+        permutation = Permutation.getPermutation({"debug" : False})
+
+        # Fields and translations are collected together
+        self.assertEqual(classObj.getFields(), set(["debug"]))
+        self.assertEqual(classObj.readCache("translations[myproject.Main]"), {"Debug" : [3]})
+
+        # Meta and scope data are stored together with the optimized tree
+        classObj.getCompressed(permutation)
+        permutation = classObj.filterPermutation(permutation)
+        self.assertEqual(classObj.readCache("meta[myproject.Main]-%s" % permutation).requires, set(["myproject.Other"]))
+        self.assertEqual(set(classObj.readCache("scope[myproject.Main]-%s" % permutation).shared), set(["core"]))
+        self.assertEqual(classObj.getScopeData(permutation).packages, {"core.Main.get" : 1})
+
+    def test_export_import_cache(self):
+        source = self.createProject({"Main.js" : "var x = 1;"})
+        source.getClassByName("myproject.Main").getCompressed()
+        entries = source.exportCache()
+        self.assertTrue(len(entries) > 0)
+
+        # Different location and modification time but same content
+        target = self.createProject({"Main.js" : "var x = 1;"})
+        self.assertEqual(target.importCache(entries), len(entries))
+
+        field = "compressed[myproject.Main]-None-None-None-None"
+        self.assertEqual(target.getClassByName("myproject.Main").readCache(field), "var x=1;")
+
+    def test_prescan_dependencies(self):
+        project = self.createProject({
+            "Main.js" : "/** #require(myproject.Required) */ myproject.Helper.run();",
+            "Helper.js" : "myproject.Helper = { run : function() {} };",
+            "Required.js" : "var x = 1;",
+            "Fields.js" : "if (jasy.Env.isSet('debug')) { myproject.Helper.run(); }"
+        })
+        classes = project.getClasses()
+
+        main = classes["myproject.Main"]
+        self.assertEqual(main.getDependencies(classes=classes, prescan=True), set([classes["myproject.Helper"], classes["myproject.Required"]]))
+        self.assertEqual(main.readCache("tree[myproject.Main]"), None)
+        self.assertEqual(main.getDependencies(classes=classes), main.getDependencies(classes=classes, prescan=True))
+
+        # Classes reading fields use the full pipeline
+        fields = classes["myproject.Fields"]
+        self.assertEqual(fields.getPrescanData(), None)
+        self.assertEqual(fields.getDependencies(classes=classes, prescan=True), set([classes["myproject.Helper"]]))
+
+    def test_warmup(self):
+        files = { "Broken.js" : "var x = ;" }
+        for pos in range(10):
+            files["Class%s.js" % pos] = """
+                (function(global) {
+                    var value = jasy.Env.isSet("debug") ? "debug%(pos)s" : %(pos)s;
+                    global.Class%(pos)s = function(first, second) { return first + second + value; };
+                })(this);""" % {"pos" : pos}
+
+        permutation = Permutation.getPermutation({"debug" : False})
+        optimization = Optimization.Optimization("variables", "declarations")
+
+        project = self.createProject(files)
+        classes = list(project.getClasses().values())
+        self.assertEqual(Warmup.warmup(classes, permutation, optimization=optimization, workers=1), 0)
+        self.assertEqual(Warmup.warmup(classes, permutation, optimization=optimization, workers=2), 10)
+
+        # Results are available without processing the classes again
+        classObj = project.getClassByName("myproject.Class3")
+        self.assertTrue(classObj.hasCompressed(permutation, optimization=optimization))
+        self.assertEqual(classObj.getFields(), set(["debug"]))
+        self.assertEqual(classObj.readCache("tree[myproject.Class3]"), None)
+        self.assertFalse(project.getClassByName("myproject.Broken").hasCompressed(permutation, optimization=optimization))
+
+        # Same results as processing the class serially
+        serial = self.createProject(files).getClassByName("myproject.Class3")
+        self.assertEqual(classObj.getCompressed(permutation, optimization=optimization), serial.getCompressed(permutation, optimization=optimization))
+        self.assertEqual(classObj.getScopeData(permutation).shared, serial.getScopeData(permutation).shared)
+        self.assertEqual(classObj.getMetaData(permutation).requires, serial.getMetaData(permutation).requires)
+        self.assertEqual(classObj.readCache("tree[myproject.Class3]"), None)
+
+        # Nothing left to do
+        self.assertEqual(Warmup.warmup(classes, permutation, optimization=optimization, workers=2), 0)
+
+
 if __name__ == '__main__':
     logging.getLogger().setLevel(logging.ERROR)
     suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile, socket, time, json
+
+# Extend PYTHONPATH with local 'lib' folder
+jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, jasyroot)
+
+import requests, cherrypy
+
+import jasy.http.Server as Server
+from jasy.http.RemoteCache import RemoteCache
+
+
+def getFreePort():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    return port
+
+
+class Root(object):
+    pass
+
+
+class Tests(unittest.TestCase):
+
+    headers = { "X-Jasy-Token" : "secret" }
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        cls.port = getFreePort()
+        cls.url = "http://127.0.0.1:%s/cache" % cls.port
+
+        root = Root()
+        root.cache = Server.BuildCache("cache", { "cache" : os.path.join(cls.folder, "sub", "buildcache"), "token" : "secret" })
+        root.readonly = Server.BuildCache("readonly", { "cache" : os.path.join(cls.folder, "readonly") })
+
+        cherrypy.config.update({
+            "environment" : "embedded",
+            "log.screen" : False,
+            "server.socket_port" : cls.port,
+            "server.socket_host" : "127.0.0.1",
+            "engine.autoreload.on" : False
+        })
+
+        cherrypy.tree.mount(root, "", {})
+        cherrypy.engine.start()
+        cherrypy.engine.wait(cherrypy.engine.states.STARTED)
+
+    @classmethod
+    def tearDownClass(cls):
+        cherrypy.engine.exit()
+        cherrypy.engine.block()
+
+    def test_put_get(self):
+        client = RemoteCache(self.url, token="secret")
+        client.put({ "a1" : "var a=1;", "b1" : "var b=1;" })
+
+        self.assertEqual(client.get(["a1", "b1", "missing"]), { "a1" : "var a=1;", "b1" : "var b=1;" })
+        self.assertTrue(client.isAvailable())
+        client.close()
+
+    def test_batches(self):
+        client = RemoteCache(self.url, token="secret")
+        client.batchSize = 2
+
+        values = { "batch%s" % pos : "value%s" % pos for pos in range(7) }
+        client.put(values)
+
+        self.assertEqual(client.get(list(values) + ["missing"]), values)
+        self.assertTrue(client.isAvailable())
+        client.close()
+
+    def test_route(self):
+        RemoteCache(self.url, token="secret").put({ "route1" : "var x=1;" })
+
+        response = requests.get("%s/route1" % self.url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode("utf-8"), "var x=1;")
+        self.assertEqual(response.headers["X-Jasy-Version"], Server.jasyVersion)
+
+        self.assertFalse("Access-Control-Allow-Origin" in response.headers)
+
+        self.assertEqual(requests.get("%s/unknown" % self.url, headers=self.headers).status_code, 404)
+        self.assertEqual(requests.post("%s/get" % self.url, data="{invalid", headers=self.headers).status_code, 400)
+
+    def test_token(self):
+        for headers in ({}, { "X-Jasy-Token" : "wrong" }):
+            self.assertEqual(requests.post("%s/put" % self.url, data='{"token1":"x"}', headers=headers).status_code, 403)
+            self.assertEqual(requests.post("%s/get" % self.url, data='["token1"]', headers=headers).status_code, 403)
+            self.assertEqual(requests.get("%s/token1" % self.url, headers=headers).status_code, 403)
+
+        # Client without the token is disabled after the first rejected request
+        client = RemoteCache(self.url)
+        client.put({ "token1" : "var x=1;" })
+        self.assertFalse(client.isAvailable())
+        self.assertEqual(RemoteCache(self.url, token="secret").get(["token1"]), {})
+
+        # Caches without a configured token are read-only
+        url = "http://127.0.0.1:%s/readonly" % self.port
+        self.assertEqual(requests.post("%s/put" % url, data='{"token1":"x"}', headers=self.headers).status_code, 403)
+        self.assertEqual(requests.post("%s/get" % url, data='["token1"]').json(), {})
+
+    def test_validation(self):
+        for data in ('["a", "b"]', '{"a":1}', '{"a":null}', '{"a":["x"]}', '"a"', json.dumps({ "x" * 513 : "y" }), '{"":"y"}'):
+            self.assertEqual(requests.post("%s/put" % self.url, data=data, headers=self.headers).status_code, 400)
+
+        for data in ('{"a":"b"}', '[1]', '[["a"]]', json.dumps(["x" * 513])):
+            self.assertEqual(requests.post("%s/get" % self.url, data=data, headers=self.headers).status_code, 400)
+
+        # Keys are not limited to ASCII
+        client = RemoteCache(self.url, token="secret")
+        client.put({ "schl\u00fcssel\u20ac" : "var x=1;" })
+        self.assertEqual(client.get(["schl\u00fcssel\u20ac"]), { "schl\u00fcssel\u20ac" : "var x=1;" })
+        self.assertTrue(client.isAvailable())
+        client.close()
+
+    def test_server_down(self):
+        client = RemoteCache("http://127.0.0.1:%s/cache" % getFreePort(), timeout=1)
+
+        self.assertEqual(client.get(["a1"]), {})
+        self.assertFalse(client.isAvailable())
+
+        # Disabled for the rest of the session
+        client.put({ "a1" : "var a=1;" })
+        self.assertEqual(client.get(["a1"]), {})
+        client.close()
+
+    def test_default_file(self):
+        current = os.getcwd()
+        folder = tempfile.mkdtemp()
+
+        # The .jasy folder does not exist yet
+        os.chdir(folder)
+        try:
+            cache = Server.BuildCache("shared", {})
+        finally:
+            os.chdir(current)
+
+        self.assertTrue(os.path.isdir(os.path.join(folder, ".jasy")))
+        cache.storage.store("key", "value")
+        self.assertEqual(cache.storage.read("key"), "value")
+        cache.storage.close()
+
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)